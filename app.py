@@ -3,8 +3,7 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-import os, json, datetime, io, pathlib, platform, mimetypes, time
-from io import BytesIO
+import os, json, datetime, io, pathlib, mimetypes, time
 import pandas as pd
 import streamlit as st
 
@@ -15,35 +14,25 @@ from utils.audit_logic import (
     find_requirement_text, normalize_findings_json, Finding, to_sha1, find_column
 )
 from utils.audit_logger import write_audit_log
+from utils.digest_cache import get_digest_cache, DIGEST_CACHE_VERSION
+from utils.batch_audit import run_batch_audit
+from utils.manifest import Manifest, manifest_key, incremental_batch_audit
+from utils.row_index import build_checklist_index
+from utils.retrieval import build_retriever, retrieve_rows
+from utils.prompt_budget import assemble_prompt, token_budget
+from utils.map_reduce import map_reduce_audit
+from utils.stream_parser import FindingsStreamParser
+from utils.response_cache import get_response_cache, prompt_key, backend_model
+from ingestion.evidence_digest import digest_files
+from ingestion.ocr_preprocess import ocr_settings
+from cv.ppe_vision import vision_signature
+from utils import metrics
+from iso_audit.jobs import JobQueue
+
+# set_page_config는 첫 Streamlit 호출이어야 한다
+st.set_page_config(layout="wide", page_title="ISO45001 Audit v0.7.3 (LM-2500)")
 
-# optional deps
-try:
-    import chardet
-except Exception:
-    chardet = None
-try:
-    from PIL import Image, ExifTags
-except Exception:
-    Image, ExifTags = None, None
-try:
-    import pytesseract
-except Exception:
-    pytesseract = None
-try:
-    import PyPDF2
-except Exception:
-    PyPDF2 = None
-
-# fonts
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-if platform.system() == "Windows":
-    plt.rc("font", family="Malgun Gothic")
-elif platform.system() == "Darwin":
-    plt.rc("font", family="AppleGothic")
-else:
-    plt.rc("font", family="NanumGothic")
-plt.rcParams["axes.unicode_minus"] = False
+# 웹 폰트(CSS)는 재실행마다 다시 그려야 하므로 매번 출력 — 비용은 문자열 하나
 st.markdown("""
     <style>
     html, body, [class*="css"] {
@@ -55,151 +44,167 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-st.set_page_config(layout="wide", page_title="ISO45001 Audit v0.7.3 (LM-2500)")
-
 DATA_DIR = pathlib.Path("./data")
 CLAUSE_CSV = DATA_DIR / "iso45001_clause_mapping_utf8sig.csv"
 CHECKLIST_CSV = DATA_DIR / "iso45001_agent_prompt_tuning_checklist_utf8sig.csv"
 LOG_DIR = "./logs"
+# 토큰 예산 모드에서 파일별로 미리 추출하는 상한(실제 사용량은 assemble_prompt가 결정)
+BUDGET_MAX_CHARS = int(os.getenv("BUDGET_MAX_CHARS", "40000"))
+BUDGET_MAX_PAGES = int(os.getenv("BUDGET_MAX_PAGES", "30"))
 
 @st.cache_data
 def load_df(path: str):
     return read_csv_utf8sig(path)
 
+@st.cache_resource
+def load_index(path: str):
+    # CSV당 한 번 구축(세션 공유). load_df 복사본과 행/컬럼이 같으면 그대로 사용
+    return build_checklist_index(read_csv_utf8sig(path))
+
+@st.cache_resource
+def load_backend(backend_name: str, model_name: str):
+    # 백엔드(OpenAI 클라이언트 생성 포함)는 (백엔드, 모델)당 프로세스 1회 — 재실행마다 만들지 않음
+    return get_backend(backend_name, **({"model": model_name} if backend_name in ("ollama", "lmstudio") and model_name else {}))
+
+@st.cache_resource
+def load_retriever(check_path: str, clause_path: str):
+    # 최초 1회 임베딩 후 ./cache/retrieval 의 .npy를 메모리 매핑
+    return build_retriever(read_csv_utf8sig(check_path), read_csv_utf8sig(clause_path))
+
 def sidebar():
     with st.sidebar:
         st.subheader("⚙️ 백엔드/모델")
-        backend_name = st.selectbox("LLM 백엔드", ["openai","ollama","lmstudio"], index=["openai","ollama","lmstudio"].index(os.getenv("LLM_BACKEND","openai")))
+        backends = ["openai","ollama","lmstudio","router","mock"]
+        backend_name = st.selectbox("LLM 백엔드", backends, index=backends.index(os.getenv("LLM_BACKEND","openai")) if os.getenv("LLM_BACKEND","openai") in backends else 0)
         model_name = st.text_input("모델명(로컬)", os.getenv("OLLAMA_MODEL","llama3:8b-instruct"))
         clause_hint = st.text_input("조항 힌트", "")
         lm2500 = st.toggle("LM-2500 작업장 프리셋", value=True)
         ocr_on = st.toggle("이미지 OCR(한/영)", value=False)
+        # 고급 실행 옵션(v0.8~): 추가 옵션은 adv dict로 전달
+        adv = {}
+        with st.expander("고급 실행 옵션", expanded=False):
+            adv["batch"] = st.toggle("전 조항 일괄 심사(4~10 병렬)", value=False,
+                                     help="체크리스트를 최상위 조항별로 나눠 동시에 호출하고 결과를 병합합니다.")
+            adv["map_reduce"] = st.toggle("전체 문서 청크 분석(map-reduce)", value=False,
+                                          help="PDF 전 페이지를 겹치는 청크로 나눠 병렬 분석하고 조항별로 병합합니다.")
+            adv["stream"] = st.toggle("스트리밍 출력(결과 즉시 표시)", value=False,
+                                      help="토큰을 받는 즉시 파싱해 완성된 finding부터 표시합니다. 일괄 심사에는 적용되지 않습니다.")
+            adv["retrieval"] = st.toggle("증거 기반 컨텍스트 검색(top-k)", value=False,
+                                         help="증거 요약과 유사한 체크리스트 행만 골라 프롬프트를 줄입니다.")
+            adv["top_k"] = st.slider("검색 행 수(top-k)", 3, 20, int(os.getenv("RETRIEVAL_TOP_K", "8")))
+            adv["budget"] = st.toggle("토큰 예산 기반 프롬프트 구성", value=False,
+                                      help="모델 컨텍스트 예산 안에서 요구사항→체크리스트 행→증거 청크 순으로 채웁니다.")
+            adv["bypass_cache"] = st.toggle("LLM 응답 캐시 우회", value=False,
+                                            help="동일 프롬프트라도 LLM을 다시 호출합니다(새 결과로 캐시 갱신).")
+            adv["queue"] = st.toggle("작업 큐로 실행(백그라운드 worker)", value=False,
+                                     help="심사를 worker 프로세스(python -m iso_audit worker)에 맡깁니다. "
+                                          "새로고침해도 작업이 계속되며 결과는 아래 '작업 큐'에 표시됩니다. "
+                                          "일괄/map-reduce 외 옵션(스트리밍·검색·토큰 예산)은 적용되지 않습니다.")
+            adv["owner"] = st.text_input("심사원(작업 소유자)", os.getenv("USER", ""))
+            adv["incremental"] = st.toggle("증분 재심사(바뀐 조항 그룹만 재호출)", value=False,
+                                           help="이전 심사 매니페스트와 비교해 증거가 바뀐 조항 그룹만 LLM을 호출하고 "
+                                                "나머지는 이전 findings를 재사용합니다. 일괄 심사와 작업 큐에 적용됩니다.")
+            adv["baseline"] = st.text_input("기준선 이름(매니페스트)", "", help="같은 이름끼리 비교합니다(비우면 default).")
         run_btn = st.button("심사 실행", type="primary", use_container_width=True)
-    return backend_name, model_name, clause_hint, lm2500, ocr_on, run_btn
-
-# evidence helpers (binary-safe)
-def _guess_encoding(b: bytes) -> str:
-    if chardet:
-        try:
-            det = chardet.detect(b or b"")
-            enc = (det.get("encoding") or "").strip()
-            if enc:
-                return enc
-        except Exception:
-            pass
-    return "utf-8-sig"
-
-def _is_binary_bytes(b: bytes, sample=512) -> bool:
-    head = b[:sample]
-    nontext = sum(c < 9 or (13 < c < 32) for c in head)
-    return (0 in head) or (nontext / max(1, len(head)) > 0.2)
-
-def _ext_from_name(name: str) -> str:
-    return (name.rsplit(".", 1)[-1] if "." in name else "").lower()
-
-def _mime_from_name(name: str) -> str:
-    import mimetypes
-    return (mimetypes.guess_type(name)[0] or "").lower()
-
-def _summarize_image(name: str, b: bytes, ocr: bool=False, ocr_lang: str="kor+eng") -> str:
-    if not Image:
-        return f"[{name}] (이미지 파일, 미리보기만 표시. OCR 미지원)"
-    try:
-        im = Image.open(BytesIO(b))
-        info = f"[{name}] 이미지 {im.format} {im.width}x{im.height}px"
-        exif_txt = ""
-        try:
-            exif = im.getexif()
-            if exif and len(exif):
-                from PIL import ExifTags
-                kv = []
-                for k, v in exif.items():
-                    try:
-                        tag = ExifTags.TAGS.get(k, str(k))
-                        if tag in ("DateTime","Make","Model","Software","Orientation"):
-                            kv.append(f"{tag}={v}")
-                    except Exception:
-                        pass
-                if kv:
-                    exif_txt = " | EXIF: " + ", ".join(kv[:6])
-        except Exception:
-            pass
-        ocr_txt = ""
-        if ocr and pytesseract:
-            try:
-                ocr_txt = pytesseract.image_to_string(im, lang=ocr_lang)
-                ocr_txt = (ocr_txt or "").strip()
-                if ocr_txt:
-                    ocr_txt = "\n[OCR]\n" + ocr_txt[:800]
-            except Exception as e:
-                ocr_txt = f"\n[OCR 실패] {e}"
-        elif ocr and not pytesseract:
-            ocr_txt = "\n[OCR 비활성화] pytesseract 미설치"
-        return info + exif_txt + ocr_txt
-    except Exception as e:
-        return f"[{name}] (이미지 파싱 실패: {e})"
-
-def _summarize_pdf(name: str, b: bytes, max_chars=1200) -> str:
-    if not PyPDF2:
-        return f"[{name}] (PDF 파일, PyPDF2 미설치로 본문 미리보기 생략)"
-    try:
-        reader = PyPDF2.PdfReader(BytesIO(b))
-        texts = []
-        for i, page in enumerate(reader.pages[:2]):
-            try:
-                t = page.extract_text() or ""
-                if t.strip():
-                    texts.append(t.strip())
-            except Exception:
-                pass
-        text = "\n".join(texts)[:max_chars]
-        if not text:
-            return f"[{name}] (PDF, 추출된 텍스트 없음)"
-        return f"[{name}] (PDF 요약)\n{text}"
-    except Exception as e:
-        return f"[{name}] (PDF 파싱 실패: {e})"
-
-def digest_evidence(uploaded_files, enable_ocr=False) -> str:
-    parts = []
-    for f in (uploaded_files or []):
-        name = getattr(f, "name", "evidence.bin")
-        b = f.getvalue()
-
-        ext = _ext_from_name(name)
-        mime = _mime_from_name(name)
-
-        # 이미지
-        if mime.startswith("image/") or ext in ("jpg","jpeg","png","bmp","tif","tiff","gif","webp"):
-            parts.append(_summarize_image(name, b, ocr=enable_ocr))
-            continue
-
-        # PDF
-        if mime == "application/pdf" or ext == "pdf":
-            parts.append(_summarize_pdf(name, b))
+    return backend_name, model_name, clause_hint, lm2500, ocr_on, run_btn, adv
+
+def digest_evidence(uploaded_files, enable_ocr=False, ocr_lang="kor+eng", max_chars=1200, cache=None, progress=True, **limits) -> str:
+    # 파일별 요약: 캐시 적중분은 즉시, PDF/OCR은 프로세스 풀에서 병렬 처리(업로드 순서 유지)
+    items = [(getattr(f, "name", "evidence.bin"), f.getvalue()) for f in (uploaded_files or [])]
+    if not items:
+        return "증거 없음"
+    bar = st.progress(0.0, text="증거 요약 중...") if progress else None
+    def _on_progress(done, total, name):
+        if bar is not None:
+            bar.progress(done / max(1, total), text=f"증거 요약 {done}/{total}: {name}")
+    with metrics.span("ingest"):
+        parts = digest_files(items, enable_ocr=enable_ocr, ocr_lang=ocr_lang, max_chars=max_chars,
+                             cache=cache, on_progress=_on_progress, **limits)
+    if bar is not None:
+        bar.empty()
+    return "\n---\n".join(parts)
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    return JobQueue()
+
+def submit_job(backend_name, model_name, clause_hint, use_lm2500, ocr_on, adv) -> str:
+    q = job_queue()
+    items = [(getattr(f, "name", "evidence.bin"), f.getvalue()) for f in (st.session_state.files or [])]
+    mode = "batch" if adv.get("batch") else "map-reduce" if adv.get("map_reduce") else "single"
+    params = {"backend_name": backend_name, "model": model_name if backend_name in ("ollama", "lmstudio") else "",
+              "clause_hint": clause_hint, "use_preset": use_lm2500, "mode": mode, "ocr": ocr_on,
+              "bypass_cache": adv.get("bypass_cache", False), "log_dir": LOG_DIR,
+              "incremental": adv.get("incremental", False), "baseline": adv.get("baseline", "")}
+    job_id = q.submit(items, params, owner=adv.get("owner", ""))
+    # 새로고침해도 추적할 수 있도록 URL 쿼리에 보관
+    ids = [j for j in st.query_params.get("jobs", "").split(",") if j]
+    st.query_params["jobs"] = ",".join(ids + [job_id])
+    return job_id
+
+@st.fragment(run_every=2)
+def jobs_panel():
+    ids = [j for j in st.query_params.get("jobs", "").split(",") if j]
+    if not ids:
+        return
+    q = job_queue()
+    st.subheader("작업 큐")
+    if not q.live_workers():
+        st.warning("실행 중인 worker가 없습니다: `python -m iso_audit worker --workers 2`")
+    for job_id in reversed(ids):
+        job = q.get(job_id)
+        if job is None:
             continue
-
-        # 텍스트
-        if not _is_binary_bytes(b):
-            try:
-                enc = _guess_encoding(b)
-                txt = b.decode(enc, errors="replace")
-                parts.append(f"[{name}] (텍스트/{enc})\n{txt[:1200]}")
-                continue
-            except Exception as e:
-                parts.append(f"[{name}] (텍스트 디코딩 실패: {e})")
-                continue
-
-        # 기타 바이너리
-        parts.append(f"[{name}] (바이너리 파일, {len(b)} bytes)")
-    return "\n---\n".join(parts) if parts else "증거 없음"
+        label = f"{job_id} · {job['status']} · {job['progress'] or ''}"
+        with st.expander(label, expanded=job["status"] in ("running", "done")):
+            if job["status"] == "queued":
+                st.caption(f"대기 순번: {q.position(job_id) + 1}")
+                if st.button("취소", key=f"cancel_{job_id}"):
+                    q.cancel(job_id)
+            elif job["status"] == "running":
+                st.caption(f"worker {job['worker']} · {time.time() - (job['started'] or time.time()):.0f}s 경과")
+            elif job["status"] == "done":
+                res = job.get("result") or {}
+                st.caption(f"Audit ID: `{res.get('audit_id')}` · {res.get('elapsed')}s · 로그 {res.get('log_path')}")
+                st.json({"findings": res.get("findings", [])}, expanded=False)
+                csv_bytes = q.csv_bytes(job_id)
+                if csv_bytes:
+                    st.download_button("결과 CSV 다운로드", csv_bytes, file_name=f"audit_{res.get('audit_id')}.csv",
+                                       mime="text/csv", key=f"dl_{job_id}")
+            elif job["status"] == "failed":
+                st.error((job.get("error") or "").splitlines()[0] if job.get("error") else "실패")
+
+def _stream_findings(backend, system, user, clause_hint, start_t, log_extra) -> dict:
+    # 토큰 스트림을 점진 파싱해 완성된 finding부터 표시. 지연 지표(TTFT/첫 finding)는 로그에 기록
+    parser = FindingsStreamParser()
+    status = st.empty()
+    box = st.container()
+    live, n_tok = [], 0
+    for tok in backend.stream(system=system, user=user, clause_hint=clause_hint):
+        if n_tok == 0:
+            log_extra["ttft_sec"] = round(time.time() - start_t, 3)
+        n_tok += 1
+        for f in parser.feed(tok):
+            if not live:
+                log_extra["first_finding_sec"] = round(time.time() - start_t, 3)
+            live.append(f)
+            box.markdown(f"**[{f['result']}] {f['clause']} {f['title']}** — {f['reason']}")
+        status.caption(f"수신 중... 청크 {n_tok}개, finding {len(live)}건")
+    status.empty()
+    result = normalize_findings_json(parser.text)
+    # 최종 파싱이 깨졌으면 스트림 중 확보한 finding을 사용
+    if not result.get("findings") and live:
+        result = {"findings": live}
+    return result
 
 def main():
     st.title("온/오프라인 LLM기반 ISO 45001 인증심사 플랫폼 v1.0")
-    backend_name, model_name, clause_hint, use_lm2500, ocr_on, run_btn = sidebar()
+    backend_name, model_name, clause_hint, use_lm2500, ocr_on, run_btn, adv = sidebar()
 
     # 데이터 로드
     df_clause = load_df(str(CLAUSE_CSV))
     df_check  = load_df(str(CHECKLIST_CSV))
+    check_index = load_index(str(CHECKLIST_CSV))
     with st.expander("데이터 확인 / 컬럼 매핑", expanded=False):
         st.write("Checklist CSV columns:", list(df_check.columns))
         st.write("Detected:", {
@@ -218,30 +223,44 @@ def main():
     if files:
         st.session_state.files = files
 
-    ev_digest = digest_evidence(st.session_state.files, enable_ocr=ocr_on)
-    st.text_area("증거 요약(자동 생성 미리보기)", ev_digest, height=180)
-
-    # LM-2500 프리셋 로드
-    lm2500_weight = None
+    # LM-2500 프리셋 로드(OCR 설정 "ocr" 절은 증거 요약에 쓰이므로 먼저)
+    lm2500_weight, ocr_cfg = None, None
     if use_lm2500:
         try:
             preset = json.load(open("./presets/lm2500_profile.json", "r", encoding="utf-8"))
             lm2500_weight = preset.get("keywords_weight", {})
+            ocr_cfg = preset.get("ocr")
             if not clause_hint:
                 clause_hint = preset.get("clause_hint","")
         except Exception as e:
             st.warning(f"LM-2500 프리셋 로드 실패: {e}")
 
+    ev_digest = digest_evidence(st.session_state.files, enable_ocr=ocr_on, ocr_config=ocr_cfg)
+    st.text_area("증거 요약(자동 생성 미리보기)", ev_digest, height=180)
+    cs = get_digest_cache().stats()
+    st.caption(f"요약 캐시: {cs['items']}건 (hit {cs['hits']} / miss {cs['misses']}){' · 디스크 ' + cs['disk'] if cs['disk'] else ''}")
+
     # 컨텍스트 선택
     st.subheader("컨텍스트 선택")
-    try:
-        df_ctx = select_relevant_rows(df_check, clause_hint, lm2500_weight=lm2500_weight)
-    except Exception as e:
-        st.warning(f"행 선택 로직 경고: {e}")
-        df_ctx = df_check.copy()
+    with metrics.span("select"):
+        try:
+            df_ctx = select_relevant_rows(df_check, clause_hint, lm2500_weight=lm2500_weight, index=check_index)
+        except Exception as e:
+            st.warning(f"행 선택 로직 경고: {e}")
+            df_ctx = df_check.copy()
+        if adv.get("retrieval") and ev_digest != "증거 없음":
+            try:
+                retriever = load_retriever(str(CHECKLIST_CSV), str(CLAUSE_CSV))
+                df_ctx = retrieve_rows(retriever, df_check, ev_digest, k=adv["top_k"], candidates=df_ctx)
+                st.caption(f"증거 기반 검색: {retriever.method}, top-{adv['top_k']}")
+            except Exception as e:
+                st.warning(f"컨텍스트 검색 실패(키워드 선택 유지): {e}")
     st.dataframe(df_ctx.head(15), height=260)
 
-    if run_btn:
+    if run_btn and adv.get("queue"):
+        job_id = submit_job(backend_name, model_name, clause_hint, use_lm2500, ocr_on, adv)
+        st.success(f"작업 큐에 등록했습니다: `{job_id}`")
+    elif run_btn:
         start_t = time.time()
 
         os.environ["LLM_BACKEND"] = backend_name
@@ -249,20 +268,91 @@ def main():
             os.environ["OLLAMA_MODEL"] = model_name
         if backend_name == "lmstudio":
             os.environ["LMSTUDIO_MODEL"] = model_name
-        backend = get_backend(backend_name)
-
-        system = build_system_prompt(df_ctx)
-        user   = build_user_prompt(ev_digest, clause_hint)
-
-        st.info(f"백엔드={backend_name}, 모델={model_name}, 조항힌트='{clause_hint}', OCR={'ON' if ocr_on else 'OFF'}")
-        try:
-            result = backend.generate(system=system, user=user, clause_hint=clause_hint)
-            result = normalize_findings_json(result)
-            findings = [Finding(**f).model_dump() for f in result.get("findings",[])]
-        except Exception as e:
-            st.error(f"LLM 실패: {e} → 오프라인 규칙으로 폴백합니다.")
-            result = offline_baseline(df_ctx, ev_digest, clause_hint)
-            findings = result["findings"]
+        backend = load_backend(backend_name, model_name)
+
+        log_extra, manifest = {}, None
+        if adv.get("batch"):
+            st.info(f"백엔드={backend_name}, 모델={model_name}, 일괄 심사(조항 4~10), OCR={'ON' if ocr_on else 'OFF'}")
+            with st.spinner("조항 그룹별 병렬 심사 중..."), metrics.span("llm"):
+                if adv.get("incremental"):
+                    items = [(getattr(f, "name", "evidence.bin"), f.getvalue()) for f in (st.session_state.files or [])]
+                    parts = digest_files(items, enable_ocr=ocr_on, ocr_config=ocr_cfg) if items else []   # 미리보기에서 이미 캐시됨
+                    key = manifest_key(adv.get("baseline", ""), "", "batch")
+                    prev = Manifest(key) if adv.get("bypass_cache") else Manifest.load(key)
+                    batch, manifest = incremental_batch_audit(backend, df_check, items, parts, prev,
+                                                              {"ocr": bool(ocr_on), "digest_v": DIGEST_CACHE_VERSION,
+                                                               "vision": vision_signature(),
+                                                               **({"ocr_cfg": ocr_settings(ocr_cfg)} if ocr_on else {})},
+                                                              lm2500_weight=lm2500_weight, index=check_index,
+                                                              bypass_cache=adv.get("bypass_cache", False))
+                    inc = log_extra["incremental"] = batch["incremental"]
+                    st.caption(f"증분 재심사({key}): 재사용 {inc['reused']} · 재호출 {inc['rerun']} · "
+                               f"추가 {len(inc['added'])} / 변경 {len(inc['changed'])} / 삭제 {len(inc['removed'])}")
+                else:
+                    batch = run_batch_audit(backend, df_check, ev_digest, lm2500_weight=lm2500_weight,
+                                            bypass_cache=adv.get("bypass_cache", False), index=check_index)
+            findings = batch["findings"]
+            st.dataframe(pd.DataFrame(batch["groups"]), height=280)
+            failed = [g["group"] for g in batch["groups"] if g["error"]]
+            if failed:
+                st.warning(f"LLM 실패 그룹 {failed} → 오프라인 규칙으로 폴백했습니다.")
+            clause_hint = "batch:" + ",".join(g["group"] for g in batch["groups"])
+            log_extra["batch"] = batch["groups"]
+            log_extra["cache_hits"] = sum(1 for g in batch["groups"] if g.get("cache_hit"))
+        elif adv.get("map_reduce"):
+            st.info(f"백엔드={backend_name}, 모델={model_name}, 조항힌트='{clause_hint}', 전체 문서 map-reduce")
+            items = [(getattr(f, "name", "evidence.bin"), f.getvalue()) for f in (st.session_state.files or [])]
+            bar = st.progress(0.0, text="청크 분석 중...")
+            with metrics.span("llm"):
+                mr = map_reduce_audit(backend, items, df_ctx, clause_hint, bypass_cache=adv.get("bypass_cache", False),
+                                      on_progress=lambda d, t, src: bar.progress(d / max(1, t), text=f"청크 {d}/{t}: {src}"))
+            bar.empty()
+            findings = mr["findings"]
+            st.caption(f"청크 {mr['mapped']}/{mr['chunks']} 분석, 캐시 적중 {mr['cache_hits']}, {mr['elapsed']}s")
+            if mr["errors"] or mr["skipped"]:
+                st.warning(f"실패 {len(mr['errors'])}건, 시간 초과로 생략 {len(mr['skipped'])}건")
+            if not findings:
+                findings = offline_baseline(df_ctx, ev_digest, clause_hint)["findings"]
+            log_extra["map_reduce"] = {k: v for k, v in mr.items() if k != "findings"}
+        else:
+            if adv.get("budget"):
+                # 예산 모드: 고정 절단 대신 넉넉히 추출한 뒤 예산 안에서 채움
+                budget = token_budget(backend_name, backend_model(backend))
+                ev_full = digest_evidence(st.session_state.files, enable_ocr=ocr_on,
+                                          max_chars=BUDGET_MAX_CHARS, max_pages=BUDGET_MAX_PAGES,
+                                          ocr_max_chars=BUDGET_MAX_CHARS, ocr_config=ocr_cfg)
+                system, user, budget_report = assemble_prompt(df_ctx, ev_full.split("\n---\n"), clause_hint, budget,
+                                                              df_clause=df_clause, model=backend_model(backend))
+                st.caption("토큰 예산 사용량")
+                st.json(budget_report, expanded=False)
+                log_extra["prompt_budget"] = budget_report
+            else:
+                system = build_system_prompt(df_ctx, max_rows=adv["top_k"] if adv.get("retrieval") else 12)
+                user   = build_user_prompt(ev_digest, clause_hint)
+
+            st.info(f"백엔드={backend_name}, 모델={model_name}, 조항힌트='{clause_hint}', OCR={'ON' if ocr_on else 'OFF'}")
+            try:
+                rcache = get_response_cache()
+                key = prompt_key(backend.name, backend_model(backend), system, user)
+                cached = None if adv.get("bypass_cache") else rcache.get(key)
+                log_extra.update(cache_hit=cached is not None, prompt_hash=key[:12])
+                if cached is not None:
+                    st.caption(f"LLM 응답 캐시 적중(prompt_hash={key[:12]}) — 호출 생략")
+                    result = cached
+                elif adv.get("stream"):
+                    with metrics.span("llm"):
+                        result = _stream_findings(backend, system, user, clause_hint, start_t, log_extra)
+                else:
+                    with metrics.span("llm"):
+                        result = backend.generate(system=system, user=user, clause_hint=clause_hint)
+                result = normalize_findings_json(result)
+                if cached is None:
+                    rcache.put(key, result, backend.name, backend_model(backend), system, user)
+                findings = [Finding(**f).model_dump() for f in result.get("findings",[])]
+            except Exception as e:
+                st.error(f"LLM 실패: {e} → 오프라인 규칙으로 폴백합니다.")
+                result = offline_baseline(df_ctx, ev_digest, clause_hint)
+                findings = result["findings"]
 
         st.subheader("심사 결과")
         st.json({"findings": findings})
@@ -285,10 +375,24 @@ def main():
         csv_bytes = out_df.to_csv(index=False).encode("utf-8-sig")
         st.download_button("결과 CSV 다운로드", csv_bytes, file_name=f"audit_{audit_id}.csv", mime="text/csv")
 
+        if manifest is not None:
+            manifest.stamp(audit_id, backend=backend_name, model=model_name, mode="batch")
+            log_extra["incremental"]["manifest"] = manifest.save()
+
         # 재현성 로그 기록
         elapsed = time.time() - start_t
-        log_path = write_audit_log(LOG_DIR, audit_id, backend_name, model_name, clause_hint, ev_digest, csv_bytes, len(findings), "v0.7.3", elapsed)
+        rec = metrics.current()
+        if rec is not None:
+            log_extra.update(rec.as_dict())  # 단계별 시간(stages)/카운터(counters)
+        log_path = write_audit_log(LOG_DIR, audit_id, backend_name, model_name, clause_hint, ev_digest, csv_bytes, len(findings), "v0.7.3", elapsed, extra=log_extra, findings=findings)
         st.caption(f"Audit log recorded: {log_path}")
+        if rec is not None and rec.stages:
+            st.caption("단계별 시간(초): " + ", ".join(f"{k} {v:.2f}" for k, v in rec.as_dict()["stages"].items()))
+        metrics.write_textfile()
+
+    jobs_panel()
 
 if __name__ == "__main__":
-    main()
+    metrics.start_http_server()  # METRICS_PORT 설정 시에만, 프로세스당 1회
+    with metrics.collect():      # 재실행 1회분 단계 시간/카운터
+        main()
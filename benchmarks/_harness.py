@@ -0,0 +1,112 @@
+# benchmarks/_harness.py — v0.8 (벤치마크 공통: 측정/스텁 백엔드/결과 저장)
+# 각 bench_*.py는 run(quick: bool) -> {케이스명: 측정 dict} 를 제공하고,
+# 단독 실행(main_for) 또는 run_all.py로 묶어 benchmarks/results/*.json 에 저장한다.
+# 결과 파일에는 커밋 해시가 들어가므로 compare.py로 커밋 간 회귀를 비교할 수 있다.
+import os, sys, json, time, random, platform, argparse, statistics, subprocess, pathlib, datetime
+from typing import Any, Callable, Dict, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # app/pipeline의 ./data, ./presets 등 상대경로 기준
+DATA_DIR = ROOT / "data"
+EVIDENCE_DIR = ROOT / "심사자료"
+CHECKLIST_CSV = DATA_DIR / "iso45001_agent_prompt_tuning_checklist_utf8sig.csv"
+CLAUSE_CSV = DATA_DIR / "iso45001_clause_mapping_utf8sig.csv"
+
+def measure(fn: Callable[[], Any], repeat: int = 5, number: int = 1, warmup: int = 1,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """fn을 number회 호출한 시간을 repeat번 측정 → 1회당 ms 통계. setup은 매 반복 전(측정 제외)."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) * 1000 / number)
+    samples.sort()
+    return {
+        "unit": "ms", "repeat": repeat, "number": number,
+        "min": round(samples[0], 4), "median": round(statistics.median(samples), 4),
+        "mean": round(statistics.fmean(samples), 4),
+        "p95": round(samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))], 4),
+        "stdev": round(statistics.pstdev(samples), 4),
+    }
+
+def git_rev() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=10).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, timeout=30).stdout.strip()
+        return rev + ("-dirty" if dirty else "") if rev else "unknown"
+    except Exception:
+        return "unknown"
+
+def machine_info() -> Dict[str, Any]:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def save_results(results: Dict[str, Dict[str, Any]], suite: str, out: Optional[str] = None) -> pathlib.Path:
+    rev = git_rev()
+    path = pathlib.Path(out) if out else RESULTS_DIR / f"{suite}_{datetime.datetime.utcnow():%Y%m%dT%H%M%SZ}_{rev}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {"suite": suite, "commit": rev, "time": datetime.datetime.utcnow().isoformat() + "Z",
+           "machine": machine_info(), "results": results}
+    path.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    for name, r in results.items():
+        extra = "  ".join(f"{k}={v}" for k, v in r.items()
+                          if k not in ("unit", "repeat", "number", "min", "median", "mean", "p95", "stdev"))
+        print(f"{name:<48} median {r['median']:>11.3f} ms  p95 {r['p95']:>11.3f}  {extra}")
+
+def main_for(suite: str, run: Callable[[bool], Dict[str, Dict[str, Any]]], argv=None) -> int:
+    ap = argparse.ArgumentParser(description=f"{suite} 벤치마크")
+    ap.add_argument("--quick", action="store_true", help="반복/규모 축소(스모크용)")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로")
+    ap.add_argument("--no-save", action="store_true")
+    args = ap.parse_args(argv)
+    results = run(args.quick)
+    print_results(results)
+    if not args.no_save:
+        print(f"→ {save_results(results, suite, args.out)}")
+    return 0
+
+# ---- 지연을 흉내 내는 스텁 백엔드(네트워크 없음, 결정적) ----
+STUB_FINDINGS = {"findings": [
+    {"title": "위험성평가 기록 미흡", "clause": "6.1.2", "reason": "평가표 서명 누락", "result": "Cat.2"},
+    {"title": "작업 전 안전점검", "clause": "8.1", "reason": "TBM 기록 확인", "result": "Y"},
+    {"title": "비상대응 훈련", "clause": "8.2", "reason": "연간 계획 존재", "result": "N"},
+]}
+
+class StubBackend:
+    """BaseBackend 인터페이스(name/model/generate/stream)를 흉내. latency는 초, jitter는 비율."""
+    name = "stub"
+    max_concurrency = 4
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int = 0, model: str = "stub-1"):
+        self.latency, self.jitter, self.model = latency, jitter, model
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _sleep(self):
+        j = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        time.sleep(max(0.0, self.latency * (1 + j)))
+
+    def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        self.calls += 1
+        self._sleep()
+        return json.loads(json.dumps(STUB_FINDINGS))
+
+    def stream(self, system: str, user: str, **kw):
+        self.calls += 1
+        self._sleep()
+        yield json.dumps(STUB_FINDINGS, ensure_ascii=False)
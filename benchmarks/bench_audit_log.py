@@ -0,0 +1,99 @@
+# benchmarks/bench_audit_log.py — v0.8 (감사 로그: 기록 처리량 + 이력 조회)
+#   python benchmarks/bench_audit_log.py [--quick]
+# - write/legacy   : 이전 write_audit_log(레코드마다 open/append/close)
+# - write/buffered : AuditLogWriter(버퍼 + 잠금 + 일괄 append)
+# - query/scan     : 날짜별 JSONL(.gz) 전부 읽고 필터("8.1 조항 Cat.1, 최근 분기") — grep 방식
+# - query/rollup   : AuditStore 인덱스 조회(적재는 측정 밖, sync_ms로 따로 보고)
+import gzip, json, time, random, tempfile, datetime, pathlib, threading
+from typing import Any, Dict
+
+from _harness import measure, main_for
+from utils.audit_logger import AuditLogWriter, iter_log_files, iter_records
+from utils.audit_store import AuditStore
+
+_RESULTS = ("Cat.1", "Cat.2", "N", "Y")
+_CLAUSES = ("4.1", "5.4", "6.1.2", "7.5.3", "8.1", "8.1.2", "8.1.4", "8.2", "9.1", "10.2")
+
+def _record(rng: random.Random, i: int, ts: datetime.datetime) -> Dict[str, Any]:
+    return {"audit_id": f"{ts:%Y%m%dT%H%M%SZ}_{i:08x}", "timestamp": f"{ts:%Y-%m-%dT%H:%M:%SZ}",
+            "backend": rng.choice(("openai", "ollama", "lmstudio")), "model": rng.choice(("gpt-5", "llama3:8b")),
+            "clause_hint": "8", "hash_evidence": f"{i:08x}", "hash_csv": f"{i:08x}", "findings_count": 4,
+            "version": "v0.7.3", "elapsed_time": 3.2, "site": f"site{rng.randrange(20)}", "mode": "batch",
+            "findings": [{"clause": rng.choice(_CLAUSES), "title": "관찰사항", "result": rng.choice(_RESULTS),
+                          "reason": "근거 요약 " * 8} for _ in range(4)]}
+
+def _legacy_write(log_dir: pathlib.Path, rec: Dict[str, Any]):
+    fp = log_dir / f"audit_{datetime.datetime.utcnow():%Y%m%d}.jsonl"
+    with open(fp, "a", encoding="utf-8") as f:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+def _threads(fn, n_threads: int, per_thread: int):
+    ts = [threading.Thread(target=lambda: [fn(k) for k in range(per_thread)]) for _ in range(n_threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+
+def _history(root: pathlib.Path, days: int, per_day: int) -> int:
+    """days일치 로그(지난 날짜는 gzip) 생성."""
+    rng = random.Random(0)
+    end = datetime.datetime(2026, 10, 1)
+    n = 0
+    for d in range(days):
+        day = end - datetime.timedelta(days=days - d)
+        lines = "".join(json.dumps(_record(rng, n + k, day + datetime.timedelta(minutes=k)), ensure_ascii=False) + "\n"
+                        for k in range(per_day))
+        n += per_day
+        with gzip.open(root / f"audit_{day:%Y%m%d}.1.jsonl.gz", "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write(lines)
+    return n
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    res: Dict[str, Dict[str, Any]] = {}
+    rng = random.Random(1)
+    rec = _record(rng, 0, datetime.datetime.utcnow())
+    n_threads, per_thread = 8, (50 if quick else 250)
+    with tempfile.TemporaryDirectory() as d:
+        root = pathlib.Path(d)
+        res["audit_log/write/legacy"] = {**measure(lambda: _threads(lambda k: _legacy_write(root, rec), n_threads, per_thread),
+                                                   repeat=3, warmup=0), "records": n_threads * per_thread}
+        w = AuditLogWriter(root / "buf", flush_sec=0.5, batch=64)
+
+        def buffered():
+            _threads(lambda k: w.write(rec), n_threads, per_thread)
+            w.flush()
+        res["audit_log/write/buffered"] = {**measure(buffered, repeat=3, warmup=0), "records": n_threads * per_thread}
+
+    days, per_day = (120, 20) if quick else (3 * 365, 40)
+    with tempfile.TemporaryDirectory() as d:
+        root = pathlib.Path(d)
+        total = _history(root, days, per_day)
+        since = datetime.datetime(2026, 7, 1)
+
+        def scan():
+            out = []
+            for fp in iter_log_files(root):
+                for r in iter_records(fp):
+                    if r["timestamp"] < f"{since:%Y-%m-%dT%H:%M:%SZ}":
+                        continue
+                    out += [f for f in r.get("findings", [])
+                            if f["result"] == "Cat.1" and (f["clause"] == "8.1" or f["clause"].startswith("8.1."))]
+            return out
+        store = AuditStore(root)
+        t0 = time.perf_counter()
+        store.sync()
+        sync_ms = round((time.perf_counter() - t0) * 1000, 1)
+        n_hits = len(scan())
+        assert len(store.query_findings(clause="8.1", result="Cat.1", since=since, limit=10**9)) == n_hits
+        info = {"audits": total, "files": days, "hits": n_hits}
+        res["audit_log/query/scan"] = {**measure(scan, repeat=3 if quick else 5, warmup=0), **info}
+        res["audit_log/query/rollup"] = {**measure(lambda: store.query_findings(clause="8.1", result="Cat.1", since=since,
+                                                                                limit=10**9), repeat=10), **info,
+                                         "sync_ms": sync_ms}
+        t0 = time.perf_counter()
+        store.sync()
+        res["audit_log/query/rollup"]["resync_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("audit_log", run))
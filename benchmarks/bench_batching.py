@@ -0,0 +1,77 @@
+# benchmarks/bench_batching.py — v0.8 (마이크로 배칭 처리량: tokens/sec)
+# 병렬 슬롯이 있는 모의 Ollama(--parallel)에 조항 그룹/청크 프롬프트 N개를 보낸다.
+#   sequential : 기존 방식 — OllamaBackend.generate 를 한 번에 하나씩
+#   batched    : BatchingBackend — 호출측은 동시에 던지고, 창 안에 모인 요청을 슬롯 수만큼 동시 전송
+#   batched_dup: 같은 프롬프트가 섞인 경우(재시도·중복 청크) — 배치 안에서 1회로 합쳐짐
+#   python benchmarks/bench_batching.py --prompts 32 --parallel 4 --token-rate 150
+import time, argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from _harness import print_results, save_results
+from llm_backends import OllamaBackend, BatchingBackend
+from mock_llm_server import MockConfig, start_mock_server
+
+SYSTEM = "당신은 ISO45001:2018 내부심사 지원 AI입니다. 반드시 하나의 JSON 객체를 출력합니다."
+
+def _prompts(n: int, dup_every: int = 0) -> List[str]:
+    out = []
+    for i in range(n):
+        j = i - (i % dup_every) if dup_every else i
+        out.append(f"조항 힌트: {4 + j % 7}.1\n증거 요약:\n[청크 {j}] 작업허가서, TBM, 보호구 점검 기록\n위 스키마를 따라 findings를 3~6개 내로 작성.")
+    return out
+
+def _run(srv, fn, prompts: List[str]) -> Dict[str, Any]:
+    base = dict(srv.state.stats)
+    t0 = time.perf_counter()
+    results = fn(prompts)
+    wall = time.perf_counter() - t0
+    tokens = srv.state.stats["tokens_out"] - base["tokens_out"]
+    calls = srv.state.stats["requests"] - base["requests"]
+    ok = sum(1 for r in results if r.get("findings"))
+    return {"unit": "ms", "repeat": 1, "number": len(prompts), "min": round(wall * 1000, 2),
+            "median": round(wall * 1000, 2), "mean": round(wall * 1000, 2), "p95": round(wall * 1000, 2), "stdev": 0.0,
+            "tokens_per_sec": round(tokens / wall, 1), "requests_per_sec": round(len(prompts) / wall, 2),
+            "server_calls": calls, "ok": ok, "server_max_slots": srv.state.stats["max_in_flight"]}
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="BatchingBackend vs 순차 OllamaBackend.generate (tokens/sec)")
+    ap.add_argument("--prompts", type=int, default=32)
+    ap.add_argument("--parallel", type=int, default=4, help="모의 서버 병렬 슬롯(OLLAMA_NUM_PARALLEL)")
+    ap.add_argument("--token-rate", type=float, default=150.0, help="슬롯당 출력 토큰/초")
+    ap.add_argument("--latency", type=float, default=0.05, help="프롬프트 처리(첫 토큰) 지연")
+    ap.add_argument("--window-ms", type=float, default=10.0)
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--no-save", action="store_true")
+    args = ap.parse_args(argv)
+
+    srv = start_mock_server(cfg=MockConfig(latency=args.latency, jitter=0.0, token_rate=args.token_rate,
+                                           parallel=args.parallel, findings=4))
+    plain = OllamaBackend(base_url=srv.url, model="mock", timeout=120)
+    batched = BatchingBackend(OllamaBackend(base_url=srv.url, model="mock", timeout=120),
+                              slots=args.parallel, window_ms=args.window_ms)
+
+    def sequential(prompts):
+        return [plain.generate(SYSTEM, p) for p in prompts]
+
+    def concurrent(prompts):
+        # map-reduce/배치 심사처럼 호출측이 한꺼번에 던지는 상황
+        with ThreadPoolExecutor(max_workers=len(prompts)) as ex:
+            return list(ex.map(lambda p: batched.generate(SYSTEM, p), prompts))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, fn, prompts in (("sequential", sequential, _prompts(args.prompts)),
+                              ("batched", concurrent, _prompts(args.prompts)),
+                              ("batched_dup", concurrent, _prompts(args.prompts, dup_every=2))):
+        srv.state.stats["max_in_flight"] = 0
+        key = f"batching/{name}/n{args.prompts}/p{args.parallel}"
+        results[key] = _run(srv, fn, prompts)
+        print_results({key: results[key]})
+    print(f"batcher stats: {batched.stats}")
+    srv.shutdown()
+    if not args.no_save:
+        print(f"→ {save_results(results, 'batching', args.out)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
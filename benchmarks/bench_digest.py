@@ -0,0 +1,43 @@
+# benchmarks/bench_digest.py — v0.8 (증거 요약: 번들 심사자료 PDF/JPG)
+#   python benchmarks/bench_digest.py [--quick]
+import tempfile
+from typing import Any, Dict
+
+from _harness import EVIDENCE_DIR, measure, main_for
+from iso_audit.pipeline import collect_files
+from ingestion.evidence_parser import digest_file
+from ingestion.evidence_digest import digest_files
+from utils.digest_cache import DigestCache
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    items = collect_files(EVIDENCE_DIR)
+    pdfs = [it for it in items if it[0].lower().endswith(".pdf")]
+    imgs = [it for it in items if not it[0].lower().endswith(".pdf")]
+    rep = 2 if quick else 5
+    info = {"files": len(items), "bytes": sum(len(b) for _, b in items)}
+    res: Dict[str, Dict[str, Any]] = {}
+
+    res["digest_file/pdf_each"] = {**measure(lambda: [digest_file(n, b) for n, b in pdfs], repeat=rep), "files": len(pdfs)}
+    res["digest_file/jpg_each"] = {**measure(lambda: [digest_file(n, b) for n, b in imgs], repeat=rep), "files": len(imgs)}
+    # 캐시 없이 전체(프로세스 풀 포함) — 콜드 경로
+    res["digest_files/cold_pool"] = {**measure(lambda: digest_files(items, cache=DigestCache(cache_dir="")),
+                                               repeat=rep, warmup=0 if quick else 1), **info}
+    # 워커 1개(무거운 파일도 항상 워커 프로세스에서 처리되므로 순차 처리 + 프로세스 비용)
+    res["digest_files/cold_1worker"] = {**measure(lambda: digest_files(items, cache=DigestCache(cache_dir=""), max_workers=1),
+                                                  repeat=rep), **info}
+    # 같은 파일 재업로드(Streamlit 재실행) — 메모리 캐시 적중
+    warm = DigestCache(cache_dir="")
+    digest_files(items, cache=warm)
+    res["digest_files/warm_memory"] = {**measure(lambda: digest_files(items, cache=warm), repeat=rep * 2), **info}
+    # 프로세스 재시작 후 — 디스크 캐시 적중
+    with tempfile.TemporaryDirectory() as d:
+        digest_files(items, cache=DigestCache(cache_dir=d))
+        res["digest_files/warm_disk"] = {**measure(lambda: digest_files(items, cache=DigestCache(cache_dir=d)),
+                                                   repeat=rep * 2), **info}
+    if not quick:
+        res["digest_files/ocr_cold_pool"] = {**measure(lambda: digest_files(items, enable_ocr=True, cache=DigestCache(cache_dir="")),
+                                                       repeat=3, warmup=0), **info}
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("digest", run))
@@ -0,0 +1,38 @@
+# benchmarks/bench_e2e.py — v0.8 (종단간: 심사자료 → 요약 → 선택 → 지연 스텁 LLM → CSV/로그)
+# 네트워크 없이 지연(STUB_LATENCY, 기본 0.2s)을 흉내 내는 StubBackend로 모드별 벽시계 시간을 잰다.
+#   python benchmarks/bench_e2e.py [--quick]
+import os, tempfile
+from typing import Any, Dict
+
+from _harness import EVIDENCE_DIR, StubBackend, measure, main_for
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    latency = float(os.getenv("STUB_LATENCY", "0.2"))
+    rep = 2 if quick else 5
+    res: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # 작업 트리의 캐시/로그를 건드리지 않도록 임시 경로로(싱글턴 생성 전에 지정)
+        os.environ["LLM_CACHE_PATH"] = os.path.join(tmp, "llm.sqlite")
+        os.environ["DIGEST_CACHE_DIR"] = os.path.join(tmp, "digest")
+        from iso_audit.pipeline import CHECKLIST_CSV, collect_files, run_audit
+        from utils.audit_logic import read_csv_utf8sig
+
+        items = collect_files(EVIDENCE_DIR)
+        df_check = read_csv_utf8sig(str(CHECKLIST_CSV))
+        log_dir = os.path.join(tmp, "logs")
+        for mode in ("single", "batch", "map-reduce"):
+            backend = StubBackend(latency=latency, jitter=0.2, seed=1)
+
+            def _run(bypass: bool):
+                return run_audit(items, backend=backend, mode=mode, bypass_cache=bypass,
+                                 log_dir=log_dir, df_check=df_check)
+            calls0 = backend.calls
+            cold = measure(lambda: _run(True), repeat=rep)
+            calls = (backend.calls - calls0) // (rep + 1)
+            res[f"e2e/{mode}/llm_uncached"] = {**cold, "llm_calls": calls, "stub_latency_s": latency,
+                                               "files": len(items)}
+            res[f"e2e/{mode}/llm_cached"] = {**measure(lambda: _run(False), repeat=rep), "files": len(items)}
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("e2e", run))
@@ -0,0 +1,97 @@
+# benchmarks/bench_import.py — v0.8 (콜드 스타트 import 시간 측정)
+# 새 파이썬 프로세스에서 `import app` 등을 반복 측정(-X importtime)해 JSON으로 기록한다.
+# 무거운 선택 의존성이 다시 모듈 로드 시점으로 올라오면 --max-ms / lazy 검사로 실패 처리.
+#   python benchmarks/bench_import.py                 # app, iso_audit.cli
+#   python benchmarks/bench_import.py --max-ms 900    # 예산 초과 시 exit 1
+import sys, json, time, argparse, statistics, subprocess, pathlib, datetime
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+DEFAULT_MODULES = ("app", "iso_audit.cli")
+# 기능을 처음 쓸 때까지 import 되면 안 되는 모듈
+LAZY_MODULES = ("matplotlib", "PIL", "PyPDF2", "pytesseract", "httpx", "tiktoken",
+                "sentence_transformers", "openai", "docx")
+
+_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import {mod}
+dt = time.perf_counter() - t
+print(json.dumps({{"sec": dt, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def _run(mod: str, importtime: bool = False):
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE.format(mod=mod, lazy=LAZY_MODULES)]
+    p = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if p.returncode != 0:
+        raise RuntimeError(f"import {mod} 실패:\n{p.stderr[-2000:]}")
+    return json.loads(p.stdout.strip().splitlines()[-1]), p.stderr
+
+def _top_modules(importtime_log: str, n: int = 15):
+    """-X importtime 출력에서 누적 시간이 큰 최상위(직접 import) 모듈."""
+    rows = []
+    for line in importtime_log.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        depth = (len(parts[2]) - len(parts[2].lstrip()) - 1) // 2  # 형식: " " + "  "*depth + name
+        if depth <= 1:
+            rows.append({"module": parts[2].strip(), "cumulative_ms": round(int(parts[1]) / 1000, 1)})
+    return sorted(rows, key=lambda r: -r["cumulative_ms"])[:n]
+
+def bench(mod: str, repeat: int = 5):
+    _run(mod)  # 워밍업(.pyc 생성)
+    times, loaded = [], []
+    for _ in range(repeat):
+        res, _ = _run(mod)
+        times.append(res["sec"] * 1000)
+        loaded = res["loaded"]
+    _, log = _run(mod, importtime=True)
+    return {
+        "module": mod, "repeat": repeat,
+        "median_ms": round(statistics.median(times), 1), "min_ms": round(min(times), 1),
+        "max_ms": round(max(times), 1), "eager_heavy_modules": loaded,
+        "top_imports": _top_modules(log),
+    }
+
+def run(quick: bool = False):
+    """run_all.py/compare.py 용: 다른 스위트와 같은 측정 dict 형식."""
+    out = {}
+    for m in DEFAULT_MODULES:
+        r = bench(m, 3 if quick else 5)
+        out[f"import/{m}"] = {"unit": "ms", "repeat": r["repeat"], "number": 1, "min": r["min_ms"],
+                              "median": r["median_ms"], "mean": r["median_ms"], "p95": r["max_ms"], "stdev": 0.0,
+                              "eager_heavy": ",".join(r["eager_heavy_modules"]) or "-"}
+    return out
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="import 시간 벤치마크")
+    ap.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--max-ms", type=float, default=None, help="median import 시간 상한(ms)")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로(기본 benchmarks/results/import_<UTC>.json)")
+    args = ap.parse_args(argv)
+
+    results = [bench(m, args.repeat) for m in args.modules]
+    failed = False
+    for r in results:
+        flag = ""
+        if r["eager_heavy_modules"]:
+            flag += f"  ! eager: {','.join(r['eager_heavy_modules'])}"
+            failed = True
+        if args.max_ms is not None and r["median_ms"] > args.max_ms:
+            flag += f"  ! > {args.max_ms:g}ms"
+            failed = True
+        print(f"{r['module']:<20} median {r['median_ms']:8.1f} ms  (min {r['min_ms']}, max {r['max_ms']}){flag}")
+        for t in r["top_imports"][:5]:
+            print(f"    {t['cumulative_ms']:8.1f} ms  {t['module']}")
+
+    out = pathlib.Path(args.out) if args.out else RESULTS_DIR / f"import_{datetime.datetime.utcnow():%Y%m%dT%H%M%SZ}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"bench": "import", "python": sys.version.split()[0], "time": time.time(),
+                               "results": results}, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"→ {out}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
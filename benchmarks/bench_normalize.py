@@ -0,0 +1,49 @@
+# benchmarks/bench_normalize.py — v0.8 (LLM 출력 정규화: 대형/깨진 응답)
+#   python benchmarks/bench_normalize.py [--quick]
+import json, random
+from typing import Any, Dict
+
+from _harness import measure, main_for
+from utils.audit_logic import normalize_findings_json
+from utils.stream_parser import FindingsStreamParser
+from gpt5_api_client import _extract_json_from_text
+
+def _findings(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return {"findings": [{"title": f"관찰사항 {i} " + "작업허가 " * rng.randint(1, 8),
+                          "clause": rng.choice(["6.1.2", "7.2", "8.1", "8.1.2", "8.2", "9.1"]),
+                          "reason": "근거: " + "위험성평가 서명 누락 및 TBM 기록 불일치. " * rng.randint(1, 20),
+                          "result": rng.choice(["Cat.1", "Cat.2", "Y", "N"])} for i in range(n)]}
+
+def cases() -> Dict[str, str]:
+    big = json.dumps(_findings(500), ensure_ascii=False)
+    small = json.dumps(_findings(6), ensure_ascii=False)
+    chatter = "분석 결과는 다음과 같습니다. " * 2000
+    return {
+        "clean_6": small,
+        "clean_500": big,
+        "fenced_500": f"설명입니다.\n```json\n{big}\n```\n추가 설명",
+        "chatter_prefix_500": chatter + big + chatter,
+        "truncated_500": big[: len(big) * 2 // 3],                  # 토큰 한도로 잘린 응답
+        "trailing_comma_500": big[:-2] + ",]}",                      # 흔한 문법 오류
+        "no_json_200k": chatter * 5,                                 # JSON 없음(전체 스캔 최악)
+        "braces_noise_200k": ("{ 조항 } " * 20000) + small,          # 중괄호가 섞인 자유 텍스트
+    }
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    rep = 3 if quick else 7
+    res: Dict[str, Dict[str, Any]] = {}
+    for name, text in cases().items():
+        n = {"chars": len(text), "findings": len(normalize_findings_json(text)["findings"])}
+        res[f"normalize/{name}"] = {**measure(lambda: normalize_findings_json(text), repeat=rep), **n}
+        res[f"extract_json/{name}"] = {**measure(lambda: _extract_json_from_text(text), repeat=rep)}
+
+        def _stream():
+            p = FindingsStreamParser()
+            for i in range(0, len(text), 64):
+                p.feed(text[i:i + 64])
+        res[f"stream_parser/{name}"] = {**measure(_stream, repeat=rep)}
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("normalize", run))
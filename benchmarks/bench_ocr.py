@@ -0,0 +1,145 @@
+# benchmarks/bench_ocr.py — v0.8 (OCR 전처리: 휴대폰 사진 크기의 조선소 이미지)
+#   python benchmarks/bench_ocr.py [--quick]
+#   OCR_BENCH_FONT=/usr/share/fonts/truetype/nanum/NanumGothic.ttf python benchmarks/bench_ocr.py   # 한글 표지판으로 측정
+# - 입력: 심사자료/조선소 이미지 각 장에 정답 문구 표지판을 붙이고 긴 변 4032px(12MP)로 키운 뒤
+#   EXIF Orientation=6(세로 촬영)으로 저장 → 회전 보정·축소·영역 검출 경로 전체를 지난다
+# - preprocess : 회전 보정 + draft 디코딩 + 텍스트 영역 검출 + 이진화(OCR 없음). ocr_mpx = tesseract에 넘기는 화소 수,
+#                text_recall = 정답 줄 상자 면적 중 tesseract에 넘긴 영역에 들어간 비율(페이지 전체로 넘긴 장은 1),
+#                text_px_min/median = tesseract 입력(축소 후)에서 정답 줄 높이(px, 영역에서 빠진 줄은 0),
+#                legible = 그 높이가 LEGIBLE_PX 이상인 정답 줄 비율 — 페이지 전체로 넘긴 장도 축소 후 실제로 측정,
+#                page_fallback = 영역이 없거나 OCR_MAX_REGIONS개를 다 채워 페이지 전체로 넘긴 장 수
+# - full / preprocessed : tesseract 실행 시간과 문자 정확도(char_acc = 정답 문자 중 순서대로 일치한 비율)
+#                         — tesseract 바이너리가 없으면 건너뜀
+import os, io, difflib
+from typing import Any, Dict, List, Tuple
+
+from _harness import measure, main_for, EVIDENCE_DIR
+from utils.optional_deps import optional_import
+from ingestion.evidence_parser import _ocr_image
+from ingestion.ocr_preprocess import ocr_settings, prepare_for_ocr, load_gray, text_regions, tesseract_config
+
+IMAGE_DIR = EVIDENCE_DIR / "조선소 이미지"
+PHONE_SIDE = 4032
+LEGIBLE_PX = 20     # tesseract가 안정적으로 읽는 최소 글자(줄) 높이
+LINES = {"eng": ["SAFETY FIRST - HARD HAT AREA", "HOT WORK PERMIT No. 2026-0147", "LOCKOUT / TAGOUT REQUIRED"],
+         "kor+eng": ["안전제일 - 안전모 착용 구역", "화기작업 허가서 No. 2026-0147", "LOCKOUT / TAGOUT 필수"]}
+
+def _font(size: int):
+    ImageFont = optional_import("PIL.ImageFont")
+    path = os.getenv("OCR_BENCH_FONT")
+    return (ImageFont.truetype(path, size), "kor+eng") if path else (ImageFont.load_default(size), "eng")
+
+def phone_photo(path, font_px: int = 20) -> Tuple[bytes, List[Tuple[float, ...]], str, str]:
+    """사진 + 정답 표지판 → (12MP JPEG bytes(EXIF 회전), 정답 줄 상자(세운 영상 비율 좌표), 정답 문구, 언어)."""
+    Image = optional_import("PIL.Image")
+    ImageDraw = optional_import("PIL.ImageDraw")
+    im = Image.open(path).convert("RGB")
+    font, lang = _font(font_px)
+    lines = LINES[lang]
+    step = int(font_px * 1.6)
+    w = max(font.getbbox(t)[2] for t in lines) + 2 * font_px
+    x, y = im.width // 10, im.height // 2
+    draw = ImageDraw.Draw(im)
+    draw.rectangle((x, y, x + w, y + len(lines) * step + font_px), fill=(232, 230, 220))
+    boxes = []
+    for i, t in enumerate(lines):
+        tx, ty = x + font_px, y + font_px // 2 + i * step
+        draw.text((tx, ty), t, fill=(25, 25, 25), font=font)
+        l, tp, r, b = font.getbbox(t)
+        boxes.append(((tx + l) / im.width, (ty + tp) / im.height, (tx + r) / im.width, (ty + b) / im.height))
+    r = PHONE_SIDE / max(im.size)
+    big = im.resize((round(im.width * r), round(im.height * r)), Image.BICUBIC).transpose(Image.ROTATE_90)
+    exif = Image.Exif()
+    exif[0x0112] = 6    # 보기 전에 시계 방향 90도 회전
+    buf = io.BytesIO()
+    big.save(buf, "JPEG", quality=90, exif=exif)
+    return buf.getvalue(), boxes, "\n".join(lines), lang
+
+def _legibility(b: bytes, boxes, cfg, prep) -> Tuple[float, List[float]]:
+    """(정답 줄 상자 면적 중 tesseract에 넘긴 영역에 든 비율, 줄마다 tesseract 입력에서의 글자 높이 px — 빠졌으면 0)."""
+    np = optional_import("numpy")
+    gray, _ = load_gray(b, cfg["max_side"])
+    W, H = gray.width, gray.height
+    if prep["mode"] == "page":
+        found = [((0, 0, W, H), prep["scales"][0])]
+    else:   # prepare_for_ocr와 같은 검출 결과·순서
+        found = [(box, r) for (box, _), r in zip(text_regions(gray, cfg), prep["scales"])]
+    mask = np.zeros((H, W), bool)
+    for (x0, y0, x1, y1), _ in found:
+        mask[y0:y1, x0:x1] = True
+    covered = total = 0
+    heights = []
+    for bx in boxes:
+        x0, y0, x1, y1 = (round(v * s) for v, s in zip(bx, (W, H) * 2))
+        covered += int(mask[y0:y1, x0:x1].sum())
+        total += (x1 - x0) * (y1 - y0)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        r = next((r for (a0, b0, a1, b1), r in found if a0 <= cx < a1 and b0 <= cy < b1), 0.0)
+        heights.append(round((y1 - y0) * r, 1))
+    return covered / max(1, total), heights
+
+def char_acc(truth: str, text: str) -> float:
+    """정답 문자 중 OCR 결과에 순서대로 나타난 비율(공백 무시, 다른 영역의 잡음 글자는 감점하지 않음)."""
+    a, b = "".join(truth.split()), "".join((text or "").split())
+    m = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return round(sum(blk.size for blk in m.get_matching_blocks()) / max(1, len(a)), 3)
+
+def _tesseract():
+    pytesseract = optional_import("pytesseract")
+    try:
+        pytesseract.get_tesseract_version()
+        return pytesseract
+    except Exception:
+        return None
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    if optional_import("numpy") is None or optional_import("PIL.Image") is None:
+        print("numpy/Pillow 미설치 → 건너뜀")
+        return {}
+    paths = sorted(p for p in IMAGE_DIR.iterdir() if p.suffix.lower() in (".jpg", ".jpeg"))[:3 if quick else None]
+    cases = [phone_photo(p) for p in paths]
+    blobs = [c[0] for c in cases]
+    cfg = ocr_settings()
+    Image = optional_import("PIL.Image")
+    rep = 2 if quick else 3
+    res: Dict[str, Dict[str, Any]] = {}
+    preps = [prepare_for_ocr(b, cfg)[1] for b in blobs]
+    leg = [_legibility(b, c[1], cfg, p) for b, c, p in zip(blobs, cases, preps)]
+    heights = sorted(h for _, hs in leg for h in hs)
+    info = {"images": len(blobs), "phone_side": PHONE_SIDE, "lang": cases[0][3], "binarize": cfg["binarize"],
+            "full_mpx": round(sum(w * h for w, h in (Image.open(io.BytesIO(b)).size for b in blobs)) / 1e6, 1)}
+    res["ocr/preprocess"] = {**measure(lambda: [prepare_for_ocr(b, cfg) for b in blobs], repeat=rep), **info,
+                             "ocr_mpx": round(sum(p["ocr_px"] for p in preps) / 1e6, 2),
+                             "regions": sum(p["regions"] for p in preps),
+                             "page_fallback": sum(p["mode"] == "page" for p in preps),
+                             "text_recall": round(sum(r for r, _ in leg) / len(leg), 3),
+                             "text_px_min": heights[0], "text_px_median": heights[len(heights) // 2],
+                             "legible": round(sum(h >= LEGIBLE_PX for h in heights) / len(heights), 3)}
+    if res["ocr/preprocess"]["page_fallback"] == len(blobs):
+        print(f"영역 crop이 한 장도 적용되지 않음(모두 페이지 전체) → 이득은 회전 보정·긴 변 {cfg['max_side']}px 축소뿐")
+    pytesseract = _tesseract()
+    if pytesseract is None:
+        print("tesseract 바이너리 없음 → OCR 시간/정확도 측정 건너뜀 (apt install tesseract-ocr tesseract-ocr-kor)")
+        return res
+    ImageOps = optional_import("PIL.ImageOps")
+    lang = cases[0][3]
+
+    def full():
+        # 이전 경로: 원본 해상도 그대로(회전 보정 없이) image_to_string
+        return [pytesseract.image_to_string(Image.open(io.BytesIO(b)), lang=lang) for b in blobs]
+
+    def full_upright():
+        return [pytesseract.image_to_string(ImageOps.exif_transpose(Image.open(io.BytesIO(b))), lang=lang) for b in blobs]
+
+    def pre():
+        return [_ocr_image(pytesseract, b, lang, 800, cfg) for b in blobs]
+    for name, fn in (("full", full), ("full_upright", full_upright), ("preprocessed", pre)):
+        texts = fn()
+        res[f"ocr/{name}"] = {**measure(fn, repeat=1 if name.startswith("full") else rep, warmup=0), **info,
+                              "tesseract": tesseract_config(cfg) if name == "preprocessed" else "default",
+                              "char_acc": round(sum(char_acc(c[2], t) for c, t in zip(cases, texts)) / len(cases), 3)}
+    res["ocr/preprocessed"]["speedup"] = round(res["ocr/full"]["median"] / res["ocr/preprocessed"]["median"], 1)
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("ocr", run))
@@ -0,0 +1,81 @@
+# benchmarks/bench_prefix.py — v0.8 (접두사 고정 프롬프트: 반복 심사 TTFT)
+# 같은 조항을 증거만 바꿔 반복 심사하는 상황. 검색/점수 선택은 심사마다 행 순서를 바꾸는데,
+#   legacy   : 선택 순서 그대로 행을 json.dumps + "[SYSTEM]..[USER].." 한 문자열(이전 레이아웃)
+#   canonical: build_system_prompt(조항·제목 순 정규화) + Ollama system 필드
+# 모의 서버가 최근 프롬프트와의 공통 접두사만큼 prefill을 건너뛰므로(KV 캐시 흉내) TTFT 차이가 드러난다.
+#   python benchmarks/bench_prefix.py --audits 12 --prefill-rate 400
+import json, time, random, argparse, statistics
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from _harness import CHECKLIST_CSV, print_results, save_results
+from llm_backends import OllamaBackend
+from mock_llm_server import MockConfig, start_mock_server
+from utils.audit_logic import read_csv_utf8sig, select_relevant_rows, build_system_prompt, build_user_prompt, col_or_default
+
+def legacy_system_prompt(context_rows: pd.DataFrame, iso_version="ISO45001:2018", max_rows: int = 12) -> str:
+    """v0.7.3 레이아웃(행 순서 = 선택 순서, 체크리스트에 열이 모두 있을 때의 동작)."""
+    head = pd.DataFrame({k: col_or_default(context_rows, k, "").head(max_rows).tolist()
+                         for k in ("title", "clause", "question", "evidence_type")}).to_dict(orient="records")
+    return (f"당신은 {iso_version} 내부심사 지원 AI입니다. 반드시 하나의 JSON 객체를 출력합니다. 스키마: "
+            '{"findings":[{"title":"...","clause":"6.1.2","reason":"...","result":"Cat.1|Cat.2|Y|N"}]} '
+            "각 항목은 조항 적합성/위험/근거를 간결하게 요약하세요. "
+            f"컨텍스트 예시: {json.dumps(head, ensure_ascii=False)}")
+
+class LegacyOllama(OllamaBackend):
+    def _payload(self, system: str, user: str) -> Dict[str, Any]:
+        return {"model": self.model, "prompt": f"[SYSTEM]\n{system}\n\n[USER]\n{user}", "stream": False}
+
+def _ttft(backend, system: str, user: str) -> float:
+    t0 = time.perf_counter()
+    for _ in backend.stream(system, user):
+        return (time.perf_counter() - t0) * 1000
+    return (time.perf_counter() - t0) * 1000
+
+def _stats(xs: List[float], extra: Dict[str, Any]) -> Dict[str, Any]:
+    xs_sorted = sorted(xs)
+    return {"unit": "ms", "repeat": len(xs), "number": 1, "min": round(xs_sorted[0], 2),
+            "median": round(statistics.median(xs), 2), "mean": round(statistics.fmean(xs), 2),
+            "p95": round(xs_sorted[min(len(xs) - 1, int(0.95 * len(xs)))], 2),
+            "stdev": round(statistics.pstdev(xs), 2), **extra}
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="legacy vs canonical 프롬프트 레이아웃 TTFT")
+    ap.add_argument("--audits", type=int, default=12)
+    ap.add_argument("--clause", default="", help="빈 값이면 전체 체크리스트에서 --rows개")
+    ap.add_argument("--rows", type=int, default=12)
+    ap.add_argument("--prefill-rate", type=float, default=400.0, help="모의 서버 prompt tokens/s")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--no-save", action="store_true")
+    args = ap.parse_args(argv)
+
+    df = read_csv_utf8sig(str(CHECKLIST_CSV))
+    rows = select_relevant_rows(df, args.clause).head(args.rows)
+    audits = []
+    for i in range(args.audits):
+        # 검색 유사도/점수에 따라 심사마다 달라지는 행 순서 + 심사마다 다른 증거
+        order = rows.sample(frac=1.0, random_state=i)
+        evidence = f"[현장 {i}] 작업허가서 {i}건, TBM 기록 {random.Random(i).randint(3, 30)}건, 보호구 점검표 일부 누락"
+        audits.append((order, build_user_prompt(evidence, args.clause or None)))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, backend_cls, make_system in (("legacy", LegacyOllama, legacy_system_prompt),
+                                            ("canonical", OllamaBackend, build_system_prompt)):
+        srv = start_mock_server(cfg=MockConfig(latency=0.02, jitter=0.0, token_rate=400, prefill_rate=args.prefill_rate))
+        backend = backend_cls(base_url=srv.url, model="mock", timeout=60)
+        ttfts = [_ttft(backend, make_system(order, max_rows=args.rows), user) for order, user in audits]
+        st = srv.state.stats
+        total = st["cached_tokens"] + st["prefill_tokens"]
+        key = f"prefix/{name}/repeat{args.audits - 1}"
+        # 첫 심사는 두 레이아웃 모두 캐시가 비어 있으므로 반복분만 비교
+        results[key] = _stats(ttfts[1:], {"first_ms": round(ttfts[0], 2),
+                                           "cached_ratio": round(st["cached_tokens"] / total, 3) if total else 0.0})
+        print_results({key: results[key]})
+        srv.shutdown()
+    if not args.no_save:
+        print(f"→ {save_results(results, 'prefix', args.out)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
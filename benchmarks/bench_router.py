@@ -0,0 +1,55 @@
+# benchmarks/bench_router.py — v0.8 (라우터 헤지/페일오버 효과: 단일 백엔드 대비 꼬리 지연)
+# 모의 서버 2대를 띄운다: A는 평소 빠르지만 가끔 멈추고(tail), B는 약간 느리지만 안정적.
+# 같은 요청 부하를 A 단독 / B 단독 / router(A,B) / router(A 다운,B)로 보내 p50/p95/p99를 비교한다.
+#   python benchmarks/bench_router.py --requests 200 --concurrency 8 --tail-rate 0.08 --tail-latency 2
+import argparse
+from typing import Any, Dict
+
+from _harness import print_results, save_results
+from llm_backends import OllamaBackend
+from llm_router import RouterBackend
+from mock_llm_server import MockConfig, start_mock_server
+from loadgen import run_sync
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="RouterBackend 헤지 요청 벤치마크(모의 서버 2대)")
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.05, help="A 기본 지연(초)")
+    ap.add_argument("--tail-rate", type=float, default=0.08, help="A 꼬리 지연 비율")
+    ap.add_argument("--tail-latency", type=float, default=2.0)
+    ap.add_argument("--slow-latency", type=float, default=0.12, help="B 기본 지연(초)")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--no-save", action="store_true")
+    args = ap.parse_args(argv)
+
+    a = start_mock_server(cfg=MockConfig(latency=args.latency, tail_rate=args.tail_rate, tail_latency=args.tail_latency, seed=1))
+    b = start_mock_server(cfg=MockConfig(latency=args.slow_latency, seed=2))
+    dead = "http://127.0.0.1:9"   # 연결 거부(다운된 서버)
+
+    def ollama(url):
+        return OllamaBackend(base_url=url, model="mock", timeout=30)
+
+    cases = {
+        "single_a": lambda: ollama(a.url),
+        "single_b": lambda: ollama(b.url),
+        "router_ab": lambda: RouterBackend([ollama(a.url), ollama(b.url)], labels=["a", "b"]),
+        "router_down_b": lambda: RouterBackend([ollama(dead), ollama(b.url)], labels=["down", "b"]),
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, make in cases.items():
+        backend = make()
+        r = run_sync(backend, args.requests, args.concurrency)
+        if isinstance(backend, RouterBackend):
+            snap = backend.snapshot()
+            r.update({f"{lbl}_calls": s["calls"] for lbl, s in snap.items()})
+        results[f"router/{name}/c{args.concurrency}"] = r
+        print_results({f"router/{name}/c{args.concurrency}": r})
+    a.shutdown()
+    b.shutdown()
+    if not args.no_save:
+        print(f"→ {save_results(results, 'router', args.out)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
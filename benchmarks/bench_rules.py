@@ -0,0 +1,70 @@
+# benchmarks/bench_rules.py — v0.8 (오프라인 규칙 판정: 대형 증거 요약)
+#   python benchmarks/bench_rules.py [--quick]
+# - legacy : 이전 offline_baseline(행마다 요약 전체 lower() + 키워드 11개 재검사, 모든 행 같은 등급)
+# - engine : utils/rule_engine 결합 정규식/오토마톤 1회 스캔 → 조항별 판정(컴파일은 측정 밖, compile_ms로 보고)
+# - batch_* : 일괄 심사 폴백(조항 그룹 7개가 같은 증거로 호출). 엔진은 스캔 결과를 재사용
+import random, time
+from typing import Any, Dict
+
+from _harness import measure, main_for
+from utils.audit_logic import offline_baseline, read_csv_utf8sig, col_or_default
+from utils.rule_engine import get_rule_engine, build_rules, load_presets, CLAUSE_CSV, PRESET_DIR
+from iso_audit.pipeline import CHECKLIST_CSV
+
+_LINES = ("위험성평가 평가표 서명 누락", "크레인 작업 전 lockout 절차 미흡", "비상대비 훈련 시나리오 보완 필요",
+          "내부심사 프로그램 미수립", "협력업체 계약자 선정절차 확인", "안전보건 방침 게시 및 교육기록 확인",
+          "TBM 일지 작성 완료", "MSDS 비치 상태 양호", "변경관리 승인서 일부 불일치", "화재 감지기 점검표 최신화")
+
+def _digest(n_lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "\n".join(f"[{i % 40}] {rng.choice(_LINES)}. 현장 확인 결과 특이사항 기록." for i in range(n_lines))
+
+def _legacy(context_rows, evidence_digest, clause):
+    title_series = col_or_default(context_rows, "title", "관리검토/운영 통제")
+    clause_series = col_or_default(context_rows, "clause", clause or "N/A")
+    res = []
+    for i in range(min(5, len(context_rows)) if len(context_rows) else 1):
+        obs = (evidence_digest or "").lower()
+        cat = "Y"
+        if any(k in obs for k in ["미흡", "부족", "위반", "누락", "중대", "사고"]):
+            cat = "Cat.2"
+        if any(k in obs for k in ["사망", "산재", "화재", "폭발", "중대재해"]):
+            cat = "Cat.1"
+        res.append({"title": str(title_series.iloc[i]), "clause": str(clause_series.iloc[i]),
+                    "reason": "오프라인 규칙 기반 임시 판단", "result": cat})
+    return {"findings": res}
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    df = read_csv_utf8sig(str(CHECKLIST_CSV))
+    groups = [df[df["clause"].astype(str).str.split(".").str[0] == ch] for ch in ("4", "5", "6", "7", "8", "9", "10")]
+    ctx = groups[4]
+    t0 = time.perf_counter()
+    build_rules(read_csv_utf8sig(str(CLAUSE_CSV)), load_presets(PRESET_DIR))
+    compile_ms = round((time.perf_counter() - t0) * 1000, 1)
+    engine = get_rule_engine()
+
+    def cold(fn):
+        def _run():
+            engine._memo.clear()   # 매 반복 처음부터 스캔
+            return fn()
+        return _run
+    res: Dict[str, Dict[str, Any]] = {}
+    for n_lines in ((200, 5000) if quick else (200, 5000, 50000)):
+        text = _digest(n_lines)
+        info = {"chars": len(text), "terms": len(engine.terms), "scanner": engine.backend}
+        legacy = _legacy(ctx, text, "8")["findings"]
+        out = offline_baseline(ctx, text, "8")["findings"]
+        res[f"rules/legacy/{n_lines}"] = {**measure(lambda: _legacy(ctx, text, "8"), repeat=5), **info,
+                                          "distinct_results": len({f["result"] for f in legacy})}
+        res[f"rules/engine/{n_lines}"] = {**measure(cold(lambda: offline_baseline(ctx, text, "8")), repeat=5), **info,
+                                          "compile_ms": compile_ms, "distinct_results": len({f["result"] for f in out}),
+                                          "clauses": len({f["clause"] for f in out})}
+        # 일괄 심사 폴백: 백엔드가 내려가면 조항 그룹(7개)마다 같은 증거로 호출
+        res[f"rules/batch_legacy/{n_lines}"] = {**measure(lambda: [_legacy(g, text, "") for g in groups], repeat=3),
+                                                **info, "groups": len(groups)}
+        res[f"rules/batch_engine/{n_lines}"] = {**measure(cold(lambda: [offline_baseline(g, text, "") for g in groups]),
+                                                          repeat=3), **info, "groups": len(groups)}
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("rules", run))
@@ -0,0 +1,50 @@
+# benchmarks/bench_selection.py — v0.8 (행 선택/시스템 프롬프트: 실제 CSV와 100배 확장본)
+#   python benchmarks/bench_selection.py [--quick]
+import json, tempfile
+from typing import Any, Dict
+import pandas as pd
+
+from _harness import CHECKLIST_CSV, CLAUSE_CSV, ROOT, measure, main_for
+from utils.audit_logic import read_csv_utf8sig, select_relevant_rows, build_system_prompt
+from utils.row_index import build_checklist_index
+from utils.retrieval import build_retriever, retrieve_rows
+from utils.prompt_budget import assemble_prompt
+
+EVIDENCE = ("크레인 리프팅 작업 전 TBM 실시, PPE 착용 확인. 위험성평가 기록 일부 서명 누락. "
+            "화재 대비 소방 설비 점검표 최신화 필요. lockout/tagout 절차서 개정 이력 확인.") * 4
+
+def scaled(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """행을 factor배 복제(질문 끝에 번호를 붙여 중복 문자열이 되지 않게)."""
+    out = pd.concat([df] * factor, ignore_index=True)
+    out["question"] = out["question"].astype(str) + " #" + (out.index // len(df)).astype(str)
+    return out
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    preset = json.loads((ROOT / "presets" / "lm2500_profile.json").read_text(encoding="utf-8"))
+    weights = preset["keywords_weight"]
+    base = read_csv_utf8sig(str(CHECKLIST_CSV))
+    df_clause = read_csv_utf8sig(str(CLAUSE_CSV))
+    rep = 3 if quick else 7
+    res: Dict[str, Dict[str, Any]] = {}
+    for label, df in (("real", base), ("x100", scaled(base, 100))):
+        n = {"rows": len(df)}
+        idx = build_checklist_index(df)
+        res[f"select/{label}/scan_weighted"] = {**measure(lambda: select_relevant_rows(df, "", weights), repeat=rep), **n}
+        res[f"select/{label}/scan_clause"] = {**measure(lambda: select_relevant_rows(df, "8.1", weights), repeat=rep), **n}
+        res[f"select/{label}/index_weighted"] = {**measure(lambda: select_relevant_rows(df, "", weights, index=idx), repeat=rep), **n}
+        res[f"select/{label}/index_clause"] = {**measure(lambda: select_relevant_rows(df, "8.1", weights, index=idx), repeat=rep), **n}
+        res[f"select/{label}/index_build"] = {**measure(lambda: build_checklist_index(df), repeat=rep), **n}
+        ctx = select_relevant_rows(df, "", weights, index=idx)
+        res[f"system_prompt/{label}/head12"] = {**measure(lambda: build_system_prompt(ctx), repeat=rep, number=20), **n}
+        res[f"system_prompt/{label}/all_rows"] = {**measure(lambda: build_system_prompt(ctx, max_rows=len(ctx)),
+                                                            repeat=rep), **n}
+        res[f"budget/{label}/assemble_6k"] = {**measure(lambda: assemble_prompt(ctx, [EVIDENCE], "8.1", 6000, df_clause),
+                                                        repeat=rep), **n}
+        with tempfile.TemporaryDirectory() as d:   # 인덱스 캐시(./cache/retrieval)를 실행 위치에 남기지 않음
+            retr = build_retriever(df, df_clause, cache_dir=d)
+            res[f"retrieval/{label}/top8"] = {**measure(lambda: retrieve_rows(retr, df, EVIDENCE, k=8), repeat=rep,
+                                                        number=5), **n, "method": retr.method}
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("selection", run))
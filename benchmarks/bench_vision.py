@@ -0,0 +1,121 @@
+# benchmarks/bench_vision.py — v0.8 (PPE 비전: 심사자료/조선소 이미지 처리량, CPU 전용)
+#   python benchmarks/bench_vision.py [--quick]
+#   PPE_ONNX_MODEL=./models/ppe.onnx python benchmarks/bench_vision.py   # 실제 모델로 측정
+# - 모델이 없으면 YOLOv8n급 연산량(≈8.5 GFLOPs@640)에 입출력 형식이 같은 합성 ONNX(가중치 무작위, onnx 패키지 필요)로 측정
+#   → images/sec는 전처리+추론+NMS 전체 경로의 처리량(검출 내용은 의미 없음)
+# - preprocess      : EXIF 보정 + draft 디코딩 + letterbox(스레드 풀)
+# - detect/b1       : 배치 1(이미지마다 session.run)
+# - detect/bN       : 배치 PPE_BATCH(기본 8) + 다음 배치 전처리와 추론 겹침
+# - detect/cached   : 같은 이미지 재심사(이미지 해시 캐시 적중)
+import os, tempfile, pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from _harness import measure, main_for, EVIDENCE_DIR
+from utils.optional_deps import optional_import
+from utils.digest_cache import DigestCache
+from cv.ppe_vision import PPEDetector, letterbox, IMAGE_EXTS, MODEL_PATH, BATCH, WORKERS
+
+IMAGE_DIR = EVIDENCE_DIR / "조선소 이미지"
+SYN_LABELS = ["Hardhat", "Mask", "NO-Hardhat", "NO-Mask", "NO-Safety Vest", "Person", "Safety Cone",
+              "Safety Vest", "machinery", "vehicle"]   # 공개 PPE 데이터셋(10클래스) 라벨 구성
+
+def synthetic_yolo(path: pathlib.Path, n_cls: int = len(SYN_LABELS), size: int = 640) -> float:
+    """YOLOv8 형식 출력 (N, 4+nc, 8400)의 합성 모델 저장. 반환: GFLOPs(곱셈+덧셈)."""
+    onnx = optional_import("onnx")
+    np = optional_import("numpy")
+    from onnx import helper, numpy_helper, TensorProto
+    rng = np.random.default_rng(0)
+    nodes, inits = [], []
+    flops = 0.0
+    state = {"n": 0}
+
+    def conv(x, cin, cout, k, s, hw, act=True):
+        state["n"] += 1
+        w = f"w{state['n']}"
+        inits.append(numpy_helper.from_array((rng.standard_normal((cout, cin, k, k)) * (2 / (cin * k * k)) ** 0.5)
+                                             .astype(np.float32), w))
+        y = f"c{state['n']}"
+        nodes.append(helper.make_node("Conv", [x, w], [y], kernel_shape=[k, k], strides=[s, s], pads=[k // 2] * 4))
+        nonlocal flops
+        out_hw = hw // s
+        flops += 2.0 * out_hw * out_hw * cout * cin * k * k
+        if act:
+            nodes.append(helper.make_node("Relu", [y], [y + "r"]))
+            y += "r"
+        return y, out_hw
+
+    x, hw = conv("images", 3, 16, 3, 2, size)
+    x, hw = conv(x, 16, 32, 3, 2, hw)
+    for _ in range(3):
+        x, hw = conv(x, 32, 32, 3, 1, hw)
+    feats = []
+    for cin, cout, reps in ((32, 64, 4), (64, 128, 4), (128, 256, 3)):
+        x, hw = conv(x, cin, cout, 3, 2, hw)
+        for _ in range(reps):
+            x, hw = conv(x, cout, cout, 3, 1, hw)
+        feats.append((x, cout, hw))
+    outs = []
+    for i, (f, c, fhw) in enumerate(feats):
+        h, _ = conv(f, c, 64, 3, 1, fhw)
+        h, _ = conv(h, 64, 4 + n_cls, 1, 1, fhw, act=False)
+        shape = f"s{i}"
+        inits.append(numpy_helper.from_array(np.array([0, 4 + n_cls, -1], np.int64), shape))
+        nodes.append(helper.make_node("Reshape", [h, shape], [f"o{i}"]))
+        outs.append(f"o{i}")
+    nodes.append(helper.make_node("Concat", outs, ["cat"], axis=2))
+    # 상자: sigmoid×(640, 640, 128, 128), 클래스: sigmoid(logit-4) → 후보 일부만 임계값 통과
+    bias = np.array([0, 0, 0, 0] + [-4.0] * n_cls, np.float32).reshape(1, -1, 1)
+    scale = np.array([size, size, size * 0.2, size * 0.2] + [1.0] * n_cls, np.float32).reshape(1, -1, 1)
+    inits += [numpy_helper.from_array(bias, "bias"), numpy_helper.from_array(scale, "scale")]
+    nodes += [helper.make_node("Add", ["cat", "bias"], ["logit"]), helper.make_node("Sigmoid", ["logit"], ["sig"]),
+              helper.make_node("Mul", ["sig", "scale"], ["output0"])]
+    graph = helper.make_graph(nodes, "ppe_synthetic",
+                              [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, size, size])],
+                              [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 4 + n_cls, None])],
+                              inits)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    helper.set_model_props(model, {"names": str(dict(enumerate(SYN_LABELS)))})
+    onnx.save(model, str(path))
+    return round(flops / 1e9, 2)
+
+def _images() -> List[Tuple[str, bytes]]:
+    return [(p.name, p.read_bytes()) for p in sorted(IMAGE_DIR.iterdir())
+            if p.is_file() and p.suffix.lower().lstrip(".") in IMAGE_EXTS]
+
+def run(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    if optional_import("onnxruntime") is None:
+        print("onnxruntime 미설치 → 건너뜀 (pip install onnxruntime)")
+        return {}
+    items = _images()
+    blobs = [b for _, b in items]
+    rep = 2 if quick else 5
+    res: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as d:
+        model, info = MODEL_PATH, {"model": pathlib.Path(MODEL_PATH).name}
+        if not pathlib.Path(model).is_file():
+            if optional_import("onnx") is None:
+                print(f"{MODEL_PATH} 없음, onnx 미설치 → 건너뜀")
+                return {}
+            model = str(pathlib.Path(d) / "ppe_synthetic.onnx")
+            info = {"model": "synthetic", "gflops": synthetic_yolo(pathlib.Path(model))}
+        info.update(images=len(blobs), cpus=os.cpu_count(), workers=WORKERS)
+
+        def per_sec(r):
+            return round(len(blobs) / (r["median"] / 1000), 2)
+        with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+            r = measure(lambda: list(ex.map(lambda b: letterbox(b, 640), blobs)), repeat=rep)
+        res["vision/preprocess"] = {**r, **info, "images_per_sec": per_sec(r)}
+        for batch in (1, BATCH):
+            det = PPEDetector(model, batch=batch, cache=DigestCache(4096, None))
+            r = measure(lambda: det.detect(blobs), repeat=rep, setup=lambda: det.cache._mem.clear())
+            res[f"vision/detect/b{batch}"] = {**r, **info, "batch": det.batch, "images_per_sec": per_sec(r)}
+        det = PPEDetector(model, batch=BATCH, cache=DigestCache(4096, None))
+        det.detect(blobs)
+        r = measure(lambda: det.detect(blobs), repeat=rep)
+        res["vision/detect/cached"] = {**r, **info, "images_per_sec": per_sec(r)}
+    return res
+
+if __name__ == "__main__":
+    raise SystemExit(main_for("vision", run))
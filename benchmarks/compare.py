@@ -0,0 +1,47 @@
+# benchmarks/compare.py — v0.8 (두 결과 JSON 비교 → 회귀 판정)
+#   python benchmarks/compare.py                       # results/ 의 최근 두 파일
+#   python benchmarks/compare.py base.json new.json --threshold 1.25
+# 공통 케이스의 median 비율(new/base)이 threshold를 넘으면 회귀로 표시하고 exit 1.
+import sys, json, argparse, pathlib
+
+from _harness import RESULTS_DIR
+
+def _load(path: pathlib.Path):
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    return doc.get("commit", "?"), doc.get("results", {})
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="벤치마크 결과 비교")
+    ap.add_argument("base", nargs="?")
+    ap.add_argument("new", nargs="?")
+    ap.add_argument("--threshold", type=float, default=1.2, help="회귀로 볼 median 비율")
+    ap.add_argument("--min-ms", type=float, default=0.05, help="이보다 짧은 케이스는 잡음으로 보고 판정 제외")
+    args = ap.parse_args(argv)
+    if args.base and args.new:
+        base, new = pathlib.Path(args.base), pathlib.Path(args.new)
+    else:
+        files = sorted(RESULTS_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        if len(files) < 2:
+            print("비교할 결과 파일이 2개 이상 필요합니다.", file=sys.stderr)
+            return 2
+        base, new = files[-2], files[-1]
+    (rev_a, a), (rev_b, b) = _load(base), _load(new)
+    print(f"base {base.name} ({rev_a})\nnew  {new.name} ({rev_b})\n")
+    regressions = 0
+    for name in sorted(set(a) & set(b)):
+        ma, mb = a[name]["median"], b[name]["median"]
+        ratio = mb / ma if ma else float("inf")
+        mark = ""
+        if max(ma, mb) >= args.min_ms:
+            if ratio > args.threshold:
+                mark, regressions = "  REGRESSION", regressions + 1
+            elif ratio < 1 / args.threshold:
+                mark = "  faster"
+        print(f"{name:<48} {ma:>11.3f} → {mb:>11.3f} ms  x{ratio:5.2f}{mark}")
+    for name in sorted(set(b) - set(a)):
+        print(f"{name:<48} (new) {b[name]['median']:.3f} ms")
+    print(f"\n회귀 {regressions}건 (threshold x{args.threshold:g})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+# benchmarks/loadgen.py — v0.8 (부하 생성기: 실제 Ollama/LM Studio 백엔드 코드 경로 × 모의 서버)
+# 운영 LLM 서버 대신 mock_llm_server를 띄우고(또는 --url), OllamaBackend/LMStudioBackend로 요청을 쏟아
+# 처리량(req/s)과 지연 p50/p95/p99, 오류 유형을 보고한다.
+#   python benchmarks/loadgen.py --flavor both --requests 200 --concurrency 1,4,16 --latency 0.2 --token-rate 200
+#   python benchmarks/loadgen.py --mode async --rate-limit 0.05 --error-rate 0.02
+#   python benchmarks/loadgen.py --url http://127.0.0.1:11500 --flavor ollama   # 별도 실행한 모의 서버
+#   python benchmarks/loadgen.py --flavor openai --rpm 120 --requests 200 --concurrency 16   # Responses + 적응형 limiter
+import os, time, asyncio, argparse, statistics, threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from typing import Any, Dict, List, Tuple
+
+from _harness import print_results, save_results
+from llm_backends import OllamaBackend, LMStudioBackend, OpenAIBackend
+from utils.audit_logic import normalize_findings_json
+from mock_llm_server import MockConfig, start_mock_server
+
+SYSTEM = "당신은 ISO45001:2018 내부심사 지원 AI입니다. 반드시 하나의 JSON 객체를 출력합니다."
+
+def _user(i: int) -> str:
+    return f"조항 힌트: 8.1\n증거 요약:\n[요청 {i}] 크레인 리프팅 작업 전 TBM 기록, PPE 착용 점검표\n위 스키마를 따라 findings를 3~6개 내로 작성."
+
+def _classify(e: Exception) -> str:
+    resp = getattr(e, "response", None)
+    code = getattr(resp, "status_code", None)
+    if code == 429:
+        return "http_429"
+    if code is not None and code >= 500:
+        return "http_5xx"
+    return type(e).__name__
+
+def _pct(xs: List[float], q: float) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))]
+
+def _summary(lat_ms: List[float], outcomes: Dict[str, int], wall: float, ttft_ms: List[float]) -> Dict[str, Any]:
+    """지연 분위수는 응답을 받은 요청(ok/malformed)만 — 즉시 실패한 요청이 분위수를 끌어내리지 않게."""
+    n = sum(outcomes.values())
+    out = {
+        "unit": "ms", "repeat": n, "number": 1,
+        "min": round(min(lat_ms), 2) if lat_ms else 0.0, "median": round(_pct(lat_ms, 0.5), 2),
+        "mean": round(statistics.fmean(lat_ms), 2) if lat_ms else 0.0,
+        "p95": round(_pct(lat_ms, 0.95), 2), "p99": round(_pct(lat_ms, 0.99), 2),
+        "max": round(max(lat_ms), 2) if lat_ms else 0.0,
+        "stdev": round(statistics.pstdev(lat_ms), 2) if lat_ms else 0.0,
+        "throughput_rps": round(n / wall, 2) if wall else 0.0,
+        "ok_rps": round(outcomes.get("ok", 0) / wall, 2) if wall else 0.0,
+        "wall_s": round(wall, 3),
+    }
+    if ttft_ms:
+        out["ttft_p50"], out["ttft_p95"] = round(_pct(ttft_ms, 0.5), 2), round(_pct(ttft_ms, 0.95), 2)
+    out.update({f"n_{k}": v for k, v in sorted(outcomes.items())})
+    return out
+
+def _one_sync(backend, i: int, stream: bool) -> Tuple[str, float, float]:
+    t0 = time.perf_counter()
+    ttft = 0.0
+    try:
+        if stream:
+            text = ""
+            for piece in backend.stream(SYSTEM, _user(i)):
+                if not text:
+                    ttft = time.perf_counter() - t0
+                text += piece
+            res = normalize_findings_json(text)
+        else:
+            res = backend.generate(SYSTEM, _user(i))
+        kind = "ok" if res.get("findings") else "malformed"
+    except Exception as e:
+        kind = _classify(e)
+    return kind, (time.perf_counter() - t0) * 1000, ttft * 1000
+
+def run_sync(backend, n: int, concurrency: int, stream: bool = False) -> Dict[str, Any]:
+    lat, ttft, outcomes, lock = [], [], {}, threading.Lock()
+
+    def _job(i):
+        kind, ms, t = _one_sync(backend, i, stream)
+        with lock:
+            outcomes[kind] = outcomes.get(kind, 0) + 1
+            if kind in ("ok", "malformed"):
+                lat.append(ms)
+            if t:
+                ttft.append(t)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(_job, range(n)))
+    return _summary(lat, outcomes, time.perf_counter() - t0, ttft)
+
+def run_async(backend, n: int, concurrency: int) -> Dict[str, Any]:
+    lat, outcomes = [], {}
+
+    async def _main():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _job(i):
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    res = await backend.agenerate(SYSTEM, _user(i))
+                    kind = "ok" if res.get("findings") else "malformed"
+                except Exception as e:
+                    kind = _classify(e)
+                if kind in ("ok", "malformed"):
+                    lat.append((time.perf_counter() - t0) * 1000)
+                outcomes[kind] = outcomes.get(kind, 0) + 1
+        await asyncio.gather(*(_job(i) for i in range(n)))
+    t0 = time.perf_counter()
+    asyncio.run(_main())
+    return _summary(lat, outcomes, time.perf_counter() - t0, [])
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="LLM 백엔드 부하 생성기(모의 서버)")
+    ap.add_argument("--flavor", choices=("ollama", "lmstudio", "openai", "both"), default="both")
+    ap.add_argument("--mode", choices=("sync", "async", "stream"), default="sync")
+    ap.add_argument("--requests", type=int, default=100)
+    ap.add_argument("--concurrency", default="1,4,16", help="쉼표로 여러 단계")
+    ap.add_argument("--url", default=None, help="이미 실행 중인 모의/실서버 URL(미지정 시 프로세스 내 모의 서버)")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--no-save", action="store_true")
+    for f in fields(MockConfig):
+        ap.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=None)
+    args = ap.parse_args(argv)
+
+    srv = None
+    url = args.url
+    if not url:
+        cfg = MockConfig.from_env(**{f.name: getattr(args, f.name) for f in fields(MockConfig)})
+        srv = start_mock_server(cfg=cfg)
+        url = srv.url
+        print(f"mock server {url} {cfg}")
+    flavors = ("ollama", "lmstudio") if args.flavor == "both" else (args.flavor,)
+    results: Dict[str, Dict[str, Any]] = {}
+    for flavor in flavors:
+        for c in [int(x) for x in args.concurrency.split(",") if x]:
+            if flavor == "openai":
+                # SDK가 OPENAI_BASE_URL을 읽는다. limiter는 프로세스 공용이라 단계 간 버킷 상태가 이어진다
+                os.environ["OPENAI_BASE_URL"] = url.rstrip("/") + "/v1"
+                os.environ.setdefault("OPENAI_API_KEY", "mock")
+                backend = OpenAIBackend()
+            elif flavor == "ollama":
+                backend = OllamaBackend(base_url=url, model="mock", timeout=60)
+            else:
+                backend = LMStudioBackend(base_url=url.rstrip("/") + "/v1", model="mock", timeout=60)
+            if srv:
+                srv.state.stats["max_in_flight"] = 0
+            if args.mode == "async":
+                r = run_async(backend, args.requests, c)
+            else:
+                r = run_sync(backend, args.requests, c, stream=args.mode == "stream")
+            if srv:
+                r["server_max_in_flight"] = srv.state.stats["max_in_flight"]
+            if flavor == "openai":
+                snap = backend.client.limiter.snapshot()
+                r.update(limiter_window=snap["window"], limiter_rate_limited=snap["rate_limited"])
+            results[f"loadgen/{flavor}/{args.mode}/c{c}"] = r
+            print_results({f"loadgen/{flavor}/{args.mode}/c{c}": r})
+    if srv:
+        srv.shutdown()
+    if not args.no_save:
+        print(f"→ {save_results(results, 'loadgen', args.out)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+# benchmarks/run_all.py — v0.8 (전체 벤치마크 실행 → 결과 JSON 1개)
+#   python benchmarks/run_all.py [--quick] [--only digest,selection]
+#   python benchmarks/compare.py                # 최근 두 결과 비교
+import argparse, importlib
+from typing import Any, Dict
+
+from _harness import print_results, save_results
+
+SUITES = ("import", "digest", "selection", "normalize", "e2e")
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="ISO45001 audit 벤치마크 묶음")
+    ap.add_argument("--quick", action="store_true")
+    ap.add_argument("--only", default="", help="쉼표로 구분한 스위트 이름")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args(argv)
+    suites = [s for s in args.only.split(",") if s] or list(SUITES)
+    results: Dict[str, Dict[str, Any]] = {}
+    for s in suites:
+        print(f"== {s}")
+        part = importlib.import_module(f"bench_{s}").run(args.quick)
+        print_results(part)
+        results.update(part)
+    print(f"→ {save_results(results, 'all', args.out)}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,5 @@
-# cv/dummy_vision.py  (v0.5)
-from typing import List, Dict
+# cv/dummy_vision.py  (v0.5 → v0.8: cv/ppe_vision으로 대체, 이전 import 경로 호환용)
+# 모델(PPE_ONNX_MODEL)/onnxruntime이 없으면 이전과 같이 "ppe_check": "not_performed"
+from cv.ppe_vision import analyze_images
 
-def analyze_images(files: List[bytes]) -> Dict:
-    # TODO: 교체: YOLO/Detectron2/ViT + PPE 규칙 검증
-    return {
-        "ppe_check": "not_performed",   # "pass" | "fail" | "not_performed"
-        "notes": "샘플 비전 결과(실제 모델 연동 필요)",
-        "image_count": len(files),
-        "detections": []                # [{"filename": "x.png", "labels": [...]}]
-    }
+__all__ = ["analyze_images"]
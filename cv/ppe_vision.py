@@ -0,0 +1,312 @@
+# cv/ppe_vision.py — v0.8 (PPE 비전: ONNX Runtime CPU 검출기)
+# - 모델: PPE_ONNX_MODEL(기본 ./models/ppe.onnx). YOLOv5/v8 형식 ONNX(ultralytics: yolo export format=onnx dynamic=True)
+#   라벨은 모델 메타데이터 names → 없으면 PPE_LABELS(쉼표 구분). Hardhat/NO-Hardhat/Safety Vest/harness 등 이름을
+#   helmet·vest·harness·person(+no_ 접두 = 미착용)으로 정규화
+# - 전처리: EXIF 회전 보정 → JPEG draft 축소 디코딩 → letterbox(PPE_IMG_SIZE, 모델 입력 크기 우선) → NCHW float32 배치
+#   스레드 풀(PPE_WORKERS)이 다음 배치를 디코딩하는 동안 ORT가 현재 배치(PPE_BATCH) 추론
+# - 후처리: numpy로 신뢰도 필터(PPE_CONF) + 클래스별 NMS(PPE_IOU) → 원본 좌표
+# - 판정: 사람 박스마다 안전모(상단)·조끼(몸통) 겹침 확인 + 명시적 no_* 검출 → ppe_check pass/fail
+# - 캐시: 이미지 바이트 SHA-1 + 모델 서명 + 임계값 → DigestCache(메모리 LRU + PPE_CACHE_DIR, 기본 ./cache/vision)
+# onnxruntime/numpy/Pillow/모델 파일이 없으면 "not_performed"(이전 dummy_vision과 같은 형태)
+import os, io, ast, json, time, hashlib, pathlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.optional_deps import optional_import
+from utils.digest_cache import DigestCache
+
+MODEL_PATH = os.getenv("PPE_ONNX_MODEL", "./models/ppe.onnx")
+IMG_SIZE = int(os.getenv("PPE_IMG_SIZE", "640"))
+BATCH = int(os.getenv("PPE_BATCH", "8"))
+CONF = float(os.getenv("PPE_CONF", "0.35"))
+IOU = float(os.getenv("PPE_IOU", "0.45"))
+MAX_DET = 300
+WORKERS = int(os.getenv("PPE_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+THREADS = int(os.getenv("PPE_THREADS", "0"))          # ORT intra-op 스레드(0=코어 수)
+CACHE_DIR = os.getenv("PPE_CACHE_DIR", "./cache/vision")
+DEFAULT_LABELS = ("person", "helmet", "vest", "harness", "no_helmet", "no_vest")
+KINDS = ("helmet", "vest", "harness")
+KIND_KO = {"helmet": "안전모", "vest": "안전조끼", "harness": "안전대"}
+IMAGE_EXTS = ("jpg", "jpeg", "png", "bmp", "tif", "tiff", "gif", "webp")
+
+FileLike = Union[bytes, Tuple[str, bytes]]
+
+def canonical_label(label: str) -> Optional[str]:
+    """모델 라벨 → person / helmet / vest / harness / no_helmet / no_vest / no_harness (그 외 None)."""
+    s = str(label).strip().lower().replace("-", "_").replace(" ", "_")
+    neg = s.startswith(("no_", "without_", "not_"))
+    base = s.split("_", 1)[1] if neg else s
+    if any(k in base for k in ("helmet", "hardhat", "hard_hat")):
+        kind = "helmet"
+    elif "vest" in base:
+        kind = "vest"
+    elif "harness" in base:
+        kind = "harness"
+    elif base in ("person", "worker", "people", "human"):
+        return None if neg else "person"
+    else:
+        return None
+    return f"no_{kind}" if neg else kind
+
+# ---- 전처리/후처리 (numpy) ----
+def letterbox(b: bytes, size: int):
+    """이미지 bytes → (size×size×3 uint8, 원본 (w, h), 배율, (pad_x, pad_y))."""
+    np = optional_import("numpy")
+    Image = optional_import("PIL.Image")
+    ImageOps = optional_import("PIL.ImageOps")
+    im = Image.open(io.BytesIO(b))
+    w0, h0 = im.size
+    try:
+        if im.getexif().get(0x0112) in (5, 6, 7, 8):   # 90/270도 회전 → 원본 좌표는 회전 후 기준
+            w0, h0 = h0, w0
+    except Exception:
+        pass
+    if im.format == "JPEG":
+        im.draft("RGB", (size, size))        # DCT 단계 축소 디코딩(큰 사진에서 수 배 빠름)
+    im = ImageOps.exif_transpose(im).convert("RGB")
+    r = min(size / im.width, size / im.height)
+    nw, nh = max(1, round(im.width * r)), max(1, round(im.height * r))
+    im = im.resize((nw, nh), Image.BILINEAR)
+    canvas = Image.new("RGB", (size, size), (114, 114, 114))
+    px, py = (size - nw) // 2, (size - nh) // 2
+    canvas.paste(im, (px, py))
+    return np.asarray(canvas), (w0, h0), nw / w0, (px, py)
+
+def nms(boxes, scores, iou: float, max_det: int = MAX_DET):
+    """greedy NMS(xyxy). 살아남은 인덱스(점수 내림차순)."""
+    np = optional_import("numpy")
+    order = scores.argsort()[::-1]
+    areas = (boxes[:, 2] - boxes[:, 0]).clip(0) * (boxes[:, 3] - boxes[:, 1]).clip(0)
+    keep = []
+    while order.size and len(keep) < max_det:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = (xx2 - xx1).clip(0) * (yy2 - yy1).clip(0)
+        order = rest[inter / (areas[i] + areas[rest] - inter + 1e-9) <= iou]
+    return np.array(keep, dtype=np.int64)
+
+def decode(pred, n_cls: int, conf: float = CONF, iou: float = IOU):
+    """한 이미지 예측 → (xyxy, score, cls). YOLOv8 (4+nc, A) / (A, 4+nc), YOLOv5 (A, 5+nc) 모두 지원."""
+    np = optional_import("numpy")
+    if pred.shape[0] in (4 + n_cls, 5 + n_cls) and pred.shape[1] not in (4 + n_cls, 5 + n_cls):
+        pred = pred.T
+    if pred.shape[1] == 5 + n_cls:
+        cls_scores = pred[:, 5:] * pred[:, 4:5]       # v5: objectness × class
+    else:
+        cls_scores = pred[:, 4:4 + n_cls]
+    cls = cls_scores.argmax(1)
+    score = cls_scores[np.arange(len(cls)), cls]
+    m = score >= conf
+    if not m.any():
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64)
+    xywh, score, cls = pred[m, :4], score[m], cls[m]
+    boxes = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2], 1)
+    keep = nms(boxes + (cls[:, None] * 4096.0), score, iou)  # 클래스별 NMS(좌표 오프셋)
+    return boxes[keep], score[keep], cls[keep]
+
+def assess(dets: List[Dict[str, Any]], detectable: Sequence[str] = DEFAULT_LABELS) -> Dict[str, Any]:
+    """검출 목록 → 사람별 착용 판정. detectable: 모델이 검출할 수 있는 정규화 라벨.
+    사람 클래스가 없는 모델은 안전모/no_helmet(머리) 수로 인원 추정."""
+    by = {k: [d for d in dets if d["kind"] == k] for k in ("person",) + KINDS + tuple(f"no_{k}" for k in KINDS)}
+    persons = by["person"]
+
+    def inside(d, p, top: float = 1.0) -> bool:
+        cx, cy = (d["box"][0] + d["box"][2]) / 2, (d["box"][1] + d["box"][3]) / 2
+        x1, y1, x2, y2 = p["box"]
+        return x1 <= cx <= x2 and y1 - 0.1 * (y2 - y1) <= cy <= y1 + top * (y2 - y1)
+    worn = {k: 0 for k in KINDS}
+    missing = {k: len(by[f"no_{k}"]) for k in KINDS}
+    if persons:
+        for k, top in (("helmet", 0.4), ("vest", 1.0), ("harness", 1.0)):
+            worn[k] = sum(any(inside(d, p, top) for d in by[k]) for p in persons)
+        # 안전모·조끼는 사람마다 필요(모델이 검출할 수 있을 때만), 안전대는 고소작업에서만 → 미검출을 미착용으로 보지 않음
+        for k in ("helmet", "vest"):
+            if k in detectable:
+                missing[k] = max(missing[k], len(persons) - worn[k])
+        n_person = len(persons)
+    else:
+        worn = {k: len(by[k]) for k in KINDS}
+        n_person = max(len(by["helmet"]) + len(by["no_helmet"]), len(by["vest"]) + len(by["no_vest"]))
+    check = "no_person" if n_person == 0 else "fail" if any(missing.values()) else "pass"
+    return {"persons": n_person, "worn": worn, "missing": {k: v for k, v in missing.items() if v}, "ppe_check": check}
+
+def format_ppe(r: Dict[str, Any]) -> str:
+    """이미지 요약 뒤에 붙이는 한 줄(LLM/오프라인 규칙이 읽는 구조화 문구). 규칙 엔진이 한 문장으로 보도록 '.' 없이."""
+    if r.get("error"):
+        return f"[PPE] 검출 실패({r['error'].replace('.', ' ')})"
+    if r["persons"] == 0:
+        return "[PPE] 작업자 검출 없음 (ppe_check=no_person)"
+    worn = " · ".join(f"{KIND_KO[k]} {r['worn'][k]}/{r['persons']}" for k in ("helmet", "vest")) \
+        + (f" · {KIND_KO['harness']} {r['worn']['harness']}" if r["worn"].get("harness") else "")
+    miss = ", ".join(f"{KIND_KO[k]} 미착용 {n}명" for k, n in r["missing"].items())
+    return (f"[PPE] 작업자 {r['persons']}명 · {worn}"
+            + (f" → {miss}" if miss else " → 보호구 착용 확인")
+            + f" (ppe_check={r['ppe_check']}, conf≥{round(r.get('conf', CONF) * 100)}%)")
+
+# ---- 검출기 ----
+class PPEDetector:
+    def __init__(self, model_path: str = MODEL_PATH, conf: float = CONF, iou: float = IOU, batch: int = BATCH,
+                 workers: int = WORKERS, threads: int = THREADS, labels: Optional[Sequence[str]] = None,
+                 cache: Optional[DigestCache] = None):
+        ort = optional_import("onnxruntime")
+        so = ort.SessionOptions()
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            so.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), sess_options=so, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        n, _, h, w = inp.shape
+        self.size = h if isinstance(h, int) and h == w else IMG_SIZE
+        self.fixed_batch = isinstance(n, int)
+        self.batch = n if self.fixed_batch else max(1, batch)   # 고정 배치 모델은 그 크기로
+        self.labels = list(labels or self._meta_labels() or
+                           [s for s in os.getenv("PPE_LABELS", "").split(",") if s.strip()] or DEFAULT_LABELS)
+        self.kinds = [canonical_label(l) for l in self.labels]
+        self.conf, self.iou, self.workers = conf, iou, max(1, workers)
+        st = pathlib.Path(model_path).stat()
+        self.signature = hashlib.sha1(f"{pathlib.Path(model_path).name}:{st.st_size}:{st.st_mtime_ns}:"
+                                      f"{self.size}:{conf}:{iou}:{','.join(self.labels)}".encode()).hexdigest()[:12]
+        self.cache = cache if cache is not None else DigestCache(2048, CACHE_DIR or None)
+
+    def _meta_labels(self) -> Optional[List[str]]:
+        names = (self.session.get_modelmeta().custom_metadata_map or {}).get("names")
+        if not names:
+            return None
+        try:
+            v = ast.literal_eval(names)   # ultralytics: "{0: 'Hardhat', 1: 'Mask', ...}"
+            return [v[k] for k in sorted(v)] if isinstance(v, dict) else list(v)
+        except Exception:
+            return None
+
+    def _key(self, b: bytes) -> str:
+        return f"{hashlib.sha1(b).hexdigest()}_{self.signature}"
+
+    def _infer(self, prepped: List[Any]) -> List[Dict[str, Any]]:
+        np = optional_import("numpy")
+        x = np.stack([p[0] for p in prepped]).transpose(0, 3, 1, 2).astype(np.float32) / 255.0
+        if self.fixed_batch and len(prepped) < self.batch:
+            x = np.concatenate([x, np.zeros((self.batch - len(prepped),) + x.shape[1:], np.float32)])
+        out = self.session.run(None, {self.input_name: x})[0]
+        res = []
+        for k, (_, (w0, h0), scale, (px, py)) in enumerate(prepped):
+            boxes, scores, cls = decode(out[k], len(self.labels), self.conf, self.iou)
+            boxes = (boxes - np.array([px, py, px, py], np.float32)) / scale
+            boxes = boxes.clip(0, [w0, h0, w0, h0])
+            dets = [{"label": self.labels[c], "kind": self.kinds[c], "conf": round(float(s), 3),
+                     "box": [round(float(v), 1) for v in bx]} for bx, s, c in zip(boxes, scores, cls)]
+            res.append({"detections": dets, "conf": self.conf,
+                        **assess([d for d in dets if d["kind"]], [k for k in self.kinds if k])})
+        return res
+
+    def detect(self, images: Sequence[bytes]) -> List[Dict[str, Any]]:
+        """이미지 bytes 목록 → 이미지별 결과(입력 순서). 캐시 적중분은 추론 생략."""
+        out: List[Optional[Dict[str, Any]]] = [None] * len(images)
+        todo = []
+        for i, b in enumerate(images):
+            hit = self.cache.get(self._key(b))
+            if hit is not None:
+                out[i] = {**json.loads(hit), "cached": True}
+            else:
+                todo.append(i)
+
+        def prep(i: int):
+            try:
+                return letterbox(images[i], self.size)
+            except Exception as e:
+                return e
+        # 디코딩/letterbox는 스레드 풀에서 미리(map은 앞서 나가며 결과는 순서대로) → 추론과 겹친다
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            pending: List[Tuple[int, Any]] = []
+            for i, p in zip(todo, ex.map(prep, todo)):
+                if isinstance(p, Exception):
+                    out[i] = {"error": f"{type(p).__name__}: {p}", "detections": [], "persons": 0,
+                              "worn": {}, "missing": {}, "ppe_check": "not_performed"}
+                    continue
+                pending.append((i, p))
+                if len(pending) == self.batch:
+                    self._flush(pending, images, out)
+                    pending = []
+            if pending:
+                self._flush(pending, images, out)
+        return out  # type: ignore[return-value]
+
+    def _flush(self, pending, images, out):
+        for (i, _), r in zip(pending, self._infer([p for _, p in pending])):
+            out[i] = r
+            self.cache.put(self._key(images[i]), json.dumps(r, ensure_ascii=False))
+
+_DETECTOR: Dict[str, Any] = {}
+_DETECTOR_LOCK = threading.Lock()
+
+def vision_status(model_path: str = MODEL_PATH) -> str:
+    """"" 이면 사용 가능, 아니면 사용 불가 사유."""
+    if os.getenv("PPE_VISION", "auto").lower() in ("0", "off", "false", "no"):
+        return "PPE_VISION=0"
+    for mod in ("numpy", "PIL.Image", "onnxruntime"):
+        if optional_import(mod) is None:
+            return f"{mod.split('.')[0]} 미설치"
+    if not pathlib.Path(model_path).is_file():
+        return f"모델 없음({model_path})"
+    return ""
+
+def get_detector(model_path: str = MODEL_PATH) -> Optional[PPEDetector]:
+    """프로세스 공유 검출기(세션 생성은 한 번). 사용할 수 없으면 None."""
+    if vision_status(model_path):
+        return None
+    with _DETECTOR_LOCK:
+        if model_path not in _DETECTOR:
+            try:
+                _DETECTOR[model_path] = PPEDetector(model_path)
+            except Exception:
+                _DETECTOR[model_path] = None
+        return _DETECTOR[model_path]
+
+def vision_signature(model_path: str = MODEL_PATH) -> str:
+    """요약/매니페스트 옵션용: 비전이 꺼져 있으면 ""."""
+    det = get_detector(model_path)
+    return det.signature if det is not None else ""
+
+def _split(files: Sequence[FileLike]) -> Tuple[List[str], List[bytes]]:
+    names, blobs = [], []
+    for i, f in enumerate(files):
+        name, b = f if isinstance(f, tuple) else (f"image_{i + 1}", f)
+        names.append(name)
+        blobs.append(b)
+    return names, blobs
+
+def analyze_images(files: Sequence[FileLike], detector: Optional[PPEDetector] = None) -> Dict:
+    """bytes 또는 (파일명, bytes) 목록 → dummy_vision과 같은 형태 + 이미지별 판정/속도."""
+    names, blobs = _split(files)
+    det = detector or get_detector()
+    if det is None:
+        return {"ppe_check": "not_performed", "notes": f"PPE 검출 미수행: {vision_status()}",
+                "image_count": len(blobs), "detections": []}
+    t0 = time.perf_counter()
+    results = det.detect(blobs)
+    elapsed = time.perf_counter() - t0
+    checks = [r["ppe_check"] for r in results]
+    overall = next((c for c in ("fail", "pass", "no_person") if c in checks), "not_performed")
+    return {
+        "ppe_check": overall,
+        "notes": f"ONNX Runtime CPU, 입력 {det.size}px, 배치 {det.batch}",
+        "image_count": len(blobs),
+        "images_per_sec": round(len(blobs) / elapsed, 2) if elapsed > 0 else None,
+        "cache_hits": sum(bool(r.get("cached")) for r in results),
+        "detections": [{"filename": n, "labels": sorted({d["label"] for d in r["detections"]}), **r}
+                       for n, r in zip(names, results)],
+    }
+
+def ppe_lines(items: Sequence[Tuple[str, bytes]]) -> Dict[int, str]:
+    """증거 목록 중 이미지 파일의 PPE 요약 줄 {입력 위치: 줄}. 비전을 쓸 수 없으면 빈 dict."""
+    idx = [i for i, (name, _) in enumerate(items) if name.rsplit(".", 1)[-1].lower() in IMAGE_EXTS]
+    det = get_detector() if idx else None
+    if det is None:
+        return {}
+    results = det.detect([items[i][1] for i in idx])
+    return {i: format_ppe(r) for i, r in zip(idx, results)}
@@ -3,19 +3,35 @@
 # - temperature/response_format 미사용
 # - base_url 미사용(기본 엔드포인트). 필요 시에만 스위치로 활성화 권장
 # - 비JSON 응답 시 자동 래핑
+# - 호출은 프로세스 공용 적응형 limiter(utils.rate_limiter)를 거친다: RPM/TPM 헤더 학습, Retry-After 준수, 세션별 공정 대기
 
 import os, json, time, random, re
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
 from openai import OpenAI, APIStatusError, APIConnectionError, RateLimitError, APITimeoutError
+from utils.metrics import span, count
+from utils.rate_limiter import get_limiter, EXPECTED_OUTPUT_TOKENS
+from utils.prompt_budget import count_tokens
 
 MODEL   = os.getenv("OPENAI_MODEL", "gpt-5")
 API_KEY = os.getenv("OPENAI_API_KEY")
 
+_FORMAT = ("Return exactly ONE JSON object only. Keys: findings:[{title,clause,reason,result}]. "
+           "No prose, no explanation, no markdown.")
+
 RETRYABLE = (RateLimitError, APITimeoutError, APIStatusError, APIConnectionError)
 
 def _stable_sleep(attempt: int):
     base = min(2 ** attempt, 16)
-    time.sleep(base + random.random())
+    with span("retry_wait", backend="openai"):
+        time.sleep(base + random.random())
+
+def _headers(e: Exception):
+    resp = getattr(e, "response", None)
+    return getattr(resp, "headers", None)
+
+def _usage_tokens(resp) -> Optional[int]:
+    usage = getattr(resp, "usage", None)
+    return getattr(usage, "total_tokens", None) if usage is not None else None
 
 def _dump_json(data: Dict[str, Any]) -> str:
     return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
@@ -69,7 +85,8 @@ def _extract_json_from_text(text: str):
 
 def _build_client() -> OpenAI:
     # 기본 엔드포인트 사용(example.py와 동일)
-    kwargs: Dict[str, Any] = {}
+    # SDK 자체 재시도(기본 2회)는 limiter를 우회하므로 끄고 _call_minimal에서 재시도
+    kwargs: Dict[str, Any] = {"max_retries": 0}
     if API_KEY:
         kwargs["api_key"] = API_KEY
     return OpenAI(**kwargs)
@@ -81,16 +98,42 @@ class GPT5Client:
         self.temperature = temperature  # NOTE: Responses + gpt-5 경로에선 미사용
         self.max_retries = max_retries
         self.client = _build_client()
+        self.limiter = get_limiter(f"openai:{self.model}")
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        return count_tokens(prompt, self.model) + EXPECTED_OUTPUT_TOKENS
+
+    def _create(self, slot, **payload):
+        """limiter 슬롯 안에서 호출하고 응답 헤더/사용량(또는 429)을 슬롯에 기록."""
+        try:
+            raw = self.client.responses.with_raw_response.create(**payload)
+        except RateLimitError as e:
+            slot.limited(_headers(e))
+            raise
+        except APIStatusError as e:
+            slot.failed(_headers(e))
+            raise
+        resp = raw.parse()
+        slot.done(raw.headers, None if payload.get("stream") else _usage_tokens(resp))
+        return resp
 
     def _call_minimal(self, *, prompt: str) -> str:
         payload = {"model": self.model, "input": prompt}  # 필수만
+        est = self._estimate_tokens(prompt)
         attempt = 0
         while True:
             try:
-                resp = self.client.responses.create(**payload)
-                return resp.output_text
-            except (RateLimitError, APITimeoutError, APIConnectionError) as e:
+                with self.limiter.slot(est) as slot:
+                    return self._create(slot, **payload).output_text
+            except RateLimitError as e:
+                # 대기는 limiter가 Retry-After/헤더 기준으로 모든 호출자에 한 번에 적용 → 여기선 재획득만
+                attempt += 1
+                count("llm_retries", backend="openai", reason=type(e).__name__)
+                if attempt > self.max_retries:
+                    return _dump_json(_wrap_free_text_as_json(f"API 호출 실패: 재시도 한도 초과 ({type(e).__name__})"))
+            except (APITimeoutError, APIConnectionError) as e:
                 attempt += 1
+                count("llm_retries", backend="openai", reason=type(e).__name__)
                 if attempt > self.max_retries:
                     return _dump_json(_wrap_free_text_as_json(f"API 호출 실패: 재시도 한도 초과 ({type(e).__name__})"))
                 _stable_sleep(attempt)
@@ -100,20 +143,42 @@ class GPT5Client:
                 if code and 400 <= code < 500:
                     return _dump_json(_wrap_free_text_as_json(f"API 호출 실패: HTTP {code} {msg}"))
                 attempt += 1
+                count("llm_retries", backend="openai", reason=f"HTTP {code}")
                 if attempt > self.max_retries:
                     return _dump_json(_wrap_free_text_as_json(f"API 호출 실패: 재시도 한도 초과 (HTTP {code})"))
                 _stable_sleep(attempt)
             except Exception as e:
                 return _dump_json(_wrap_free_text_as_json(f"예상치 못한 오류: {type(e).__name__}: {e}"))
 
+    def _stream_minimal(self, *, prompt: str) -> Iterator[str]:
+        """Responses 스트리밍: output_text 델타를 도착 즉시 yield.
+        첫 토큰 전 실패 시 재시도 경로(_call_minimal)로 전환해 전체 텍스트를 한 번에 반환."""
+        started = False
+        try:
+            with self.limiter.slot(self._estimate_tokens(prompt)) as slot:
+                stream = self._create(slot, model=self.model, input=prompt, stream=True)
+                for event in stream:
+                    etype = getattr(event, "type", "")
+                    if etype == "response.output_text.delta":
+                        delta = getattr(event, "delta", "") or ""
+                        if delta:
+                            started = True
+                            yield delta
+                    elif etype == "response.completed":
+                        slot.used = _usage_tokens(getattr(event, "response", None))
+            if started:
+                return
+        except Exception:
+            if started:
+                raise
+        yield self._call_minimal(prompt=prompt)
+
     def chat(self, *, system: str, user: str, json_mode: bool = True) -> str:
-        merged = f"[SYSTEM]\n{system}\n\n[USER]\n{user}"
+        # 고정 부분(SYSTEM·FORMAT)을 앞에, 심사별 USER를 맨 뒤에 → 프롬프트 캐시 접두사 유지
+        merged = f"[SYSTEM]\n{system}\n\n"
         if json_mode:
-            merged += (
-                "\n\n[FORMAT]\n"
-                "Return exactly ONE JSON object only. Keys: findings:[{title,clause,reason,result}]. "
-                "No prose, no explanation, no markdown."
-            )
+            merged += f"[FORMAT]\n{_FORMAT}\n\n"
+        merged += f"[USER]\n{user}"
         raw = self._call_minimal(prompt=merged)
         # 1차: 바로 파싱
         try:
@@ -133,13 +198,22 @@ class GPT5Client:
             data = _normalize_findings_order(data)
         return _dump_json(data)
 
-    def analyze(self, user_input: str, *, clause_hint: str = "") -> str:
-        prompt = (
+    @staticmethod
+    def _analyze_prompt(user_input: str, system: Optional[str] = None) -> str:
+        # TASK → CONTEXT(체크리스트, 정규화된 순서) → FORMAT → INPUT(증거): 요청마다 달라지는 부분은 맨 뒤
+        return (
             "[TASK]\nYou are an ISO 45001 internal-audit assistant. Analyze the input and map to clauses.\n"
-            f"[INPUT]\n{user_input}\n\n"
-            "[FORMAT]\nReturn exactly ONE JSON object only. Keys: findings:[{title,clause,reason,result}]. "
-            "No prose, no explanation, no markdown."
+            + (f"[CONTEXT]\n{system}\n\n" if system else "")
+            + f"[FORMAT]\n{_FORMAT}\n\n"
+            f"[INPUT]\n{user_input}"
         )
+
+    def analyze_stream(self, user_input: str, *, system: Optional[str] = None) -> Iterator[str]:
+        """analyze()와 같은 프롬프트, 원문 텍스트를 스트리밍(후처리는 호출측 파서 담당)."""
+        yield from self._stream_minimal(prompt=self._analyze_prompt(user_input, system))
+
+    def analyze(self, user_input: str, *, clause_hint: str = "", system: Optional[str] = None) -> str:
+        prompt = self._analyze_prompt(user_input, system)
         raw = self._call_minimal(prompt=prompt)
 
         try:
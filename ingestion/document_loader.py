@@ -1,21 +1,24 @@
 # ingestion/document_loader.py  (v0.5) - 경로만 정리
 import io, os
-from typing import Tuple
-from PyPDF2 import PdfReader
+from typing import Iterator, Tuple
 
-def _read_pdf_bytes(b: bytes) -> str:
+def iter_pdf_pages(b: bytes) -> Iterator[Tuple[int, str]]:
+    """페이지 단위로 (1부터 시작하는 페이지 번호, 텍스트)를 순차 반환 — 대용량 문서도 한 페이지씩 처리."""
     try:
+        from PyPDF2 import PdfReader  # 지연 import(콜드 스타트)
         r = PdfReader(io.BytesIO(b))
-        txt = []
-        for p in r.pages:
-            try:
-                t = p.extract_text() or ""
-            except Exception:
-                t = ""
-            txt.append(t)
-        return "\n".join(txt)
+        pages = r.pages
     except Exception:
-        return ""
+        return
+    for i, p in enumerate(pages, start=1):
+        try:
+            t = p.extract_text() or ""
+        except Exception:
+            t = ""
+        yield i, t
+
+def _read_pdf_bytes(b: bytes) -> str:
+    return "\n".join(t for _, t in iter_pdf_pages(b))
 
 def _read_docx_bytes(b: bytes) -> str:
     try:
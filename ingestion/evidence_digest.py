@@ -0,0 +1,184 @@
+# ingestion/evidence_digest.py — v0.8 (병렬 증거 요약 파이프라인)
+# - 캐시(utils.digest_cache) 적중분은 즉시 사용
+# - PDF 추출/이미지 OCR(무거운 작업)은 파일 1개라도 워커 프로세스(최대 INGEST_MAX_WORKERS개)에서, 업로드 순서 유지
+# - 파일별 타임아웃(INGEST_TIMEOUT, 기본 120s): 초과 시 해당 파일만 안내 문구로 대체하고 그 워커는 즉시 종료·교체
+# - 이미지 OCR은 ingestion/ocr_preprocess로 텍스트 영역만 잘라 인식(설정: 프리셋 "ocr" 절 + OCR_* 환경변수)
+# - 이미지는 PPE 검출 결과 한 줄을 덧붙임(cv/ppe_vision: PPE_ONNX_MODEL이 있을 때, PPE_VISION=0이면 끔)
+import os, time
+import multiprocessing as mp
+from collections import deque
+from multiprocessing.connection import wait as mp_wait
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from ingestion.evidence_parser import digest_file, is_heavy, _ext_from_name, IMAGE_EXTS
+from ingestion.ocr_preprocess import ocr_settings
+from utils.digest_cache import DigestCache, get_digest_cache, digest_key
+from utils.metrics import count, record_stage
+from cv.ppe_vision import ppe_lines
+
+ProgressFn = Callable[[int, int, str], None]
+
+def _default_workers() -> int:
+    env = os.getenv("INGEST_MAX_WORKERS")
+    if env:
+        return max(1, int(env))
+    return max(1, os.cpu_count() or 1)
+
+def _stage(name: str, enable_ocr: bool) -> str:
+    """단계 이름(ingest.pdf / ingest.ocr / ingest.image / ingest.text) — 파일별 처리 시간 집계용."""
+    ext = _ext_from_name(name)
+    if ext == "pdf":
+        return "ingest.pdf"
+    if ext in IMAGE_EXTS:
+        return "ingest.ocr" if enable_ocr else "ingest.image"
+    return "ingest.text"
+
+def _timed_digest(name: str, b: bytes, opts) -> str:
+    t0 = time.perf_counter()
+    try:
+        return digest_file(name, b, **opts)
+    finally:
+        record_stage(_stage(name, opts["enable_ocr"]), time.perf_counter() - t0)
+
+def _worker_init():
+    # tesseract(OpenMP) 내부 스레드와 프로세스 병렬이 겹치지 않도록 1스레드로 제한
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+def _worker_main(conn):
+    """워커 프로세스: (name, bytes, opts)를 받아 (성공 여부, 요약 또는 오류) 회신. None이면 종료."""
+    _worker_init()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        name, b, opts = task
+        try:
+            conn.send((True, digest_file(name, b, **opts)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    """작업 1개씩 처리하는 워커 프로세스. 시간 초과 시 이 프로세스만 종료하고 새 워커로 교체한다
+    (ProcessPoolExecutor는 실행 중인 작업을 멈출 수 없고 워커 목록도 비공개)."""
+
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+        self.job: Optional[Tuple[int, float]] = None   # (index, start_time)
+
+    def submit(self, i: int, name: str, b: bytes, opts):
+        self.conn.send((name, b, opts))
+        self.job = (i, time.monotonic())
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.join(timeout=5)
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join(timeout=5)
+        self.conn.close()
+
+def _with_ppe(items: Sequence[Tuple[str, bytes]], results: List[Optional[str]]) -> List[str]:
+    """이미지 요약 뒤에 PPE 검출 줄(cv/ppe_vision, 모델이 있을 때). 요약 캐시와 별개로 이미지 해시 캐시를 쓴다."""
+    t0 = time.perf_counter()
+    lines = ppe_lines(items)
+    if lines:
+        record_stage("ingest.vision", time.perf_counter() - t0)
+    for i, line in lines.items():
+        results[i] = f"{results[i]}\n{line}"
+    return results  # type: ignore[return-value]
+
+def digest_files(items: Sequence[Tuple[str, bytes]], enable_ocr=False, ocr_lang="kor+eng", max_chars=1200,
+                 max_pages: Optional[int]=2, ocr_max_chars: int=800, cache: Optional[DigestCache]=None, max_workers: Optional[int]=None,
+                 timeout: Optional[float]=None, on_progress: Optional[ProgressFn]=None,
+                 ocr_config: Optional[dict]=None) -> List[str]:
+    """(name, bytes) 목록 → 파일별 요약 목록(입력 순서 유지).
+    ocr_config: 프리셋 "ocr" 절(psm/oem/binarize 등). 환경변수와 합친 최종 설정이 캐시 키에 들어간다."""
+    cache = cache or get_digest_cache()
+    if timeout is None:
+        timeout = float(os.getenv("INGEST_TIMEOUT", "120"))
+    total = len(items)
+    results: List[Optional[str]] = [None] * total
+    opts = dict(enable_ocr=bool(enable_ocr), ocr_lang=ocr_lang, max_chars=max_chars,
+                max_pages=max_pages, ocr_max_chars=ocr_max_chars,
+                ocr_config=ocr_settings(ocr_config) if enable_ocr else None)
+    keys = [digest_key(b, name=name, **opts) for name, b in items]
+    done_n = 0
+
+    def _finish(i: int, summary: str, store: bool=True):
+        nonlocal done_n
+        results[i] = summary
+        if store:
+            cache.put(keys[i], summary)
+        done_n += 1
+        if on_progress:
+            on_progress(done_n, total, items[i][0])
+
+    heavy = deque()
+    for i, (name, b) in enumerate(items):
+        hit = cache.get(keys[i])
+        count("digest_cache_hits" if hit is not None else "digest_cache_misses")
+        if hit is not None:
+            _finish(i, hit, store=False)
+        elif is_heavy(name, enable_ocr):
+            heavy.append(i)
+        else:
+            _finish(i, _timed_digest(name, b, opts))
+
+    # 무거운 파일은 1개라도 워커 프로세스에서 — 현재 프로세스에서 돌리면 멈춘 OCR/PDF를 끊을 수 없다
+    workers = min(max_workers or _default_workers(), len(heavy))
+    ctx = mp.get_context()
+    idle: List[_Worker] = []
+    busy = {}   # conn -> _Worker
+    try:
+        while heavy or busy:
+            # 제출 수를 워커 수로 제한 → 시작 시각 ≈ 제출 시각이 되어 파일별 타임아웃이 정확해짐
+            while heavy and len(busy) < workers:
+                w = idle.pop() if idle else _Worker(ctx)
+                i = heavy.popleft()
+                w.submit(i, *items[i], opts)
+                busy[w.conn] = w
+            for conn in mp_wait(list(busy), timeout=0.25):
+                w = busy.pop(conn)
+                i, t0 = w.job
+                name = items[i][0]
+                # 워커 처리 시간(제출→완료, 폴링 간격 0.25s 이내 오차)
+                record_stage(_stage(name, enable_ocr), time.monotonic() - t0)
+                try:
+                    ok, out = conn.recv()
+                except (EOFError, OSError):
+                    # 워커가 죽음(메모리 부족 등) → 이 파일만 실패 처리, 다음 파일은 새 워커
+                    w.kill()
+                    _finish(i, f"[{name}] (처리 실패: 워커 프로세스 종료, exitcode={w.proc.exitcode})", store=False)
+                    continue
+                _finish(i, out if ok else f"[{name}] (처리 실패: {out})", store=ok)
+                idle.append(w)
+            if timeout and timeout > 0:
+                now = time.monotonic()
+                for conn, w in list(busy.items()):
+                    i, t0 = w.job
+                    if now - t0 > timeout:
+                        # 멈춘 워커는 바로 종료, 남은 파일은 새 워커가 처리
+                        busy.pop(conn)
+                        w.kill()
+                        count("ingest_timeouts")
+                        _finish(i, f"[{items[i][0]}] (처리 시간 초과: {timeout:g}s, 요약 생략)", store=False)
+    finally:
+        for w in busy.values():
+            w.kill()
+        for w in idle:
+            w.close()
+    return _with_ppe(items, results)
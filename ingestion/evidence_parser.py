@@ -0,0 +1,145 @@
+# ingestion/evidence_parser.py — v0.8 (증거 파서: Streamlit 비의존)
+# app.py에서 분리. 프로세스 풀 워커가 import 할 수 있도록 UI 의존성이 없어야 한다.
+from io import BytesIO
+
+from utils.optional_deps import optional_import
+from ingestion.ocr_preprocess import ocr_settings, prepare_for_ocr, tesseract_config
+
+# optional deps — 첫 사용 시 지연 import(앱 콜드 스타트/재실행 비용 절감)
+
+IMAGE_EXTS = ("jpg","jpeg","png","bmp","tif","tiff","gif","webp")
+
+# evidence helpers (binary-safe)
+def _guess_encoding(b: bytes) -> str:
+    chardet = optional_import("chardet")
+    if chardet:
+        try:
+            det = chardet.detect(b or b"")
+            enc = (det.get("encoding") or "").strip()
+            if enc:
+                return enc
+        except Exception:
+            pass
+    return "utf-8-sig"
+
+def _is_binary_bytes(b: bytes, sample=512) -> bool:
+    head = b[:sample]
+    nontext = sum(c < 9 or (13 < c < 32) for c in head)
+    return (0 in head) or (nontext / max(1, len(head)) > 0.2)
+
+def _ext_from_name(name: str) -> str:
+    return (name.rsplit(".", 1)[-1] if "." in name else "").lower()
+
+def _mime_from_name(name: str) -> str:
+    import mimetypes
+    return (mimetypes.guess_type(name)[0] or "").lower()
+
+def _ocr_image(pytesseract, b: bytes, ocr_lang: str, ocr_max_chars: int, ocr_config: dict|None) -> str:
+    """전처리(회전 보정·축소·이진화·텍스트 영역 crop) 후 영역별 OCR. 어차피 잘릴 분량을 넘으면 남은 영역은 생략."""
+    cfg = ocr_settings(ocr_config)
+    crops, _ = prepare_for_ocr(b, cfg)
+    texts, n = [], 0
+    for crop in crops:
+        t = (pytesseract.image_to_string(crop, lang=ocr_lang, config=tesseract_config(cfg)) or "").strip()
+        if t:
+            texts.append(t)
+            n += len(t)
+        if n >= ocr_max_chars:
+            break
+    return "\n".join(texts)
+
+def _summarize_image(name: str, b: bytes, ocr: bool=False, ocr_lang: str="kor+eng", ocr_max_chars: int=800,
+                     ocr_config: dict|None=None) -> str:
+    Image = optional_import("PIL.Image")
+    if not Image:
+        return f"[{name}] (이미지 파일, 미리보기만 표시. OCR 미지원)"
+    try:
+        im = Image.open(BytesIO(b))
+        info = f"[{name}] 이미지 {im.format} {im.width}x{im.height}px"
+        exif_txt = ""
+        try:
+            exif = im.getexif()
+            if exif and len(exif):
+                ExifTags = optional_import("PIL.ExifTags")
+                kv = []
+                for k, v in exif.items():
+                    try:
+                        tag = ExifTags.TAGS.get(k, str(k))
+                        if tag in ("DateTime","Make","Model","Software","Orientation"):
+                            kv.append(f"{tag}={v}")
+                    except Exception:
+                        pass
+                if kv:
+                    exif_txt = " | EXIF: " + ", ".join(kv[:6])
+        except Exception:
+            pass
+        ocr_txt = ""
+        pytesseract = optional_import("pytesseract") if ocr else None
+        if ocr and pytesseract:
+            try:
+                ocr_txt = _ocr_image(pytesseract, b, ocr_lang, ocr_max_chars, ocr_config)
+                if ocr_txt:
+                    ocr_txt = "\n[OCR]\n" + ocr_txt[:ocr_max_chars]
+            except Exception as e:
+                ocr_txt = f"\n[OCR 실패] {e}"
+        elif ocr and not pytesseract:
+            ocr_txt = "\n[OCR 비활성화] pytesseract 미설치"
+        return info + exif_txt + ocr_txt
+    except Exception as e:
+        return f"[{name}] (이미지 파싱 실패: {e})"
+
+def _summarize_pdf(name: str, b: bytes, max_chars=1200, max_pages: int|None=2) -> str:
+    PyPDF2 = optional_import("PyPDF2")
+    if not PyPDF2:
+        return f"[{name}] (PDF 파일, PyPDF2 미설치로 본문 미리보기 생략)"
+    try:
+        reader = PyPDF2.PdfReader(BytesIO(b))
+        texts = []
+        for i, page in enumerate(reader.pages[:max_pages]):
+            try:
+                t = page.extract_text() or ""
+                if t.strip():
+                    texts.append(t.strip())
+            except Exception:
+                pass
+        text = "\n".join(texts)[:max_chars]
+        if not text:
+            return f"[{name}] (PDF, 추출된 텍스트 없음)"
+        return f"[{name}] (PDF 요약)\n{text}"
+    except Exception as e:
+        return f"[{name}] (PDF 파싱 실패: {e})"
+
+def digest_file(name: str, b: bytes, enable_ocr=False, ocr_lang="kor+eng", max_chars=1200,
+                max_pages: int|None=2, ocr_max_chars: int=800, ocr_config: dict|None=None) -> str:
+    ext = _ext_from_name(name)
+    mime = _mime_from_name(name)
+
+    # 이미지
+    if mime.startswith("image/") or ext in IMAGE_EXTS:
+        return _summarize_image(name, b, ocr=enable_ocr, ocr_lang=ocr_lang, ocr_max_chars=ocr_max_chars,
+                                ocr_config=ocr_config)
+
+    # PDF
+    if mime == "application/pdf" or ext == "pdf":
+        return _summarize_pdf(name, b, max_chars=max_chars, max_pages=max_pages)
+
+    # 텍스트
+    if not _is_binary_bytes(b):
+        try:
+            enc = _guess_encoding(b)
+            txt = b.decode(enc, errors="replace")
+            return f"[{name}] (텍스트/{enc})\n{txt[:max_chars]}"
+        except Exception as e:
+            return f"[{name}] (텍스트 디코딩 실패: {e})"
+
+    # 기타 바이너리
+    return f"[{name}] (바이너리 파일, {len(b)} bytes)"
+
+def is_heavy(name: str, enable_ocr=False) -> bool:
+    """CPU 부담이 큰 작업(PDF 추출, OCR)인지 — 프로세스 풀로 보낼 대상."""
+    ext = _ext_from_name(name)
+    mime = _mime_from_name(name)
+    if mime == "application/pdf" or ext == "pdf":
+        return True
+    is_image = mime.startswith("image/") or ext in IMAGE_EXTS
+    return bool(enable_ocr and is_image)
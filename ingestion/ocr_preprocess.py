@@ -0,0 +1,241 @@
+# ingestion/ocr_preprocess.py — v0.8 (OCR 전처리: 휴대폰 사진 → 텍스트 영역 crop)
+# 이전: 원본 해상도(12MP+) 그대로 pytesseract에 넘기고 결과는 ocr_max_chars(800자)에서 잘라 버림
+# - EXIF 회전 보정 + JPEG draft 축소 디코딩(그레이스케일) → 긴 변 OCR_MAX_SIDE(기본 2400px) 이하
+# - 텍스트 영역 검출: 축소본(OCR_DETECT_SIDE, 기본 960px)의 형태학적 그래디언트 → 8px 셀별 에지 밀도·가로/세로 전이
+#   → 가로 팽창(글자·단어 연결) → 연결 요소 상자, 점수순 최대 OCR_MAX_REGIONS개를 읽는 순서로
+#   (영역이 없거나 OCR_MAX_REGIONS개를 다 채우면 놓친 글자가 있을 수 있으므로 페이지 전체 1장 — 긴 변 OCR_MAX_SIDE 그대로)
+# - 영역마다 줄 높이를 행 투영 프로파일로 추정해 글자 높이 OCR_CHAR_PX(기본 32px ≈ 300DPI 10~12pt)로 재조정
+#   (영역 검출을 끄면 페이지 전체, DPI 메타데이터가 있는 스캔본은 OCR_TARGET_DPI 기준으로 축소)
+# - 이진화: otsu(영역별 전역) | adaptive(적분 영상 국소 평균, 그늘진 현장 사진) | none, 검은 글자/흰 바탕으로 통일
+# - tesseract 설정: 프리셋 "ocr" 절 > 환경변수(OCR_PSM 등) > 기본값(psm 6: 균일한 텍스트 블록, oem 1: LSTM)
+# numpy/Pillow(ImageOps)가 없으면 원본 이미지 1장을 그대로 넘김(이전 동작)
+import os
+from collections import deque
+from io import BytesIO
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from utils.optional_deps import optional_import
+
+DEFAULTS: Dict[str, Any] = {
+    "psm": 6, "oem": 1, "config": "",        # tesseract --psm/--oem + 추가 인자(예: "-c preserve_interword_spaces=1")
+    "regions": True, "binarize": "otsu",
+    "max_side": 2400, "detect_side": 960, "char_px": 32, "target_dpi": 300,
+    "max_regions": 12, "max_cover": 0.6,     # 영역 합이 이미지의 60%를 넘으면 페이지 전체 1장으로
+}
+_ENV = {"psm": "OCR_PSM", "oem": "OCR_OEM", "config": "OCR_CONFIG", "regions": "OCR_REGIONS",
+        "binarize": "OCR_BINARIZE", "max_side": "OCR_MAX_SIDE", "detect_side": "OCR_DETECT_SIDE",
+        "char_px": "OCR_CHAR_PX", "target_dpi": "OCR_TARGET_DPI", "max_regions": "OCR_MAX_REGIONS",
+        "max_cover": "OCR_MAX_COVER"}
+BINARIZE = ("otsu", "adaptive", "none")
+CELL = 8            # 검출 격자 셀 크기(px, 검출 축소본 기준)
+MIN_GRAD = 40       # 에지로 볼 최소 그래디언트(0~255)
+
+def _coerce(default, v):
+    if isinstance(default, bool):
+        return v if isinstance(v, bool) else str(v).strip().lower() not in ("0", "false", "no", "off", "")
+    if isinstance(default, (int, float)):
+        return type(default)(v)
+    return str(v)
+
+def ocr_settings(overrides: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """기본값 ← 환경변수 ← 프리셋 "ocr" 절. 모르는 키는 무시하고 값 형식은 기본값에 맞춘다."""
+    cfg = dict(DEFAULTS)
+    for k, env in _ENV.items():
+        if os.getenv(env):
+            cfg[k] = os.getenv(env)
+    cfg.update({k: v for k, v in (overrides or {}).items() if k in DEFAULTS})
+    cfg = {k: _coerce(DEFAULTS[k], v) for k, v in cfg.items()}
+    if cfg["binarize"] not in BINARIZE:
+        raise ValueError(f"binarize must be one of {BINARIZE}: {cfg['binarize']}")
+    return cfg
+
+def tesseract_config(cfg: Mapping[str, Any]) -> str:
+    return f"--oem {cfg['oem']} --psm {cfg['psm']} {cfg.get('config', '')}".strip()
+
+def load_gray(b: bytes, max_side: int):
+    """bytes → (EXIF 회전 보정된 그레이스케일 PIL 이미지, 원본 DPI 또는 None). 긴 변 max_side 이하."""
+    Image = optional_import("PIL.Image")
+    ImageOps = optional_import("PIL.ImageOps")
+    im = Image.open(BytesIO(b))
+    dpi = im.info.get("dpi")
+    r = max_side / max(im.size)
+    if im.format == "JPEG" and r < 1:
+        im.draft("L", (int(im.width * r), int(im.height * r)))   # DCT 단계 1/2·1/4·1/8 축소 디코딩
+    im = ImageOps.exif_transpose(im).convert("L")
+    r = max_side / max(im.size)
+    if r < 1:
+        im = im.resize((max(1, round(im.width * r)), max(1, round(im.height * r))), Image.LANCZOS, reducing_gap=2.0)
+    return im, (float(dpi[0]) if dpi and dpi[0] else None)
+
+def _otsu(a) -> float:
+    np = optional_import("numpy")
+    hist = np.bincount(a.ravel().clip(0, 255).astype(np.uint8), minlength=256).astype(np.float64)
+    w = hist.cumsum()
+    mu = (hist * np.arange(256)).cumsum()
+    total, mu_t = w[-1], mu[-1]
+    w1 = total - w
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu_t * w - mu * total) ** 2 / (w * w1)
+    between[~np.isfinite(between)] = 0
+    return float(between.argmax())
+
+def _runs(mask) -> List[Tuple[int, int]]:
+    """1차원 bool 배열의 True 구간 [(시작, 끝)]."""
+    np = optional_import("numpy")
+    d = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(d == 1).tolist(), np.flatnonzero(d == -1).tolist()))
+
+def _edges(small):
+    """3×3 형태학적 그래디언트(팽창 - 침식, 분리 가능 필터) → 에지 bool 배열."""
+    np = optional_import("numpy")
+    a = np.asarray(small, dtype=np.int16)
+    p = np.pad(a, 1, mode="edge")
+    h, w = a.shape
+    mx = np.maximum(np.maximum(p[:, :-2], p[:, 1:-1]), p[:, 2:])
+    mn = np.minimum(np.minimum(p[:, :-2], p[:, 1:-1]), p[:, 2:])
+    mx = np.maximum(np.maximum(mx[:-2], mx[1:-1]), mx[2:])
+    mn = np.minimum(np.minimum(mn[:-2], mn[1:-1]), mn[2:])
+    grad = mx - mn
+    return grad > max(_otsu(grad), MIN_GRAD)
+
+def _components(cells) -> List[Tuple[int, int, int, int, int]]:
+    """셀 격자 연결 요소(8-이웃) → [(x0, y0, x1, y1, 셀 수)] (끝 배타)."""
+    gh, gw = cells.shape
+    seen = cells.copy()
+    out = []
+    for y, x in zip(*cells.nonzero()):
+        if not seen[y, x]:
+            continue
+        seen[y, x] = False
+        q = deque([(y, x)])
+        x0, y0, x1, y1, n = x, y, x, y, 0
+        while q:
+            cy, cx = q.popleft()
+            n += 1
+            x0, x1, y0, y1 = min(x0, cx), max(x1, cx), min(y0, cy), max(y1, cy)
+            for ny in (cy - 1, cy, cy + 1):
+                for nx in (cx - 1, cx, cx + 1):
+                    if 0 <= ny < gh and 0 <= nx < gw and seen[ny, nx]:
+                        seen[ny, nx] = False
+                        q.append((ny, nx))
+        out.append((int(x0), int(y0), int(x1) + 1, int(y1) + 1, n))
+    return out
+
+def text_regions(gray, cfg: Mapping[str, Any]) -> List[Tuple[Tuple[int, int, int, int], float]]:
+    """그레이스케일 이미지 → [((x0, y0, x1, y1) gray 좌표, 줄 높이 px)] 읽는 순서(위→아래, 왼→오른)."""
+    np = optional_import("numpy")
+    Image = optional_import("PIL.Image")
+    r = min(1.0, cfg["detect_side"] / max(gray.size))
+    small = gray.resize((max(1, round(gray.width * r)), max(1, round(gray.height * r))), Image.BILINEAR) if r < 1 else gray
+    edge = _edges(small)
+    gh, gw = edge.shape[0] // CELL, edge.shape[1] // CELL
+    if not gh or not gw:
+        return []
+    e = edge[:gh * CELL, :gw * CELL]
+    dens = e.reshape(gh, CELL, gw, CELL).mean(axis=(1, 3))
+    # 글자는 가로·세로 모두 에지 전이가 잦다(직선 구조물·난간은 한쪽만)
+    th = np.pad(e[:, 1:] != e[:, :-1], ((0, 0), (0, 1))).reshape(gh, CELL, gw, CELL).mean(axis=(1, 3))
+    tv = np.pad(e[1:] != e[:-1], ((0, 1), (0, 0))).reshape(gh, CELL, gw, CELL).mean(axis=(1, 3))
+    cells = (dens > 0.15) & (th > 0.08) & (tv > 0.08)
+    cells[:, 1:] |= cells[:, :-1].copy()      # 가로 1셀 팽창: 자간 연결(어간·줄 간격은 상자 병합에서)
+    cells[:, :-1] |= cells[:, 1:].copy()
+    scale = gray.width / small.width
+    found = []
+    for x0, y0, x1, y1, n in _components(cells):
+        bw, bh = x1 - x0, y1 - y0
+        if bw < 3 or n < 4 or n / (bw * bh) < 0.35 or bh > 0.6 * gh:
+            continue
+        sub = e[y0 * CELL:y1 * CELL, x0 * CELL:x1 * CELL]
+        prof = sub.mean(axis=1)
+        lines = [b - a for a, b in _runs(prof > max(0.05, 0.3 * prof.mean())) if b - a >= 3]
+        if not lines:
+            continue
+        line_h = float(np.median(lines)) * scale
+        score = float(dens[y0:y1, x0:x1].sum())
+        box = tuple(int(round(v * CELL * scale)) for v in (x0, y0, x1, y1))
+        found.append((score, box, line_h))
+    found = sorted(_merge(found), key=lambda f: -f[0])[:cfg["max_regions"]]
+    return [(box, lh) for _, box, lh in sorted(found, key=lambda f: (f[1][1], f[1][0]))]
+
+def _merge(found):
+    """같은 글자 크기(줄 높이 2배 이내) 상자 병합: 같은 줄(세로 겹침 절반 이상)은 가로 간격 1줄 높이까지,
+    위아래 줄(가로 겹침 절반 이상)은 세로 간격 0.6줄 높이까지 — 어간·행간만 잇고 배경 잡음끼리는 잇지 않는다."""
+    found = list(found)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(found)):
+            si, (ax0, ay0, ax1, ay1), lh = found[i]
+            for j in range(i + 1, len(found)):
+                sj, (bx0, by0, bx1, by1), lj = found[j]
+                g = max(lh, lj)
+                if g > 2 * min(lh, lj):
+                    continue
+                ov_y = min(ay1, by1) - max(ay0, by0)
+                ov_x = min(ax1, bx1) - max(ax0, bx0)
+                same_line = ov_y >= 0.5 * min(ay1 - ay0, by1 - by0) and -ov_x <= g
+                stacked = ov_x >= 0.5 * min(ax1 - ax0, bx1 - bx0) and -ov_y <= 0.6 * g
+                if same_line or stacked:
+                    found[i] = (si + sj, (min(ax0, bx0), min(ay0, by0), max(ax1, bx1), max(ay1, by1)),
+                                (lh * si + lj * sj) / (si + sj))
+                    del found[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return found
+
+def binarize(gray, method: str = "otsu", window: int = 31):
+    """그레이스케일 PIL → 이진(0/255) PIL. 검은 글자/흰 바탕으로 통일(어두운 화소가 과반이면 반전)."""
+    if method == "none":
+        return gray
+    np = optional_import("numpy")
+    Image = optional_import("PIL.Image")
+    a = np.asarray(gray, dtype=np.float32)
+    if method == "adaptive":
+        # 적분 영상으로 window×window 국소 평균 → 평균보다 충분히 어두우면 글자
+        k = max(3, window | 1)
+        p = np.pad(a, k // 2 + 1, mode="edge").cumsum(0).cumsum(1)
+        h, w = a.shape
+        s = p[k:k + h, k:k + w] - p[:h, k:k + w] - p[k:k + h, :w] + p[:h, :w]
+        dark = a < s / (k * k) - 10
+    else:
+        dark = a <= _otsu(a)
+    if dark.mean() > 0.5:
+        dark = ~dark
+    return Image.fromarray(np.where(dark, 0, 255).astype(np.uint8))
+
+def prepare_for_ocr(b: bytes, cfg: Optional[Mapping[str, Any]] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """이미지 bytes → (OCR에 넘길 PIL 이미지 목록, 전처리 정보).
+    텍스트 영역이 없거나 max_regions개를 다 채웠으면(잘린 영역이 있을 수 있음) 페이지 전체 1장 — 글자를 버리지 않는다."""
+    cfg = ocr_settings(cfg)
+    np = optional_import("numpy")
+    Image = optional_import("PIL.Image")
+    ImageOps = optional_import("PIL.ImageOps")
+    if np is None or ImageOps is None:
+        im = Image.open(BytesIO(b))
+        return [im], {"mode": "original", "ocr_px": im.width * im.height}
+    gray, dpi = load_gray(b, cfg["max_side"])
+    regions = text_regions(gray, cfg) if cfg["regions"] else []
+    cover = sum((x1 - x0) * (y1 - y0) for (x0, y0, x1, y1), _ in regions) / (gray.width * gray.height)
+    if not regions or len(regions) >= cfg["max_regions"] or cover > cfg["max_cover"]:
+        mode = "page"
+        # 이 경우 검출 영역은 믿을 수 없음(현장 사진의 구조물·질감) → 그 줄 높이로 축소하면 진짜 글자가 뭉개진다.
+        # 축소는 스캔본 DPI 메타데이터가 있을 때만(카메라 기본값 72DPI는 의미 없음)
+        r = min(1.0, cfg["target_dpi"] / dpi) if dpi and dpi > 72 else 1.0
+        regions = [((0, 0, gray.width, gray.height), cfg["char_px"] / r)]
+    else:
+        mode = "regions"
+    crops, scales = [], []
+    for (x0, y0, x1, y1), line_h in regions:
+        r = min(2.0, max(0.1, cfg["char_px"] / max(1.0, line_h)))
+        scales.append(r)
+        pad = int(line_h * 0.5)
+        crop = gray.crop((max(0, x0 - pad), max(0, y0 - pad), min(gray.width, x1 + pad), min(gray.height, y1 + pad)))
+        if abs(r - 1) > 0.05:
+            crop = crop.resize((max(1, round(crop.width * r)), max(1, round(crop.height * r))),
+                               Image.LANCZOS if r < 1 else Image.BICUBIC)
+        crop = binarize(crop, cfg["binarize"], window=int(cfg["char_px"] * 1.5))
+        crops.append(ImageOps.expand(crop, border=10, fill=255))   # tesseract는 여백이 있어야 가장자리 글자를 읽음
+    return crops, {"mode": mode, "size": gray.size, "regions": len(crops), "scales": scales,
+                   "ocr_px": sum(c.width * c.height for c in crops)}
@@ -0,0 +1,2 @@
+# iso_audit — v0.8 (Streamlit 없이 실행하는 헤드리스 심사 러너)
+# 사용: python -m iso_audit run <증거 폴더> [--sites] [--mode batch] [--jobs 4]
@@ -0,0 +1,3 @@
+from iso_audit.cli import main
+
+raise SystemExit(main())
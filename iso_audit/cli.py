@@ -0,0 +1,172 @@
+# iso_audit/cli.py — v0.8 (헤드리스 CLI)
+# 예)
+#   python -m iso_audit run ./심사자료 --backend ollama --model llama3:8b-instruct
+#   python -m iso_audit run ./sites --sites --mode batch --jobs 4 --out ./results
+#   python -m iso_audit worker --workers 4            # 작업 큐 worker(app.py "작업 큐로 실행"과 함께)
+#   python -m iso_audit submit ./sites --sites --mode batch ; python -m iso_audit jobs
+#   python -m iso_audit run ./sites --sites --mode batch --incremental   # 바뀐 증거가 걸린 조항 그룹만 재호출
+#   python -m iso_audit logs --clause 8.1 --result Cat.1 --since 2026-07-01   # 감사 로그 이력 조회
+import os, sys, json, argparse, pathlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from iso_audit.pipeline import MODES, collect_files, run_audit
+from utils.audit_logic import read_csv_utf8sig
+
+def _site_dirs(paths, sites: bool):
+    """--sites: 각 경로의 하위 폴더 하나하나를 현장으로 취급."""
+    out = []
+    for p in paths:
+        p = pathlib.Path(p)
+        if not p.is_dir():
+            raise SystemExit(f"폴더가 아닙니다: {p}")
+        if sites:
+            out.extend(sorted(d for d in p.iterdir() if d.is_dir() and not d.name.startswith(".")))
+        else:
+            out.append(p)
+    return out
+
+def cmd_run(args) -> int:
+    from iso_audit.pipeline import CHECKLIST_CSV
+    folders = _site_dirs(args.paths, args.sites)
+    out_dir = pathlib.Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    df_check = read_csv_utf8sig(str(CHECKLIST_CSV))
+    # 현장 병렬 실행 시 OCR/PDF 프로세스 풀이 코어를 나눠 쓰도록
+    ingest_workers = max(1, (os.cpu_count() or 1) // max(1, args.jobs))
+
+    def _one(folder: pathlib.Path):
+        items = collect_files(folder)
+        return run_audit(items, backend_name=args.backend, model=args.model, clause_hint=args.clause_hint,
+                         use_preset=not args.no_preset, mode=args.mode, ocr=args.ocr,
+                         bypass_cache=args.bypass_cache, log_dir=args.log_dir,
+                         site=folder.name, df_check=df_check, ingest_workers=ingest_workers,
+                         incremental=args.incremental, baseline=args.baseline)
+
+    failures = 0
+    jsonl = out_dir / "findings.jsonl"
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex, open(jsonl, "a", encoding="utf-8") as fj:
+        futs = {ex.submit(_one, f): f for f in folders}
+        for fut in as_completed(futs):
+            folder = futs[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                failures += 1
+                print(f"[FAIL] {folder}: {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            (out_dir / f"audit_{res['audit_id']}.csv").write_bytes(res["csv_bytes"])
+            for f in res["findings"]:
+                fj.write(json.dumps({"audit_id": res["audit_id"], "site": res["site"], **f}, ensure_ascii=False) + "\n")
+            fj.flush()
+            inc = res.get("incremental")
+            print(f"[OK] {folder} → audit_{res['audit_id']}.csv findings={len(res['findings'])} "
+                  f"files={res['files']} {res['elapsed']}s"
+                  + (f" 재사용={len(inc['reused'])} 재호출={len(inc['rerun'])}" if inc else ""))
+    print(f"완료: {len(folders) - failures}/{len(folders)} (결과: {out_dir})")
+    return 1 if failures else 0
+
+def cmd_worker(args) -> int:
+    from iso_audit.worker import serve
+    return serve(args.workers, args.queue)
+
+def cmd_submit(args) -> int:
+    from iso_audit.jobs import JobQueue
+    q = JobQueue(args.queue)
+    for folder in _site_dirs(args.paths, args.sites):
+        params = {"backend_name": args.backend, "model": args.model, "clause_hint": args.clause_hint,
+                  "use_preset": not args.no_preset, "mode": args.mode, "ocr": args.ocr,
+                  "bypass_cache": args.bypass_cache, "log_dir": args.log_dir, "site": folder.name,
+                  "incremental": args.incremental, "baseline": args.baseline}
+        print(f"{q.submit(collect_files(folder), params, owner=args.owner)}\t{folder}")
+    return 0
+
+def cmd_jobs(args) -> int:
+    from iso_audit.jobs import JobQueue
+    q = JobQueue(args.queue)
+    for j in q.list(owner=args.owner, status=args.status, limit=args.limit):
+        print(f"{j['id']}\t{j['status']}\t{j['owner'] or '-'}\t{j['worker'] or '-'}\t{j['progress'] or ''}"
+              f"{'  ' + j['error'].splitlines()[0] if j.get('error') else ''}")
+    print(f"대기열: {q.counts()} · worker {len(q.live_workers())}개", file=sys.stderr)
+    return 0
+
+def cmd_logs(args) -> int:
+    from utils.audit_logger import rotate
+    from utils.audit_store import AuditStore
+    if args.rotate:
+        for name in rotate(args.log_dir):
+            print(f"압축: {name}", file=sys.stderr)
+    store = AuditStore(args.log_dir)
+    print(f"적재: 새 감사 {store.sync()}건 · 전체 {store.counts()}", file=sys.stderr)
+    if args.audits:
+        df = store.query_audits(since=args.since, until=args.until, backend=args.backend, model=args.model,
+                                site=args.site, limit=args.limit)
+    else:
+        df = store.query_findings(clause=args.clause, result=args.result, since=args.since, until=args.until,
+                                  backend=args.backend, model=args.model, site=args.site, limit=args.limit)
+    df.to_csv(sys.stdout, index=False)
+    return 0
+
+def _audit_args(p: argparse.ArgumentParser):
+    p.add_argument("paths", nargs="+", help="증거 폴더(들)")
+    p.add_argument("--sites", action="store_true", help="각 폴더의 하위 폴더를 현장 단위로 각각 심사")
+    p.add_argument("--backend", default=os.getenv("LLM_BACKEND", "openai"))
+    p.add_argument("--model", default="", help="로컬 백엔드 모델명(미지정 시 환경변수 기본값)")
+    p.add_argument("--clause-hint", default="")
+    p.add_argument("--mode", choices=MODES, default="single")
+    p.add_argument("--ocr", action="store_true", help="이미지 OCR(한/영)")
+    p.add_argument("--no-preset", action="store_true", help="LM-2500 프리셋 미사용")
+    p.add_argument("--bypass-cache", action="store_true", help="LLM 응답 캐시 우회")
+    p.add_argument("--log-dir", default="./logs")
+    p.add_argument("--incremental", action="store_true",
+                   help="증분 재심사: 이전 매니페스트와 비교해 바뀐 조항 그룹/파일만 LLM 호출")
+    p.add_argument("--baseline", default="", help="매니페스트 이름(기본: 현장 폴더명)")
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="iso_audit", description="ISO 45001 헤드리스 심사 러너")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run = sub.add_parser("run", help="증거 폴더 심사")
+    _audit_args(run)
+    run.add_argument("--jobs", type=int, default=int(os.getenv("ISO_AUDIT_JOBS", "2")), help="동시에 심사할 현장 수")
+    run.add_argument("--out", default="./results")
+    run.set_defaults(func=cmd_run)
+
+    queue_help = "작업 큐 SQLite 경로(기본 ISO_AUDIT_QUEUE 또는 ./cache/jobs.sqlite)"
+    wk = sub.add_parser("worker", help="작업 큐 worker 프로세스 실행")
+    wk.add_argument("--workers", type=int, default=int(os.getenv("ISO_AUDIT_WORKERS", "2")))
+    wk.add_argument("--queue", default=None, help=queue_help)
+    wk.set_defaults(func=cmd_worker)
+
+    sm = sub.add_parser("submit", help="증거 폴더를 작업 큐에 등록(결과는 worker가 처리)")
+    _audit_args(sm)
+    sm.add_argument("--owner", default=os.getenv("USER", ""), help="제출자(심사원) 이름")
+    sm.add_argument("--queue", default=None, help=queue_help)
+    sm.set_defaults(func=cmd_submit)
+
+    jb = sub.add_parser("jobs", help="작업 큐 상태")
+    jb.add_argument("--owner", default=None)
+    jb.add_argument("--status", default=None)
+    jb.add_argument("--limit", type=int, default=30)
+    jb.add_argument("--queue", default=None, help=queue_help)
+    jb.set_defaults(func=cmd_jobs)
+
+    lg = sub.add_parser("logs", help="감사 로그 이력 조회(CSV 출력)")
+    lg.add_argument("--log-dir", default="./logs")
+    lg.add_argument("--clause", default=None, help="조항(접두 포함: 8.1 → 8.1.x)")
+    lg.add_argument("--result", action="append", default=None, help="판정(Cat.1/Cat.2/N/Y, 반복 가능)")
+    lg.add_argument("--since", default=None, help="YYYY-MM-DD (UTC)")
+    lg.add_argument("--until", default=None, help="YYYY-MM-DD (UTC, 미포함)")
+    lg.add_argument("--backend", default=None)
+    lg.add_argument("--model", default=None)
+    lg.add_argument("--site", default=None)
+    lg.add_argument("--limit", type=int, default=1000)
+    lg.add_argument("--audits", action="store_true", help="finding 대신 감사 단위로")
+    lg.add_argument("--rotate", action="store_true", help="조회 전에 지난 로그 회전·압축")
+    lg.set_defaults(func=cmd_logs)
+    return ap
+
+def main(argv=None) -> int:
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    return args.func(args)
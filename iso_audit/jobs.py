@@ -0,0 +1,225 @@
+# iso_audit/jobs.py — v0.8 (심사 작업 큐: SQLite + 스풀 폴더)
+# - app.py/CLI가 submit → worker 프로세스들이 claim → run_audit → finish. 브라우저를 새로고침해도 작업은 계속된다
+# - 저장: ISO_AUDIT_QUEUE(기본 ./cache/jobs.sqlite), 증거/결과 CSV는 같은 폴더의 jobs/<id>/ 에 파일로
+# - claim은 BEGIN IMMEDIATE로 원자적. 하트비트가 끊긴 running 작업은 requeue_stale()이 다시 대기열로(최대 MAX_ATTEMPTS)
+import os, json, time, uuid, shutil, socket, sqlite3, pathlib
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAX_ATTEMPTS = int(os.getenv("ISO_AUDIT_JOB_ATTEMPTS", "3"))
+STALE_SEC = float(os.getenv("ISO_AUDIT_JOB_STALE_SEC", "120"))   # 이 시간 동안 하트비트 없으면 작업자 사망으로 간주
+STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    files TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL, finished REAL, heartbeat REAL,
+    worker TEXT, attempts INTEGER NOT NULL DEFAULT 0,
+    progress TEXT NOT NULL DEFAULT '',
+    result TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs(owner, created);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY, host TEXT, pid INTEGER, started REAL, seen REAL, job TEXT
+);
+"""
+
+def _row(cur: sqlite3.Cursor, r: tuple) -> Dict[str, Any]:
+    d = {c[0]: v for c, v in zip(cur.description, r)}
+    for k in ("params", "files", "result"):
+        if k in d and d[k]:
+            d[k] = json.loads(d[k])
+    return d
+
+class JobQueue:
+    def __init__(self, path: Optional[str] = None):
+        self.path = pathlib.Path(path or os.getenv("ISO_AUDIT_QUEUE", "./cache/jobs.sqlite"))
+        self.spool = self.path.parent / "jobs"
+        self.spool.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+        finally:
+            con.close()
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        con = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        try:
+            con.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield con
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        finally:
+            con.close()
+
+    def job_dir(self, job_id: str) -> pathlib.Path:
+        return self.spool / job_id
+
+    # ---- 제출/조회(앱·CLI) ----
+    def submit(self, items: Sequence[Tuple[str, bytes]], params: Dict[str, Any], owner: str = "") -> str:
+        """증거 (이름, bytes)를 스풀에 쓰고 대기열에 등록. params는 run_audit 키워드 인자."""
+        job_id = time.strftime("%Y%m%dT%H%M%S") + "_" + uuid.uuid4().hex[:8]
+        d = self.job_dir(job_id) / "evidence"
+        d.mkdir(parents=True, exist_ok=True)
+        names = []
+        for i, (name, data) in enumerate(items):
+            fp = d / f"{i:04d}"
+            fp.write_bytes(data)
+            names.append(name)
+        with self._connect() as con:
+            con.execute("INSERT INTO jobs(id, owner, status, params, files, created) VALUES(?,?,?,?,?,?)",
+                        (job_id, owner, "queued", json.dumps(params, ensure_ascii=False),
+                         json.dumps(names, ensure_ascii=False), time.time()))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as con:
+            cur = con.execute("SELECT * FROM jobs WHERE id=?", (job_id,))
+            r = cur.fetchone()
+            return _row(cur, r) if r else None
+
+    def list(self, owner: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        q, args = "SELECT id, owner, status, created, started, finished, worker, attempts, progress, error FROM jobs", []
+        conds = []
+        if owner is not None:
+            conds.append("owner=?"); args.append(owner)
+        if status is not None:
+            conds.append("status=?"); args.append(status)
+        if conds:
+            q += " WHERE " + " AND ".join(conds)
+        q += " ORDER BY created DESC LIMIT ?"
+        args.append(limit)
+        with self._connect() as con:
+            cur = con.execute(q, args)
+            return [_row(cur, r) for r in cur.fetchall()]
+
+    def position(self, job_id: str) -> int:
+        """대기열에서 앞에 있는 작업 수(대기 중이 아니면 0)."""
+        with self._connect() as con:
+            r = con.execute("SELECT created FROM jobs WHERE id=? AND status='queued'", (job_id,)).fetchone()
+            if not r:
+                return 0
+            return con.execute("SELECT COUNT(*) FROM jobs WHERE status='queued' AND created<?", (r[0],)).fetchone()[0]
+
+    def csv_bytes(self, job_id: str) -> Optional[bytes]:
+        fp = self.job_dir(job_id) / "result.csv"
+        return fp.read_bytes() if fp.exists() else None
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중인 작업만 취소(실행 중인 LLM 호출은 중단하지 않는다)."""
+        with self._connect() as con:
+            n = con.execute("UPDATE jobs SET status='cancelled', finished=? WHERE id=? AND status='queued'",
+                            (time.time(), job_id)).rowcount
+        return n > 0
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as con:
+            got = dict(con.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {s: got.get(s, 0) for s in STATUSES}
+
+    def live_workers(self, within: float = 30.0) -> List[Dict[str, Any]]:
+        with self._connect() as con:
+            cur = con.execute("SELECT * FROM workers WHERE seen>=? ORDER BY id", (time.time() - within,))
+            return [_row(cur, r) for r in cur.fetchall()]
+
+    # ---- 작업자 측 ----
+    def register_worker(self, worker_id: str):
+        now = time.time()
+        with self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO workers(id, host, pid, started, seen, job) VALUES(?,?,?,?,?,NULL)",
+                        (worker_id, socket.gethostname(), os.getpid(), now, now))
+
+    def unregister_worker(self, worker_id: str):
+        with self._connect() as con:
+            con.execute("DELETE FROM workers WHERE id=?", (worker_id,))
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """가장 오래된 대기 작업 1건을 running으로 바꿔 반환(없으면 None)."""
+        now = time.time()
+        with self._connect(immediate=True) as con:
+            con.execute("UPDATE workers SET seen=?, job=NULL WHERE id=?", (now, worker_id))
+            cur = con.execute("SELECT * FROM jobs WHERE status='queued' ORDER BY created LIMIT 1")
+            r = cur.fetchone()
+            if not r:
+                return None
+            job = _row(cur, r)
+            con.execute("UPDATE jobs SET status='running', worker=?, started=?, heartbeat=?, attempts=attempts+1 "
+                        "WHERE id=?", (worker_id, now, now, job["id"]))
+            con.execute("UPDATE workers SET job=? WHERE id=?", (job["id"], worker_id))
+        job["attempts"] += 1
+        return job
+
+    def load_items(self, job: Dict[str, Any]) -> List[Tuple[str, bytes]]:
+        d = self.job_dir(job["id"]) / "evidence"
+        return [(name, (d / f"{i:04d}").read_bytes()) for i, name in enumerate(job["files"])]
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[str] = None):
+        now = time.time()
+        with self._connect() as con:
+            if progress is None:
+                con.execute("UPDATE jobs SET heartbeat=? WHERE id=? AND worker=?", (now, job_id, worker_id))
+            else:
+                con.execute("UPDATE jobs SET heartbeat=?, progress=? WHERE id=? AND worker=?",
+                            (now, progress, job_id, worker_id))
+            con.execute("UPDATE workers SET seen=? WHERE id=?", (now, worker_id))
+
+    def finish(self, job_id: str, worker_id: str, result: Dict[str, Any], csv_bytes: bytes = b"") -> bool:
+        """완료 기록. 하트비트 시간 초과로 다른 워커에 재배정된 작업이면 무시(False)."""
+        tmp = self.job_dir(job_id) / f"result.{os.getpid()}.csv"
+        if csv_bytes:
+            tmp.write_bytes(csv_bytes)
+        try:
+            with self._connect(immediate=True) as con:
+                ok = con.execute("UPDATE jobs SET status='done', finished=?, progress='완료', result=? "
+                                 "WHERE id=? AND worker=? AND status='running'",
+                                 (time.time(), json.dumps(result, ensure_ascii=False, default=str), job_id,
+                                  worker_id)).rowcount > 0
+                if ok and csv_bytes:
+                    os.replace(tmp, self.job_dir(job_id) / "result.csv")   # 커밋 전 → 재배정된 워커의 결과를 덮지 않음
+        finally:
+            tmp.unlink(missing_ok=True)
+        return ok
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = False) -> bool:
+        """실패 기록(retry면 시도 횟수 안에서 대기열로). 다른 워커에 재배정된 작업이면 무시(False)."""
+        with self._connect() as con:
+            if retry:
+                n = con.execute("UPDATE jobs SET status=CASE WHEN attempts<? THEN 'queued' ELSE 'failed' END, "
+                                "error=?, worker=NULL WHERE id=? AND worker=? AND status='running'",
+                                (MAX_ATTEMPTS, error, job_id, worker_id)).rowcount
+            else:
+                n = con.execute("UPDATE jobs SET status='failed', finished=?, error=? "
+                                "WHERE id=? AND worker=? AND status='running'",
+                                (time.time(), error, job_id, worker_id)).rowcount
+        return n > 0
+
+    def requeue_stale(self, stale_sec: float = STALE_SEC) -> int:
+        """하트비트가 끊긴 running 작업을 대기열로 되돌림(시도 횟수 초과 시 failed)."""
+        cut = time.time() - stale_sec
+        with self._connect(immediate=True) as con:
+            n = con.execute("UPDATE jobs SET status=CASE WHEN attempts<? THEN 'queued' ELSE 'failed' END, "
+                            "error='worker lost (heartbeat timeout)', worker=NULL "
+                            "WHERE status='running' AND heartbeat<?", (MAX_ATTEMPTS, cut)).rowcount
+        return n
+
+    def purge(self, older_than_days: float = 7.0) -> int:
+        """끝난 작업과 스풀 파일 정리."""
+        cut = time.time() - older_than_days * 86400
+        with self._connect() as con:
+            ids = [r[0] for r in con.execute("SELECT id FROM jobs WHERE status IN ('done','failed','cancelled') "
+                                             "AND finished<?", (cut,)).fetchall()]
+            con.executemany("DELETE FROM jobs WHERE id=?", [(i,) for i in ids])
+        for i in ids:
+            shutil.rmtree(self.job_dir(i), ignore_errors=True)
+        return len(ids)
@@ -0,0 +1,171 @@
+# iso_audit/pipeline.py — v0.8 (UI 비의존 심사 파이프라인)
+# 증거 수집 → 요약 → 행 선택 → LLM 호출(단일/배치/map-reduce) → 정규화 → CSV/감사 로그
+# app.py와 같은 파서·프롬프트·캐시를 사용하며 streamlit을 import 하지 않는다.
+import os, json, time, datetime, pathlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from llm_backends import get_backend
+from utils.audit_logic import (
+    read_csv_utf8sig, select_relevant_rows, build_system_prompt, build_user_prompt,
+    offline_baseline, to_sha1
+)
+from utils.digest_cache import DIGEST_CACHE_VERSION
+from utils.audit_logger import write_audit_log
+from utils.batch_audit import run_batch_audit, backend_semaphore
+from utils.manifest import Manifest, content_sha1, manifest_key, incremental_batch_audit
+from utils.map_reduce import map_reduce_audit, CHUNK_CHARS, CHUNK_OVERLAP
+from utils.response_cache import cached_generate, backend_model, prompt_key, is_error_result
+from utils.metrics import collect, span, write_textfile
+from ingestion.evidence_digest import digest_files
+from ingestion.ocr_preprocess import ocr_settings
+from cv.ppe_vision import vision_signature
+
+AUDIT_VERSION = "v0.7.3"
+DATA_DIR = pathlib.Path(os.getenv("ISO_AUDIT_DATA_DIR", "./data"))
+CLAUSE_CSV = DATA_DIR / "iso45001_clause_mapping_utf8sig.csv"
+CHECKLIST_CSV = DATA_DIR / "iso45001_agent_prompt_tuning_checklist_utf8sig.csv"
+PRESET_PATH = pathlib.Path("./presets/lm2500_profile.json")
+MODES = ("single", "batch", "map-reduce")
+
+# 폴더 수집 시 제외(윈도우 썸네일 캐시 등)
+_SKIP_NAMES = {"thumbs.db", "desktop.ini", ".ds_store"}
+
+def collect_files(folder: str | os.PathLike) -> List[Tuple[str, bytes]]:
+    """폴더(하위 포함)의 증거 파일을 (상대경로, bytes)로. 이름순 정렬로 실행마다 순서가 같다."""
+    root = pathlib.Path(folder)
+    items = []
+    for fp in sorted(p for p in root.rglob("*") if p.is_file()):
+        if fp.name.lower() in _SKIP_NAMES or fp.name.startswith("."):
+            continue
+        items.append((str(fp.relative_to(root)).replace(os.sep, "/"), fp.read_bytes()))
+    return items
+
+def load_preset(path: str | os.PathLike = PRESET_PATH) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def findings_to_csv(audit_id: str, findings: Sequence[Dict[str, Any]], backend_name: str, model: str,
+                    site: str = "") -> bytes:
+    rows = [{
+        "audit_id": audit_id, "clause": f["clause"], "title": f["title"], "result": f["result"],
+        "reason": f["reason"], "backend": backend_name, "model": model, **({"site": site} if site else {}),
+    } for f in findings]
+    return pd.DataFrame(rows).to_csv(index=False).encode("utf-8-sig")
+
+def run_audit(items: Sequence[Tuple[str, bytes]], backend_name: str = "openai", model: str = "",
+              clause_hint: str = "", use_preset: bool = True, mode: str = "single", ocr: bool = False,
+              bypass_cache: bool = False, log_dir: str = "./logs", site: str = "",
+              df_check: Optional[pd.DataFrame] = None, backend=None,
+              ingest_workers: Optional[int] = None, incremental: bool = False, baseline: str = "") -> Dict[str, Any]:
+    """한 현장(증거 묶음)에 대한 심사 1회. 결과 dict에 findings/csv_bytes/log_path 포함.
+    incremental: 기준선(baseline, 없으면 site) 매니페스트와 비교해 입력이 바뀐 조항 그룹/파일만 LLM 호출."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}: {mode}")
+    # 단계별 시간/카운터는 이 호출 전용 Recorder에 모아 감사 로그 extra(stages/counters)로 남긴다
+    with collect() as rec:
+        prev = None
+        if incremental:
+            # 캐시 우회 시에는 재사용 없이(빈 기준선) 다시 심사하고 매니페스트만 갱신
+            key = manifest_key(baseline, site, mode)
+            prev = Manifest(key) if bypass_cache else Manifest.load(key)
+        return _run_audit(rec, items, backend_name, model, clause_hint, use_preset, mode, ocr, bypass_cache,
+                          log_dir, site, df_check, backend, ingest_workers, prev)
+
+def _digest(items, ocr, ingest_workers, prev: Optional[Manifest], opts, ocr_config=None) -> List[str]:
+    """파일별 요약. 매니페스트에 같은 내용·옵션의 요약이 있으면 파싱하지 않는다."""
+    known = prev.digests(items, opts) if prev is not None else {}
+    todo = [i for i in range(len(items)) if i not in known]
+    fresh = iter(digest_files([items[i] for i in todo], enable_ocr=ocr, max_workers=ingest_workers,
+                              ocr_config=ocr_config) if todo else [])
+    return [known[i] if i in known else next(fresh) for i in range(len(items))]
+
+def _run_audit(rec, items, backend_name, model, clause_hint, use_preset, mode, ocr, bypass_cache,
+               log_dir, site, df_check, backend, ingest_workers, prev) -> Dict[str, Any]:
+    start_t = time.time()
+    df_check = df_check if df_check is not None else read_csv_utf8sig(str(CHECKLIST_CSV))
+    if backend is None:
+        backend = get_backend(backend_name, **({"model": model} if model and backend_name in ("ollama", "lmstudio") else {}))
+    model = model or backend_model(backend)
+
+    preset = load_preset() if use_preset else {}
+    opts = {"ocr": bool(ocr), "digest_v": DIGEST_CACHE_VERSION, "vision": vision_signature()}
+    if ocr:
+        opts["ocr_cfg"] = ocr_settings(preset.get("ocr"))
+    with span("ingest"):
+        parts = _digest(items, ocr, ingest_workers, prev, opts, preset.get("ocr")) if items else []
+    ev_digest = "\n---\n".join(parts) if parts else "증거 없음"
+
+    weights = None
+    if use_preset:
+        weights = preset.get("keywords_weight", {})
+        clause_hint = clause_hint or preset.get("clause_hint", "")
+    with span("select"):
+        df_ctx = select_relevant_rows(df_check, clause_hint, lm2500_weight=weights)
+
+    extra: Dict[str, Any] = {"mode": mode, "site": site, "files": len(items)}
+    cur = Manifest(prev.key, manifest_dir=str(prev.path.parent)) if prev is not None else None
+    if mode == "batch":
+        with span("llm"):
+            if prev is not None:
+                batch, cur = incremental_batch_audit(backend, df_check, items, parts, prev, opts,
+                                                     lm2500_weight=weights, bypass_cache=bypass_cache)
+                extra["incremental"] = batch["incremental"]
+            else:
+                batch = run_batch_audit(backend, df_check, ev_digest, lm2500_weight=weights, bypass_cache=bypass_cache)
+        findings = batch["findings"]
+        clause_hint = "batch:" + ",".join(g["group"] for g in batch["groups"])
+        extra["batch"] = batch["groups"]
+    elif mode == "map-reduce":
+        reuse, file_keys = {}, {}
+        if prev is not None:
+            # 파일 단위 재사용: 내용 + 시스템 프롬프트/힌트/백엔드·모델 + 청크 설정이 같으면 map findings 그대로
+            base = prompt_key(backend.name, model, build_system_prompt(df_ctx), f"{clause_hint}\x1f{CHUNK_CHARS}\x1f{CHUNK_OVERLAP}")
+            file_keys = {name: to_sha1(f"{base}\x1f{content_sha1(b)}") for name, b in items}
+            reuse = {name: fs for name, k in file_keys.items() if (fs := prev.findings(f"file:{name}", k)) is not None}
+        with span("llm"):
+            mr = map_reduce_audit(backend, items, df_ctx, clause_hint, bypass_cache=bypass_cache, reuse=reuse)
+        findings = mr["findings"] or offline_baseline(df_ctx, ev_digest, clause_hint)["findings"]
+        extra["map_reduce"] = {k: v for k, v in mr.items() if k not in ("findings", "by_file")}
+        if cur is not None:
+            for name, fs in mr["by_file"].items():
+                cur.set_group(f"file:{name}", file_keys[name], fs, ok=not is_error_result({"findings": fs}), files=[name])
+            extra["incremental"] = prev.summary(items, sorted(reuse), sorted(set(mr["by_file"]) - set(reuse)))
+    else:
+        system = build_system_prompt(df_ctx)
+        user = build_user_prompt(ev_digest, clause_hint)
+        key = prompt_key(backend.name, model, system, user)
+        reused = prev.findings("single", key) if prev is not None else None
+        ok = True
+        if reused is not None:
+            findings = reused
+        else:
+            try:
+                with backend_semaphore(backend), span("llm"):
+                    result, cinfo = cached_generate(backend, system, user, bypass=bypass_cache, clause_hint=clause_hint)
+                extra.update(cinfo)
+                findings = result.get("findings", [])
+            except Exception as e:
+                ok = False
+                extra["error"] = f"{type(e).__name__}: {e}"
+                findings = offline_baseline(df_ctx, ev_digest, clause_hint)["findings"]
+        if cur is not None:
+            cur.set_group("single", key, findings, ok=ok and not is_error_result({"findings": findings}),
+                          files=[name for name, _ in items])
+            extra["incremental"] = prev.summary(items, *((["single"], []) if reused is not None else ([], ["single"])))
+
+    audit_id = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ") + "_" + to_sha1(ev_digest)[:8]
+    csv_bytes = findings_to_csv(audit_id, findings, backend.name, model, site=site)
+    elapsed = time.time() - start_t
+    if cur is not None:
+        if mode != "batch":
+            for (name, b), digest in zip(items, parts):
+                cur.set_file(name, b, digest, opts)
+        cur.stamp(audit_id, backend=backend.name, model=model, mode=mode, site=site)
+        extra["incremental"]["manifest"] = cur.save()
+    extra.update(rec.as_dict())
+    log_path = write_audit_log(log_dir, audit_id, backend.name, model, clause_hint, ev_digest, csv_bytes,
+                               len(findings), AUDIT_VERSION, elapsed, extra=extra, findings=findings)
+    write_textfile()
+    return {"audit_id": audit_id, "site": site, "findings": findings, "csv_bytes": csv_bytes,
+            "log_path": log_path, "elapsed": round(elapsed, 3), "evidence_digest": ev_digest, **extra}
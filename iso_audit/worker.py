@@ -0,0 +1,107 @@
+# iso_audit/worker.py — v0.8 (작업 큐 worker 프로세스)
+#   python -m iso_audit worker --workers 4
+# 각 프로세스가 JobQueue에서 작업을 가져와 run_audit(수집→요약→행 선택→LLM→정규화→감사 로그)을 실행.
+# 처리량은 브라우저 탭 수가 아니라 worker 수에 비례한다. 체크리스트 CSV·백엔드 세션은 프로세스당 1회 준비.
+import os, sys, signal, socket, threading, traceback, multiprocessing as mp
+from typing import Any, Dict, Optional
+
+from llm_backends import get_backend
+from iso_audit.jobs import JobQueue
+from iso_audit.pipeline import CHECKLIST_CSV, run_audit
+from utils.audit_logic import read_csv_utf8sig
+from utils.audit_logger import flush_audit_logs
+
+HEARTBEAT_SEC = float(os.getenv("ISO_AUDIT_HEARTBEAT_SEC", "5"))
+POLL_SEC = float(os.getenv("ISO_AUDIT_POLL_SEC", "1"))
+
+# run_audit 에 그대로 넘기는 작업 파라미터
+JOB_PARAMS = ("backend_name", "model", "clause_hint", "use_preset", "mode", "ocr", "bypass_cache", "log_dir", "site",
+              "incremental", "baseline")
+
+_BACKENDS: Dict[tuple, Any] = {}
+
+def _backend(name: str, model: str = ""):
+    """(백엔드, 모델)별 인스턴스를 프로세스에서 재사용(라우터 통계·limiter·연결 유지)."""
+    key = (name, model)
+    if key not in _BACKENDS:
+        _BACKENDS[key] = get_backend(name, **({"model": model} if model and name in ("ollama", "lmstudio") else {}))
+    return _BACKENDS[key]
+
+def _heartbeat_loop(q: JobQueue, job_id: str, worker_id: str, stop: threading.Event):
+    while not stop.wait(HEARTBEAT_SEC):
+        try:
+            q.heartbeat(job_id, worker_id)
+        except Exception:
+            pass
+
+def run_job(q: JobQueue, job: Dict[str, Any], worker_id: str, df_check=None, ingest_workers: Optional[int] = None):
+    stop = threading.Event()
+    hb = threading.Thread(target=_heartbeat_loop, args=(q, job["id"], worker_id, stop), daemon=True)
+    hb.start()
+    try:
+        q.heartbeat(job["id"], worker_id, progress="증거 로드")
+        items = q.load_items(job)
+        params = {k: v for k, v in (job.get("params") or {}).items() if k in JOB_PARAMS}
+        q.heartbeat(job["id"], worker_id, progress=f"심사 중({params.get('mode', 'single')}, 파일 {len(items)}개)")
+        backend = _backend(params.get("backend_name") or os.getenv("LLM_BACKEND", "openai"), params.get("model", ""))
+        res = run_audit(items, df_check=df_check, ingest_workers=ingest_workers, backend=backend, **params)
+        csv_bytes = res.pop("csv_bytes", b"")
+        q.finish(job["id"], worker_id, res, csv_bytes)
+    except Exception as e:
+        q.fail(job["id"], worker_id, f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+    finally:
+        stop.set()
+
+def worker_loop(queue_path: Optional[str] = None, worker_id: Optional[str] = None, ingest_workers: Optional[int] = None,
+                stop: Optional[threading.Event] = None, max_jobs: int = 0) -> int:
+    """작업을 계속 처리. stop이 설정되거나 max_jobs(0=무제한)만큼 처리하면 종료. 처리한 작업 수 반환."""
+    q = JobQueue(queue_path)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    q.register_worker(worker_id)
+    df_check = read_csv_utf8sig(str(CHECKLIST_CSV))
+    done = 0
+    try:
+        while not stop.is_set():
+            q.requeue_stale()
+            job = q.claim(worker_id)
+            if job is None:
+                stop.wait(POLL_SEC)
+                continue
+            run_job(q, job, worker_id, df_check=df_check, ingest_workers=ingest_workers)
+            done += 1
+            if max_jobs and done >= max_jobs:
+                break
+    finally:
+        q.unregister_worker(worker_id)
+        flush_audit_logs()   # mp 자식 프로세스는 atexit이 돌지 않는다
+    return done
+
+def _proc_main(queue_path: Optional[str], idx: int, ingest_workers: int):
+    from dotenv import load_dotenv
+    load_dotenv()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *a: stop.set())
+    signal.signal(signal.SIGINT, lambda *a: stop.set())
+    worker_loop(queue_path, worker_id=f"{socket.gethostname()}:{os.getpid()}#{idx}", ingest_workers=ingest_workers, stop=stop)
+
+def serve(workers: int = 2, queue_path: Optional[str] = None) -> int:
+    """worker 프로세스 n개 실행. Ctrl+C/SIGTERM 시 진행 중 작업을 마치고 종료."""
+    workers = max(1, workers)
+    ingest_workers = max(1, (os.cpu_count() or 1) // workers)
+    procs = [mp.Process(target=_proc_main, args=(queue_path, i, ingest_workers), name=f"iso-audit-worker-{i}")
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+    print(f"workers={workers} queue={JobQueue(queue_path).path} (Ctrl+C로 종료)", file=sys.stderr)
+    try:
+        while any(p.is_alive() for p in procs):
+            for p in procs:
+                p.join(timeout=1.0)
+    except KeyboardInterrupt:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+    return 0
@@ -1,19 +1,142 @@
 
-# llm_backends.py — v0.7.3 (compat + healthcheck)
-import os, json, requests, time
-from typing import Any, Dict
+# llm_backends.py — v0.8 (compat + healthcheck + pooled HTTP/async)
+import os, json, queue, requests, time, threading, asyncio, weakref, functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from utils.audit_logic import normalize_findings_json
+from utils.optional_deps import optional_import
+from utils.metrics import span, count, observe, record_stage, bind, SIZE_BUCKETS
+
+# ---- 공유 HTTP 세션(keep-alive + 커넥션 풀) ----
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+HEALTH_TTL = float(os.getenv("LLM_HEALTH_TTL", "60"))        # 헬스체크 성공 캐시(초)
+HEALTH_FAIL_TTL = float(os.getenv("LLM_HEALTH_FAIL_TTL", "5"))  # 실패 캐시(초)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")        # 모델·KV 캐시 유지 시간
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_HEALTH: Dict[str, Tuple[bool, float]] = {}       # url -> (ok, checked_at)
+_PREFERRED: Dict[Tuple[str, ...], str] = {}      # 엔드포인트 목록 -> 마지막 성공 엔드포인트
+
+def http_session() -> requests.Session:
+    """프로세스 공유 requests.Session. 호출마다 TCP 연결을 새로 열지 않는다."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            sess = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_MAXSIZE)
+            sess.mount("http://", adapter)
+            sess.mount("https://", adapter)
+            _SESSION = sess
+        return _SESSION
+
+def async_http_client():
+    """이벤트 루프별 공유 httpx.AsyncClient(루프 종료 시 자동 해제)."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        httpx = optional_import("httpx")
+        limits = httpx.Limits(max_connections=HTTP_POOL_MAXSIZE, max_keepalive_connections=HTTP_POOL_MAXSIZE)
+        client = httpx.AsyncClient(limits=limits)
+        _ASYNC_CLIENTS[loop] = client
+    return client
+
+def _health_cached(url: str) -> Optional[bool]:
+    hit = _HEALTH.get(url)
+    if not hit:
+        return None
+    ok, ts = hit
+    if time.monotonic() - ts < (HEALTH_TTL if ok else HEALTH_FAIL_TTL):
+        return ok
+    return None
+
+def _health_store(url: str, ok: bool) -> bool:
+    _HEALTH[url] = (ok, time.monotonic())
+    return ok
+
+# ---- 호출 계측(utils.metrics): 단계 시간 llm_call, 요청/오류 수, 프롬프트·응답 크기, 스트림 TTFT ----
+def _meter_prompt(backend, system: str, user: str):
+    n = len(system or "") + len(user or "")
+    count("llm_requests", backend=backend.name)
+    count("prompt_chars", n, backend=backend.name)
+    observe("prompt_chars", n, SIZE_BUCKETS, backend=backend.name)
+
+def _meter_response(backend, n: int):
+    count("response_chars", n, backend=backend.name)
+    observe("response_chars", n, SIZE_BUCKETS, backend=backend.name)
+
+def metered(fn):
+    """generate 계측. 응답 크기는 정규화된 findings JSON 길이 기준."""
+    @functools.wraps(fn)
+    def wrap(self, system: str, user: str, **kw):
+        _meter_prompt(self, system, user)
+        try:
+            with span("llm_call", backend=self.name):
+                res = fn(self, system, user, **kw)
+        except Exception as e:
+            count("llm_errors", backend=self.name, error=type(e).__name__)
+            raise
+        _meter_response(self, len(json.dumps(res, ensure_ascii=False)))
+        return res
+    return wrap
+
+def ametered(fn):
+    @functools.wraps(fn)
+    async def wrap(self, system: str, user: str, **kw):
+        _meter_prompt(self, system, user)
+        try:
+            with span("llm_call", backend=self.name):
+                res = await fn(self, system, user, **kw)
+        except Exception as e:
+            count("llm_errors", backend=self.name, error=type(e).__name__)
+            raise
+        _meter_response(self, len(json.dumps(res, ensure_ascii=False)))
+        return res
+    return wrap
+
+def metered_stream(fn):
+    @functools.wraps(fn)
+    def wrap(self, system: str, user: str, **kw):
+        _meter_prompt(self, system, user)
+        t0, n, first = time.perf_counter(), 0, True
+        try:
+            for tok in fn(self, system, user, **kw):
+                if first:
+                    observe("llm_ttft_seconds", time.perf_counter() - t0, backend=self.name)
+                    first = False
+                n += len(tok)
+                yield tok
+        except Exception as e:
+            count("llm_errors", backend=self.name, error=type(e).__name__)
+            raise
+        finally:
+            record_stage("llm_call", time.perf_counter() - t0, backend=self.name)
+            _meter_response(self, n)
+    return wrap
 
 class BaseBackend:
     name = "base"
+    # 동시 호출 상한(배치 심사). 환경변수 <NAME>_MAX_CONCURRENCY 로 조정
+    max_concurrency = 2
     def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
         raise NotImplementedError
+    async def agenerate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        # 기본: 동기 generate를 스레드에서 실행(공유 세션 사용)
+        return await asyncio.to_thread(self.generate, system, user, **kw)
+    def stream(self, system: str, user: str, **kw) -> Iterator[str]:
+        """원문 토큰 스트림. 기본 구현은 완성 결과를 한 번에 내보낸다."""
+        yield json.dumps(self.generate(system, user, **kw), ensure_ascii=False)
 
 class OpenAIBackend(BaseBackend):
     name = "openai"
+    max_concurrency = 16   # 실제 동시성은 GPT5Client의 적응형 limiter(AIMD)가 조절
     def __init__(self):
         from gpt5_api_client import GPT5Client
         self.client = GPT5Client()
+        self.model = self.client.model
+    @metered
     def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
         clause_hint = kw.get("clause_hint","")
         # 일부 빌드는 system 키워드를 받지 않음 → 안전 호환 호출
@@ -22,6 +145,9 @@ class OpenAIBackend(BaseBackend):
         except TypeError:
             raw = self.client.analyze(user, clause_hint=clause_hint)
         return normalize_findings_json(raw)
+    @metered_stream
+    def stream(self, system: str, user: str, **kw) -> Iterator[str]:
+        yield from self.client.analyze_stream(user, system=system)
 
 class OllamaBackend(BaseBackend):
     name = "ollama"
@@ -29,14 +155,42 @@ class OllamaBackend(BaseBackend):
         self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.model    = model    or os.getenv("OLLAMA_MODEL", "llama3:8b-instruct")
         self.timeout  = timeout
+    def _payload(self, system: str, user: str) -> Dict[str, Any]:
+        # system 필드 → 모델 템플릿이 system을 항상 맨 앞에 둔다(요청 간 공통 접두사 → runner의 KV 캐시 재사용).
+        # keep_alive로 모델과 캐시를 메모리에 유지. 응답의 `context`는 직전 대화 토큰이라 다시 넘기지 않는다
+        # (이전 심사의 증거·응답이 다음 프롬프트에 섞임).
+        return {"model": self.model, "system": system, "prompt": user, "stream": False,
+                "keep_alive": OLLAMA_KEEP_ALIVE}
+    @metered
     def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
-        prompt = f"[SYSTEM]\n{system}\n\n[USER]\n{user}"
-        r = requests.post(f"{self.base_url}/api/generate",
-                          json={"model": self.model, "prompt": prompt, "stream": False},
-                          timeout=self.timeout)
+        r = http_session().post(f"{self.base_url}/api/generate",
+                                json=self._payload(system, user), timeout=self.timeout)
         r.raise_for_status()
         txt = r.json().get("response","")
         return normalize_findings_json(txt)
+    @ametered
+    async def agenerate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        if optional_import("httpx") is None:
+            return await super().agenerate(system, user, **kw)
+        r = await async_http_client().post(f"{self.base_url}/api/generate",
+                                           json=self._payload(system, user), timeout=self.timeout)
+        r.raise_for_status()
+        return normalize_findings_json(r.json().get("response",""))
+    @metered_stream
+    def stream(self, system: str, user: str, **kw) -> Iterator[str]:
+        # /api/generate stream=True → NDJSON 한 줄당 {"response": "...", "done": bool}
+        payload = dict(self._payload(system, user), stream=True)
+        with http_session().post(f"{self.base_url}/api/generate", json=payload,
+                                 timeout=self.timeout, stream=True) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
 
 class LMStudioBackend(BaseBackend):
     name = "lmstudio"
@@ -53,41 +207,271 @@ class LMStudioBackend(BaseBackend):
         self.timeout  = timeout
 
     def _health_ok(self, base):
+        # TTL 동안 결과 재사용 → 매 호출마다 /models 왕복하지 않음
+        cached = _health_cached(f"{base}/models")
+        if cached is not None:
+            return cached
         try:
-            r = requests.get(f"{base}/models", timeout=5)
-            return r.ok
+            r = http_session().get(f"{base}/models", timeout=5)
+            return _health_store(f"{base}/models", r.ok)
         except Exception:
-            return False
+            return _health_store(f"{base}/models", False)
 
-    def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
-        headers = {"Content-Type": "application/json"}
-        payload = {
+    async def _ahealth_ok(self, base):
+        cached = _health_cached(f"{base}/models")
+        if cached is not None:
+            return cached
+        try:
+            r = await async_http_client().get(f"{base}/models", timeout=5)
+            return _health_store(f"{base}/models", r.is_success)
+        except Exception:
+            return _health_store(f"{base}/models", False)
+
+    def _ordered_endpoints(self) -> List[str]:
+        # 마지막으로 응답한 엔드포인트를 먼저 시도
+        pref = _PREFERRED.get(tuple(self.endpoints))
+        if pref in self.endpoints:
+            return [pref] + [u for u in self.endpoints if u != pref]
+        return list(self.endpoints)
+
+    def _remember(self, base: str):
+        _PREFERRED[tuple(self.endpoints)] = base
+
+    def _forget(self, base: str, err: Optional[Exception] = None):
+        # HTTP 상태 오류(429/5xx)는 서버가 응답했다는 뜻 → 헬스 캐시를 실패로 덮지 않음
+        # (덮으면 HEALTH_FAIL_TTL 동안 모든 요청이 즉시 실패 — 부하 테스트에서 확인)
+        if getattr(err, "response", None) is not None:
+            return
+        _health_store(f"{base}/models", False)
+        if _PREFERRED.get(tuple(self.endpoints)) == base:
+            _PREFERRED.pop(tuple(self.endpoints), None)
+
+    def _payload(self, system: str, user: str) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "messages": [{"role":"system","content":system},{"role":"user","content":user}],
             "temperature": 0.2
         }
+
+    @metered
+    def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        headers = {"Content-Type": "application/json"}
+        payload = self._payload(system, user)
         last_err = None
-        for base in self.endpoints:
+        for base in self._ordered_endpoints():
             try:
                 if not self._health_ok(base):
                     last_err = RuntimeError(f"LM Studio health check failed: {base}/models")
                     continue
-                r = requests.post(f"{base}/chat/completions", headers=headers, json=payload, timeout=self.timeout)
+                r = http_session().post(f"{base}/chat/completions", headers=headers, json=payload, timeout=self.timeout)
                 r.raise_for_status()
                 data = r.json()
                 txt  = data["choices"][0]["message"]["content"]
+                self._remember(base)
                 return normalize_findings_json(txt)
             except Exception as e:
                 last_err = e
+                self._forget(base, e)
                 continue
         if last_err:
             raise last_err
         raise RuntimeError("No LM Studio endpoint reachable")
 
+    @metered_stream
+    def stream(self, system: str, user: str, **kw) -> Iterator[str]:
+        # OpenAI 호환 SSE: "data: {...choices[0].delta.content...}" / "data: [DONE]"
+        payload = dict(self._payload(system, user), stream=True)
+        last_err = None
+        for base in self._ordered_endpoints():
+            started = False
+            try:
+                if not self._health_ok(base):
+                    last_err = RuntimeError(f"LM Studio health check failed: {base}/models")
+                    continue
+                with http_session().post(f"{base}/chat/completions", json=payload,
+                                         timeout=self.timeout, stream=True) as r:
+                    r.raise_for_status()
+                    self._remember(base)
+                    for raw in r.iter_lines():
+                        line = raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        delta = (json.loads(data).get("choices") or [{}])[0].get("delta", {}).get("content")
+                        if delta:
+                            started = True
+                            yield delta
+                return
+            except Exception as e:
+                if started:
+                    raise  # 이미 일부 출력 → 다른 엔드포인트로 재시작하지 않음
+                last_err = e
+                self._forget(base, e)
+        if last_err:
+            raise last_err
+        raise RuntimeError("No LM Studio endpoint reachable")
+
+    @ametered
+    async def agenerate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        if optional_import("httpx") is None:
+            return await super().agenerate(system, user, **kw)
+        client = async_http_client()
+        payload = self._payload(system, user)
+        last_err = None
+        for base in self._ordered_endpoints():
+            try:
+                if not await self._ahealth_ok(base):
+                    last_err = RuntimeError(f"LM Studio health check failed: {base}/models")
+                    continue
+                r = await client.post(f"{base}/chat/completions", json=payload, timeout=self.timeout)
+                r.raise_for_status()
+                txt = r.json()["choices"][0]["message"]["content"]
+                self._remember(base)
+                return normalize_findings_json(txt)
+            except Exception as e:
+                last_err = e
+                self._forget(base, e)
+                continue
+        if last_err:
+            raise last_err
+        raise RuntimeError("No LM Studio endpoint reachable")
+
+# ---- 마이크로 배칭(로컬 서버 병렬 슬롯 활용) ----
+# Ollama/LM Studio(llama.cpp)는 배치 엔드포인트가 없고, 동시에 들어온 요청을 병렬 슬롯(OLLAMA_NUM_PARALLEL,
+# llama.cpp --parallel)에 묶어 한 번에 디코딩한다. 그래서 짧은 창(window) 동안 모인 요청을 동일 프롬프트는 1회로
+# 합친 뒤, 슬롯 수만큼 동시에 보내고 결과를 요청별 Future로 나눠 돌려준다. 스트림은 배칭하지 않는다.
+BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "10"))
+
+class BatchingBackend(BaseBackend):
+    def __init__(self, inner: BaseBackend, slots: Optional[int] = None, window_ms: Optional[float] = None,
+                 max_batch: Optional[int] = None):
+        self.inner = inner
+        self.name = inner.name                     # 캐시 키·계측 라벨은 원래 백엔드 그대로
+        self.model = getattr(inner, "model", "")
+        self.base_url = getattr(inner, "base_url", None) or getattr(inner, "endpoints", None)
+        self.slots = max(1, int(slots or os.getenv(f"{inner.name.upper()}_NUM_PARALLEL") or os.getenv("OLLAMA_NUM_PARALLEL") or 4))
+        self.window = (BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000.0
+        self.max_batch = max_batch or self.slots * 4
+        # 배치 심사 세마포어가 배처 앞에서 요청을 막지 않도록 한 배치 분량까지 허용
+        self.max_concurrency = self.max_batch
+        self._q: "queue.Queue[tuple]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix=f"{self.name}-slot")
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"batches": 0, "requests": 0, "deduped": 0, "max_batch": 0}
+
+    def _ensure_dispatcher(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._dispatch_loop, name=f"{self.name}-batcher", daemon=True)
+                self._thread.start()
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                rest = deadline - time.monotonic()
+                if rest <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=rest))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[tuple]):
+        groups: Dict[tuple, List[tuple]] = {}
+        for item in batch:
+            system, user, kw = item[0], item[1], item[2]
+            groups.setdefault((system, user, tuple(sorted((k, str(v)) for k, v in kw.items()))), []).append(item)
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(batch)
+        self.stats["deduped"] += len(batch) - len(groups)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        observe("llm_batch_size", len(batch), (1, 2, 4, 8, 16, 32, 64), backend=self.name)
+        for items in groups.values():
+            system, user, kw, _, call = items[0]
+            self._pool.submit(self._run, call, system, user, kw, [it[3] for it in items])
+
+    @staticmethod
+    def _run(call, system: str, user: str, kw: Dict[str, Any], futs: List[Future]):
+        try:
+            res = call(system, user, **kw)
+        except BaseException as e:
+            for f in futs:
+                f.set_exception(e)
+            return
+        for i, f in enumerate(futs):
+            # 중복 요청끼리 결과 dict를 공유하지 않도록 복사
+            f.set_result(res if i == 0 else json.loads(json.dumps(res, ensure_ascii=False)))
+
+    def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        self._ensure_dispatcher()
+        fut: Future = Future()
+        # 호출측 컨텍스트(metrics Recorder)를 유지한 채 슬롯 스레드에서 실행
+        self._q.put((system, user, kw, fut, bind(self.inner.generate)))
+        return fut.result()
+
+    async def agenerate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        self._ensure_dispatcher()
+        fut: Future = Future()
+        self._q.put((system, user, kw, fut, bind(self.inner.generate)))
+        return await asyncio.wrap_future(fut)
+
+    def stream(self, system: str, user: str, **kw) -> Iterator[str]:
+        return self.inner.stream(system, user, **kw)
+
+_BATCHERS: Dict[tuple, BatchingBackend] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+def batching_backend(inner: BaseBackend, **kw) -> BatchingBackend:
+    """같은 서버(이름+엔드포인트+모델)를 쓰는 모든 호출이 하나의 배처/슬롯을 공유."""
+    key = (inner.name, str(getattr(inner, "base_url", "") or getattr(inner, "endpoints", "")), getattr(inner, "model", ""))
+    with _BATCHERS_LOCK:
+        b = _BATCHERS.get(key)
+        if b is None:
+            b = _BATCHERS[key] = BatchingBackend(inner, **kw)
+        return b
+
+def _batching_enabled() -> bool:
+    return os.getenv("LLM_BATCHING", "").lower() in ("1", "true", "yes", "on")
+
+# ---- 모의 서버(mock_llm_server) — 부하/지연 테스트용 ----
+_MOCK_SERVER = None
+_MOCK_LOCK = threading.Lock()
+
+def mock_backend(flavor: str|None=None, url: str|None=None, **kw) -> BaseBackend:
+    """모의 서버를 실제 Ollama/LM Studio 백엔드 코드 경로로 호출.
+    MOCK_LLM_URL(또는 url)이 없으면 프로세스 내 스레드로 서버를 자동 기동(MOCK_LLM_* 환경변수로 지연/오류율 설정)."""
+    global _MOCK_SERVER
+    flavor = (flavor or os.getenv("MOCK_LLM_FLAVOR", "ollama")).lower()
+    url = url or os.getenv("MOCK_LLM_URL")
+    if not url:
+        with _MOCK_LOCK:
+            if _MOCK_SERVER is None:
+                from mock_llm_server import start_mock_server
+                _MOCK_SERVER = start_mock_server()
+            url = _MOCK_SERVER.url
+    kw.setdefault("model", "mock")
+    if flavor == "lmstudio":
+        return LMStudioBackend(base_url=url.rstrip("/") + "/v1", **kw)
+    return OllamaBackend(base_url=url, **kw)
+
 def get_backend(name: str|None=None, **kw) -> BaseBackend:
     name = (name or os.getenv("LLM_BACKEND","openai")).lower()
-    if name == "ollama":
-        return OllamaBackend(**kw)
-    if name == "lmstudio":
-        return LMStudioBackend(**kw)
-    return OpenAIBackend()
+    if name == "router":
+        from llm_router import router_backend
+        return router_backend(**kw)
+    if name == "mock":
+        backend = mock_backend(**kw)
+    elif name == "ollama":
+        backend = OllamaBackend(**kw)
+    elif name == "lmstudio":
+        backend = LMStudioBackend(**kw)
+    else:
+        return OpenAIBackend()
+    # LLM_BATCHING=1: 로컬 서버 요청을 마이크로 배칭(병렬 슬롯 수 = <NAME>_NUM_PARALLEL / OLLAMA_NUM_PARALLEL)
+    return batching_backend(backend) if _batching_enabled() else backend
@@ -0,0 +1,198 @@
+# llm_router.py — v0.8 (여러 LLM 엔드포인트 라우팅 + 헤지 요청 + 상태 가중 페일오버)
+# - 구성원(Ollama/LM Studio/OpenAI/모의)마다 지연·오류율 EWMA와 최근 지연 창(p95)을 유지
+# - 요청은 점수(지연 EWMA × 오류 가중)가 가장 좋은 구성원으로. 1차가 자신의 p95를 넘기면 2순위에 중복(헤지) 요청,
+#   먼저 성공한 응답을 채택 → 꼬리 지연이 가장 느린 서버가 아니라 가장 빠른 정상 서버에 묶인다
+# - 둘 다 실패하면 남은 구성원으로 순차 페일오버. 연속 실패한 구성원은 잠시 후순위(cooldown)
+# - 스트림은 헤지하지 않고(토큰 중복 표시 방지) 첫 토큰 전 실패 시에만 다음 구성원으로 넘긴다
+#   ROUTER_BACKENDS="ollama=http://gpu1:11434,ollama=http://gpu2:11434,lmstudio,openai"
+import os, time, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+from llm_backends import BaseBackend, get_backend
+from utils.metrics import count, bind
+from utils.response_cache import is_error_result, backend_model
+
+EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+HEDGE_DEFAULT_SEC = float(os.getenv("ROUTER_HEDGE_SEC", "3"))      # p95를 알기 전 헤지 지연
+HEDGE_MIN_SEC = float(os.getenv("ROUTER_HEDGE_MIN_SEC", "0.05"))
+COOLDOWN_SEC = float(os.getenv("ROUTER_COOLDOWN_SEC", "10"))
+POOL_THREADS = int(os.getenv("ROUTER_THREADS", "64"))
+MIN_SAMPLES = 8
+
+class MemberStats:
+    """구성원 1개의 지연/오류 추적(스레드 안전)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Optional[float] = None     # 성공 지연 EWMA(초)
+        self.error_rate = 0.0                    # 오류 EWMA(0~1)
+        self.recent: Deque[float] = deque(maxlen=64)
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.calls = self.errors = 0
+
+    def start(self):
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+
+    def done(self, sec: float, ok: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok:
+                self.latency = sec if self.latency is None else self.latency + EWMA_ALPHA * (sec - self.latency)
+                self.recent.append(sec)
+                self.consecutive_errors = 0
+            else:
+                self.errors += 1
+                self.consecutive_errors += 1
+                if self.consecutive_errors >= 3:
+                    self.cooldown_until = time.monotonic() + COOLDOWN_SEC
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self.recent) < MIN_SAMPLES:
+                return None
+            xs = sorted(self.recent)
+            return xs[int(0.95 * (len(xs) - 1))]
+
+    def score(self) -> float:
+        """작을수록 좋음. 표본 없는 구성원은 0(먼저 시도해 측정)."""
+        with self._lock:
+            base = 0.0 if self.latency is None else self.latency
+            return base * (1 + 4 * self.error_rate) * (1 + 0.25 * self.in_flight)
+
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        with self._lock:
+            return {"latency_ewma": round(self.latency, 4) if self.latency is not None else None,
+                    "error_rate": round(self.error_rate, 3), "p95": round(p95, 4) if p95 else None,
+                    "calls": self.calls, "errors": self.errors, "in_flight": self.in_flight,
+                    "cooldown": round(max(0.0, self.cooldown_until - time.monotonic()), 1)}
+
+class RouterBackend(BaseBackend):
+    name = "router"
+
+    def __init__(self, members: Sequence[BaseBackend], labels: Optional[Sequence[str]] = None, hedge: bool = True):
+        if not members:
+            raise ValueError("RouterBackend needs at least one member backend")
+        self.members = list(members)
+        self.labels = list(labels or [f"{m.name}#{i}" for i, m in enumerate(self.members)])
+        self.stats = [MemberStats() for _ in self.members]
+        self.hedge = hedge
+        self.max_concurrency = sum(int(getattr(m, "max_concurrency", 2)) for m in self.members)
+        self.model = "+".join(backend_model(m) or m.name for m in self.members)
+        # 호출측 동시성 + 헤지로 남은(패배한) 호출까지 담아야 하므로 넉넉히(대기열에 쌓이면 헤지가 무의미)
+        self._pool = ThreadPoolExecutor(max_workers=POOL_THREADS, thread_name_prefix="llm-router")
+
+    def ranked(self) -> List[int]:
+        return sorted(range(len(self.members)), key=lambda i: (not self.stats[i].healthy(), self.stats[i].score()))
+
+    def _call(self, i: int, system: str, user: str, kw: Dict[str, Any]) -> Dict[str, Any]:
+        st = self.stats[i]
+        st.start()
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            res = self.members[i].generate(system, user, **kw)
+            # 일부 백엔드(OpenAI)는 실패를 예외 대신 오류 finding으로 돌려준다
+            if is_error_result(res):
+                raise RuntimeError(f"{self.labels[i]}: error result")
+            ok = True
+            return res
+        finally:
+            st.done(time.perf_counter() - t0, ok)
+
+    def _hedge_delay(self, i: int) -> float:
+        p95 = self.stats[i].p95()
+        return max(HEDGE_MIN_SEC, p95 if p95 is not None else HEDGE_DEFAULT_SEC)
+
+    def generate(self, system: str, user: str, **kw) -> Dict[str, Any]:
+        order = self.ranked()
+        futs = {self._pool.submit(bind(self._call), order[0], system, user, kw): order[0]}
+        nxt, last_err = 1, None
+        hedge_at = time.monotonic() + self._hedge_delay(order[0])
+        while futs:
+            timeout = None
+            if self.hedge and nxt < len(order) and len(futs) == 1:
+                timeout = max(0.0, hedge_at - time.monotonic())
+            done, _ = wait(futs, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # 1차가 p95를 넘김 → 다음 순위에 중복 요청(느린 쪽 결과는 통계에만 반영)
+                count("router_hedges", backend=self.labels[order[nxt]])
+                futs[self._pool.submit(bind(self._call), order[nxt], system, user, kw)] = order[nxt]
+                nxt += 1
+                continue
+            for f in done:
+                i = futs.pop(f)
+                try:
+                    res = f.result()
+                except Exception as e:
+                    last_err = e
+                    continue
+                if i != order[0]:
+                    count("router_hedge_wins" if futs else "router_failovers", backend=self.labels[i])
+                return res
+            if not futs and nxt < len(order):
+                # 진행 중인 요청이 모두 실패 → 다음 구성원으로 즉시 페일오버
+                futs[self._pool.submit(bind(self._call), order[nxt], system, user, kw)] = order[nxt]
+                hedge_at = time.monotonic() + self._hedge_delay(order[nxt])
+                nxt += 1
+        raise last_err or RuntimeError("no router member available")
+
+    def stream(self, system: str, user: str, **kw) -> Iterator[str]:
+        last_err = None
+        for i in self.ranked():
+            st, started, ok = self.stats[i], False, False
+            st.start()
+            t0 = time.perf_counter()
+            try:
+                for tok in self.members[i].stream(system, user, **kw):
+                    started = True
+                    yield tok
+                ok = True
+                return
+            except GeneratorExit:
+                ok = started   # 소비측이 중간에 닫음 → 첫 토큰을 받았으면 정상 응답으로 본다
+                raise
+            except Exception as e:
+                if started:
+                    raise
+                last_err = e
+                count("router_failovers", backend=self.labels[i])
+            finally:
+                st.done(time.perf_counter() - t0, ok)
+        raise last_err or RuntimeError("no router member available")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {lbl: st.snapshot() for lbl, st in zip(self.labels, self.stats)}
+
+def _member(spec: str) -> BaseBackend:
+    """'ollama', 'ollama=http://host:11434', 'lmstudio=http://host:1234/v1', 'mock=lmstudio', 'openai'."""
+    name, _, arg = spec.strip().partition("=")
+    name = name.strip().lower()
+    if name == "mock":
+        return get_backend("mock", **({"flavor": arg} if arg else {}))
+    if name in ("ollama", "lmstudio") and arg:
+        return get_backend(name, base_url=arg.strip())
+    return get_backend(name)
+
+def router_backend(specs: Optional[str] = None, **kw) -> RouterBackend:
+    """ROUTER_BACKENDS(쉼표 구분)로 구성. 지정 없으면 ollama,lmstudio,openai."""
+    raw = specs or os.getenv("ROUTER_BACKENDS", "ollama,lmstudio,openai")
+    members, labels, errors = [], [], []
+    for spec in (s.strip() for s in raw.split(",") if s.strip()):
+        try:
+            members.append(_member(spec))
+            labels.append(spec)
+        except Exception as e:   # 예: OPENAI_API_KEY 없음 → 해당 구성원만 제외
+            errors.append(f"{spec}: {type(e).__name__}: {e}")
+    if not members:
+        raise RuntimeError("router: no usable backend (" + "; ".join(errors) + ")")
+    return RouterBackend(members, labels=labels, **kw)
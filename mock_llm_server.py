@@ -0,0 +1,328 @@
+# mock_llm_server.py — v0.8 (부하/지연 테스트용 결정적 로컬 LLM 대역 서버)
+# Ollama(/api/generate, /api/tags)와 LM Studio의 OpenAI 호환(/v1/chat/completions, /v1/models),
+# OpenAI Responses(/v1/responses, x-ratelimit-* 헤더 + rpm 한도)를 흉내 낸다.
+# 실서버 대신 실제 OllamaBackend/LMStudioBackend 코드 경로(세션/헬스체크/스트리밍)를 그대로 태울 수 있다.
+#   python mock_llm_server.py --port 11500 --latency 0.3 --token-rate 40 --error-rate 0.02 --rate-limit 0.05
+#   OLLAMA_BASE_URL=http://127.0.0.1:11500 streamlit run app.py
+# 같은 seed·같은 요청 순서면 지연/오류/응답이 동일(결정적). 응답 본문은 프롬프트 해시로만 정해진다.
+import os, re, sys, json, time, random, hashlib, argparse, threading
+from dataclasses import dataclass, asdict, fields
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List, Optional, Tuple
+
+@dataclass
+class MockConfig:
+    latency: float = 0.2          # 첫 토큰까지 기본 지연(초)
+    jitter: float = 0.1           # 지연 변동 비율(±)
+    tail_rate: float = 0.0        # 꼬리 지연(예: GPU 경합) 발생 비율
+    tail_latency: float = 2.0     # 꼬리 지연 시 추가 지연(초)
+    parallel: int = 0             # 병렬 슬롯 수(OLLAMA_NUM_PARALLEL 흉내, 0이면 무제한). 초과 요청은 대기
+    batch_slowdown: float = 0.15  # 동시 디코딩 슬롯 1개 늘 때마다 슬롯당 토큰 속도 저하 비율
+    prefill_rate: float = 0.0     # 프롬프트 처리 토큰/초(0이면 무시). 캐시된 공통 접두사는 건너뜀(KV/프롬프트 캐시 흉내)
+    prefix_cache: int = 4         # 접두사 캐시에 보관할 최근 프롬프트 수
+    token_rate: float = 0.0       # 출력 토큰/초(0이면 즉시)
+    error_rate: float = 0.0       # HTTP 500 비율
+    rate_limit: float = 0.0       # HTTP 429 비율(Retry-After 포함)
+    retry_after: float = 1.0      # 429 응답의 Retry-After(초)
+    malformed_rate: float = 0.0   # 깨진 JSON 응답 비율
+    findings: int = 3             # 응답 finding 수
+    rpm: float = 0.0              # 분당 요청 한도(0이면 없음). 초과 시 429 + Retry-After, 응답에 x-ratelimit-* 헤더
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls, **overrides) -> "MockConfig":
+        """MOCK_LLM_<FIELD> 환경변수 → 설정(overrides가 우선)."""
+        kw = {}
+        for f in fields(cls):
+            env = os.getenv(f"MOCK_LLM_{f.name.upper()}")
+            if env not in (None, ""):
+                kw[f.name] = type(f.default)(env)
+        kw.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**kw)
+
+_CLAUSE_RE = re.compile(r"\b(?:4|5|6|7|8|9|10)(?:\.\d+){0,2}\b")
+_RESULTS = ("Cat.1", "Cat.2", "Y", "N")
+
+def _n_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def findings_text(prompt: str, n: int = 3) -> str:
+    """프롬프트 해시로 정해지는 findings JSON(같은 프롬프트 → 같은 응답)."""
+    h = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest(), 16)
+    rng = random.Random(h)
+    clauses = sorted(set(_CLAUSE_RE.findall(prompt))) or ["8.1"]
+    out = [{"title": f"모의 관찰사항 {i + 1}", "clause": rng.choice(clauses),
+            "reason": f"mock:{h % 10**8:08d} 증거 검토 결과 요약", "result": rng.choice(_RESULTS)} for i in range(n)]
+    return json.dumps({"findings": out}, ensure_ascii=False)
+
+class MockState:
+    """요청 순번 기반 결정적 난수 + 통계."""
+    def __init__(self, cfg: MockConfig):
+        self.cfg = cfg
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "malformed": 0, "in_flight": 0, "max_in_flight": 0,
+                      "active_slots": 0, "tokens_out": 0, "prefill_tokens": 0, "cached_tokens": 0}
+        self.slots = threading.BoundedSemaphore(cfg.parallel) if cfg.parallel > 0 else None
+        self.recent_prompts: List[str] = []
+        self.rpm_level, self.rpm_t = cfg.rpm, time.monotonic()
+
+    def prefill_delay(self, prompt: str) -> float:
+        """최근 프롬프트와의 최장 공통 접두사는 캐시 적중, 나머지만 prefill_rate로 처리했다고 보고 지연(초) 반환."""
+        if self.cfg.prefill_rate <= 0:
+            return 0.0
+        with self.lock:
+            hit = max((len(os.path.commonprefix([p, prompt])) for p in self.recent_prompts), default=0)
+            self.recent_prompts = ([prompt] + [p for p in self.recent_prompts if p != prompt])[: max(1, self.cfg.prefix_cache)]
+            cached, new = _n_tokens(prompt[:hit]) if hit else 0, _n_tokens(prompt[hit:]) if hit < len(prompt) else 0
+            self.stats["cached_tokens"] += cached
+            self.stats["prefill_tokens"] += new
+        return new / self.cfg.prefill_rate
+
+    def take_request(self) -> Tuple[bool, Dict[str, str]]:
+        """rpm 토큰버킷에서 1개 차감. (허용 여부, x-ratelimit-* 헤더)."""
+        rpm = self.cfg.rpm
+        if rpm <= 0:
+            return True, {}
+        with self.lock:
+            now = time.monotonic()
+            self.rpm_level = min(rpm, self.rpm_level + (now - self.rpm_t) * rpm / 60.0)
+            self.rpm_t = now
+            ok = self.rpm_level >= 1
+            if ok:
+                self.rpm_level -= 1
+            reset = max(0.0, (1 - self.rpm_level) * 60.0 / rpm)
+            headers = {"x-ratelimit-limit-requests": f"{rpm:g}",
+                       "x-ratelimit-remaining-requests": str(int(self.rpm_level)),
+                       "x-ratelimit-reset-requests": f"{reset:.3f}s"}
+        if not ok:
+            headers["retry-after-ms"] = str(int(reset * 1000) + 1)
+        return ok, headers
+
+    def next_plan(self) -> Tuple[str, float, random.Random]:
+        """(결과 종류, 첫 토큰 지연, 요청별 rng)."""
+        with self.lock:
+            self.seq += 1
+            seq = self.seq
+        rng = random.Random(f"{self.cfg.seed}:{seq}")
+        roll = rng.random()
+        c = self.cfg
+        if roll < c.rate_limit:
+            kind = "429"
+        elif roll < c.rate_limit + c.error_rate:
+            kind = "500"
+        elif roll < c.rate_limit + c.error_rate + c.malformed_rate:
+            kind = "malformed"
+        else:
+            kind = "ok"
+        delay = max(0.0, c.latency * (1 + rng.uniform(-c.jitter, c.jitter)))
+        if c.tail_rate > 0 and rng.random() < c.tail_rate:
+            delay += c.tail_latency
+        return kind, delay, rng
+
+    def count(self, key: str, d: int = 1):
+        with self.lock:
+            self.stats[key] += d
+            if key == "in_flight":
+                self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+
+def _pieces(text: str, n_chars: int = 8) -> List[str]:
+    return [text[i:i + n_chars] for i in range(0, len(text), n_chars)] or [""]
+
+def _responses_obj(seq: int, model: str, text: str, prompt_tokens: int) -> Dict[str, Any]:
+    """OpenAI Responses API 응답 객체(최소 필드)."""
+    out_tokens = _n_tokens(text)
+    return {"id": f"resp_mock{seq}", "object": "response", "created_at": int(time.time()), "model": model,
+            "status": "completed", "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+            "output": [{"type": "message", "id": "msg_mock", "role": "assistant", "status": "completed",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+            "usage": {"input_tokens": prompt_tokens, "output_tokens": out_tokens,
+                      "total_tokens": prompt_tokens + out_tokens,
+                      "input_tokens_details": {"cached_tokens": 0}, "output_tokens_details": {"reasoning_tokens": 0}}}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 delayed-ACK(~40ms) 지연 방지
+    state: MockState = None  # type: ignore
+
+    def log_message(self, *a):
+        pass
+
+    # ---- 공통 ----
+    def _send_json(self, code: int, obj: Any, headers: Optional[Dict[str, str]] = None):
+        b = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(b)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(b)
+
+    def _chunk(self, s: str):
+        b = s.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(b), b))
+        self.wfile.flush()
+
+    def _read_body(self) -> Dict[str, Any]:
+        n = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(n) or b"{}")
+        except Exception:
+            return {}
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            return self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        if self.path.rstrip("/") == "/api/tags":
+            return self._send_json(200, {"models": [{"name": "mock"}]})
+        if self.path.rstrip("/") == "/stats":
+            return self._send_json(200, {**self.state.stats, "config": asdict(self.state.cfg)})
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path == "/api/generate":
+            flavor = "ollama"
+        elif path in ("/v1/chat/completions", "/chat/completions"):
+            flavor = "openai"
+        elif path in ("/v1/responses", "/responses"):
+            flavor = "responses"
+        else:
+            return self._send_json(404, {"error": "not found"})
+        body = self._read_body()
+        if flavor == "ollama":
+            prompt = f"{body.get('system', '')}\n{body.get('prompt', '')}"
+        elif flavor == "responses":
+            prompt = str(body.get("input", ""))
+        else:
+            prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages") or [])
+        st = self.state
+        st.count("requests")
+        st.count("in_flight")
+        try:
+            allowed, rl_headers = st.take_request()
+            if not allowed:
+                st.count("rate_limited")
+                return self._send_json(429, {"error": {"message": "Rate limit reached (mock rpm)", "type": "requests"}}, rl_headers)
+            if st.slots is not None:
+                st.slots.acquire()
+            st.count("active_slots")
+            try:
+                self._generate(flavor, body, prompt, rl_headers)
+            finally:
+                st.count("active_slots", -1)
+                if st.slots is not None:
+                    st.slots.release()
+        finally:
+            st.count("in_flight", -1)
+
+    def _generate(self, flavor: str, body: Dict[str, Any], prompt: str, rl_headers: Dict[str, str]):
+        st, cfg = self.state, self.state.cfg
+        kind, delay, rng = st.next_plan()
+        time.sleep(delay + st.prefill_delay(prompt))
+        if kind == "429":
+            st.count("rate_limited")
+            return self._send_json(429, {"error": "rate limited"}, {"Retry-After": f"{cfg.retry_after:g}"})
+        if kind == "500":
+            st.count("errors")
+            return self._send_json(500, {"error": "mock internal error"})
+        text = findings_text(prompt, cfg.findings)
+        if kind == "malformed":
+            st.count("malformed")
+            text = text[: rng.randint(5, max(6, len(text) - 5))]  # 잘린 JSON
+        per_piece = (2 / cfg.token_rate) if cfg.token_rate > 0 else 0.0  # 8자 ≈ 2토큰
+        # 여러 슬롯이 함께 디코딩하면 슬롯당 속도는 조금 느려지지만 합계 처리량은 늘어난다
+        per_piece *= 1 + cfg.batch_slowdown * max(0, st.stats["active_slots"] - 1)
+        if body.get("stream"):
+            self._stream(flavor, text, per_piece, body.get("model", "mock"), rl_headers, _n_tokens(prompt))
+        else:
+            if per_piece:
+                time.sleep(per_piece * len(_pieces(text)))
+            if flavor == "responses":
+                self._send_json(200, _responses_obj(st.seq, body.get("model", "mock"), text, _n_tokens(prompt)), rl_headers)
+            elif flavor == "ollama":
+                self._send_json(200, {"model": body.get("model", "mock"), "response": text, "done": True,
+                                      "prompt_eval_count": _n_tokens(prompt), "eval_count": _n_tokens(text)})
+            else:
+                self._send_json(200, {"id": f"mock-{st.seq}", "object": "chat.completion", "model": body.get("model", "mock"),
+                                      "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                                   "finish_reason": "stop"}],
+                                      "usage": {"prompt_tokens": _n_tokens(prompt), "completion_tokens": _n_tokens(text)}})
+        st.count("ok")
+        st.count("tokens_out", _n_tokens(text))
+
+    def _stream(self, flavor: str, text: str, per_piece: float, model: str,
+                headers: Optional[Dict[str, str]] = None, prompt_tokens: int = 0):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson" if flavor == "ollama" else "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        for i, piece in enumerate(_pieces(text)):
+            if per_piece:
+                time.sleep(per_piece)
+            if flavor == "ollama":
+                self._chunk(json.dumps({"model": model, "response": piece, "done": False}, ensure_ascii=False) + "\n")
+            elif flavor == "responses":
+                ev = {"type": "response.output_text.delta", "item_id": "msg_mock", "output_index": 0,
+                      "content_index": 0, "delta": piece, "sequence_number": i}
+                self._chunk(f"event: {ev['type']}\ndata: " + json.dumps(ev, ensure_ascii=False) + "\n\n")
+            else:
+                self._chunk("data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": piece}}]}, ensure_ascii=False) + "\n\n")
+        if flavor == "ollama":
+            self._chunk(json.dumps({"model": model, "response": "", "done": True}) + "\n")
+        elif flavor == "responses":
+            ev = {"type": "response.completed", "sequence_number": len(_pieces(text)),
+                  "response": _responses_obj(self.state.seq, model, text, prompt_tokens)}
+            self._chunk("event: response.completed\ndata: " + json.dumps(ev, ensure_ascii=False) + "\n\n")
+        else:
+            self._chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, cfg: Optional[MockConfig] = None):
+        self.state = MockState(cfg or MockConfig.from_env())
+        handler = type("MockHandler", (_Handler,), {"state": self.state})
+        super().__init__((host, port), handler)
+
+    def handle_error(self, request, client_address):
+        # 스트림 도중 클라이언트가 끊는 것은 정상(예: done 수신 후 종료) → 조용히 무시
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, cfg: Optional[MockConfig] = None) -> MockLLMServer:
+    """백그라운드 스레드에서 서버 시작(port=0이면 빈 포트). .url, .state.stats, .shutdown() 사용."""
+    srv = MockLLMServer(host, port, cfg)
+    threading.Thread(target=srv.serve_forever, name="mock-llm", daemon=True).start()
+    return srv
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Ollama/LM Studio 모의 서버")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=int(os.getenv("MOCK_LLM_PORT", "11500")))
+    for f in fields(MockConfig):
+        ap.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=None)
+    args = ap.parse_args(argv)
+    cfg = MockConfig.from_env(**{f.name: getattr(args, f.name) for f in fields(MockConfig)})
+    srv = MockLLMServer(args.host, args.port, cfg)
+    print(f"mock LLM server on {srv.url}  (Ollama: {srv.url}, LM Studio: {srv.url}/v1)  {asdict(cfg)}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+# pages/1_심사_이력.py — v0.8 (감사 로그 이력 조회)
+# streamlit run app.py 실행 시 사이드바에 "심사 이력" 페이지로 표시.
+# 로그 JSONL을 SQLite 롤업(utils/audit_store)에 증분 적재한 뒤 인덱스 조회 → 몇 년치 로그도 즉시 필터링
+import datetime
+import streamlit as st
+
+from utils.audit_store import AuditStore
+
+LOG_DIR = "./logs"
+RESULTS = ["Cat.1", "Cat.2", "N", "Y"]
+
+st.set_page_config(layout="wide", page_title="심사 이력")
+
+@st.cache_resource
+def audit_store() -> AuditStore:
+    return AuditStore(LOG_DIR)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def synced() -> int:
+    """새 로그 줄 적재(30초에 한 번). 반환값은 캐시 키 역할만."""
+    return audit_store().sync()
+
+def main():
+    st.title("심사 이력")
+    store = audit_store()
+    with st.spinner("로그 적재 중..."):
+        synced()
+    c = store.counts()
+    st.caption(f"롤업: 감사 {c['audits']:,}건 · finding {c['findings']:,}건 · 로그 파일 {c['files']}개 ({store.path})")
+
+    today = datetime.date.today()
+    with st.sidebar:
+        st.subheader("필터")
+        period = st.date_input("기간", (today - datetime.timedelta(days=90), today))
+        clause = st.text_input("조항(접두 포함)", "", help="8.1 → 8.1, 8.1.x 모두")
+        results = st.multiselect("판정", RESULTS, default=[])
+        backend = st.selectbox("백엔드", ["(전체)"] + store.distinct("backend"))
+        model = st.selectbox("모델", ["(전체)"] + store.distinct("model"))
+        site = st.selectbox("현장", ["(전체)"] + store.distinct("site"))
+        by = st.radio("집계 단위", ["day", "month", "year"], index=1, horizontal=True)
+        limit = st.slider("최대 행 수", 100, 5000, 1000, step=100)
+
+    # 범위 선택 중(시작일만 고른 상태)에는 1-튜플, 지운 상태에는 빈 튜플이 온다
+    period = tuple(period) if isinstance(period, (list, tuple)) else (period,)
+    since = period[0] if period else today - datetime.timedelta(days=90)
+    until = period[1] if len(period) > 1 else today
+    flt = dict(since=since, until=until + datetime.timedelta(days=1),
+               backend=None if backend == "(전체)" else backend,
+               model=None if model == "(전체)" else model,
+               site=None if site == "(전체)" else site)
+
+    summ = store.summary(by=by, clause=clause or None, **flt)
+    if not summ.empty:
+        if results:
+            summ = summ[summ["result"].isin(results)]
+        pivot = summ.pivot_table(index="period", columns="result", values="n", aggfunc="sum", fill_value=0)
+        cols = st.columns(len(pivot.columns) + 1)
+        cols[0].metric("finding", int(pivot.values.sum()))
+        for col, name in zip(cols[1:], pivot.columns):
+            col.metric(name, int(pivot[name].sum()))
+        st.bar_chart(pivot)
+
+    tab_f, tab_a = st.tabs(["Findings", "감사"])
+    with tab_f:
+        df = store.query_findings(clause=clause or None, result=results or None, limit=limit, **flt)
+        st.dataframe(df, height=420)
+        if not df.empty:
+            st.download_button("CSV 다운로드", df.to_csv(index=False).encode("utf-8-sig"),
+                               file_name="audit_findings.csv", mime="text/csv")
+    with tab_a:
+        st.dataframe(store.query_audits(limit=limit, **flt), height=420)
+
+main()
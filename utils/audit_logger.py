@@ -1,17 +1,201 @@
+# utils/audit_logger.py — v0.8 (JSONL audit log: 버퍼링 + 파일 잠금 + 회전/압축)
+# - write_audit_log: 레코드를 메모리 버퍼에 넣고 배경 스레드가 AUDIT_LOG_FLUSH_SEC(기본 1초)마다,
+#   또는 AUDIT_LOG_BATCH(기본 64)건이 쌓이면 한 번에 append. 0초로 두면 호출마다 즉시 기록(이전 동작)
+# - 여러 프로세스(app/CLI/worker)가 같은 폴더에 쓰므로 append·회전은 잠금 파일(.audit.lock) 안에서
+# - 회전: 날짜별 audit_YYYYMMDD.jsonl. AUDIT_LOG_MAX_MB(기본 64) 초과 시 또는 날짜가 지나면
+#   audit_YYYYMMDD.N.jsonl로 옮긴 뒤 gzip(.jsonl.gz). AUDIT_LOG_RETENTION_DAYS(기본 0=보관) 지난 파일 삭제
+# - 읽기: iter_log_files / iter_records (.gz 포함). 조회·집계는 utils/audit_store.py
+import os, re, json, gzip, time, atexit, shutil, hashlib, datetime, pathlib, threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-# utils/audit_logger.py — v0.7.3 (JSONL audit log)
-import os, json, datetime, pathlib, hashlib
+FLUSH_SEC = float(os.getenv("AUDIT_LOG_FLUSH_SEC", "1.0"))
+BATCH = int(os.getenv("AUDIT_LOG_BATCH", "64"))
+MAX_BYTES = int(float(os.getenv("AUDIT_LOG_MAX_MB", "64")) * 1024 * 1024)
+RETENTION_DAYS = float(os.getenv("AUDIT_LOG_RETENTION_DAYS", "0"))
+SWEEP_SEC = 3600.0
+LOCK_NAME = ".audit.lock"
+# audit_20260101.jsonl / audit_20260101.3.jsonl / audit_20260101.3.jsonl.gz
+_LOG_RE = re.compile(r"^audit_(\d{8})(?:\.(\d+))?\.jsonl(\.gz)?$")
 
 def _sha1(s: str) -> str:
     return hashlib.sha1((s or "").encode("utf-8")).hexdigest()
 
+def _today() -> str:
+    return datetime.datetime.utcnow().strftime("%Y%m%d")
+
 def _today_file(log_dir: str|os.PathLike) -> pathlib.Path:
-    d = datetime.datetime.utcnow().strftime("%Y%m%d")
     logdir = pathlib.Path(log_dir)
     logdir.mkdir(parents=True, exist_ok=True)
-    return logdir / f"audit_{d}.jsonl"
+    return logdir / f"audit_{_today()}.jsonl"
+
+@contextmanager
+def file_lock(log_dir: str|os.PathLike):
+    """프로세스 간 배타 잠금(POSIX flock / Windows msvcrt)."""
+    with open(pathlib.Path(log_dir) / LOCK_NAME, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)   # 내부적으로 ~10초 재시도
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+# ---- 회전/압축 ----
+def _free_rotated(logdir: pathlib.Path, day: str) -> pathlib.Path:
+    n = 1
+    while (logdir / f"audit_{day}.{n}.jsonl").exists() or (logdir / f"audit_{day}.{n}.jsonl.gz").exists():
+        n += 1
+    return logdir / f"audit_{day}.{n}.jsonl"
+
+def _gzip(fp: pathlib.Path) -> None:
+    gz = fp.with_name(fp.name + ".gz")
+    if not gz.exists():
+        tmp = fp.with_name(f"{fp.name}.gz.{os.getpid()}.tmp")
+        with open(fp, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, gz)
+    fp.unlink(missing_ok=True)
+
+def rotate(log_dir: str|os.PathLike, max_bytes: int = MAX_BYTES, retention_days: float = RETENTION_DAYS) -> List[str]:
+    """지난 날짜·크기 초과 파일을 회전하고 gzip. 잠금 안에서는 이름 변경만 하고 압축은 잠금 밖에서."""
+    logdir = pathlib.Path(log_dir)
+    if not logdir.is_dir():
+        return []
+    today = _today()
+    with file_lock(logdir):
+        for fp in logdir.glob("audit_*.jsonl"):
+            m = _LOG_RE.match(fp.name)
+            if m and m.group(2) is None and (m.group(1) < today or fp.stat().st_size >= max_bytes):
+                os.replace(fp, _free_rotated(logdir, m.group(1)))
+    done = []
+    for fp in sorted(logdir.glob("audit_*.*.jsonl")):
+        m = _LOG_RE.match(fp.name)
+        if m and m.group(2):
+            _gzip(fp)
+            done.append(fp.name + ".gz")
+    if retention_days > 0:
+        cut = (datetime.datetime.utcnow() - datetime.timedelta(days=retention_days)).strftime("%Y%m%d")
+        for fp in logdir.glob("audit_*.jsonl.gz"):
+            m = _LOG_RE.match(fp.name)
+            if m and m.group(1) < cut:
+                fp.unlink(missing_ok=True)
+    return done
+
+# ---- 버퍼링 writer ----
+class AuditLogWriter:
+    """log_dir당 1개(프로세스 공유). 버퍼 → 잠금 → 날짜 파일에 일괄 append."""
+    def __init__(self, log_dir: str|os.PathLike, flush_sec: float = FLUSH_SEC, batch: int = BATCH,
+                 max_bytes: int = MAX_BYTES):
+        self.log_dir = pathlib.Path(log_dir)
+        self.flush_sec, self.batch, self.max_bytes = flush_sec, max(1, batch), max_bytes
+        self._buf: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()       # 버퍼
+        self._io = threading.Lock()         # 같은 프로세스 안 flush 직렬화
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_sweep = 0.0
+
+    def write(self, rec: Dict[str, Any]) -> str:
+        fp = _today_file(self.log_dir)
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._buf.append((fp.name, line))
+            full = len(self._buf) >= self.batch
+        if self.flush_sec <= 0:
+            self.flush()
+        else:
+            self._ensure_thread()
+            if full:
+                self._wake.set()
+        return str(fp)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._loop, name="audit-log-flush", daemon=True)
+                    self._thread.start()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass   # 다음 주기에 재시도(버퍼는 flush 실패 시 되돌림)
 
-def write_audit_log(log_dir, audit_id, backend, model, clause_hint, evidence_digest, csv_bytes, findings_count, version, elapsed_sec):
+    def flush(self) -> int:
+        with self._io:
+            with self._lock:
+                buf, self._buf = self._buf, []
+            if not buf:
+                return 0
+            by_file: Dict[str, List[str]] = {}
+            for name, line in buf:
+                by_file.setdefault(name, []).append(line)
+            try:
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                with file_lock(self.log_dir):
+                    for name, lines in by_file.items():
+                        fp = self.log_dir / name
+                        if fp.exists() and fp.stat().st_size >= self.max_bytes:
+                            os.replace(fp, _free_rotated(self.log_dir, name[6:14]))
+                            self._last_sweep = 0.0   # 회전본은 곧바로 압축
+                        with open(fp, "a", encoding="utf-8") as f:
+                            f.write("".join(lines))
+            except Exception:
+                with self._lock:
+                    self._buf[:0] = buf
+                raise
+            now = time.time()
+            if now - self._last_sweep >= SWEEP_SEC:
+                self._last_sweep = now
+                try:
+                    rotate(self.log_dir, self.max_bytes)
+                except Exception:
+                    pass
+            return len(buf)
+
+_WRITERS: Dict[str, AuditLogWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_writer(log_dir: str|os.PathLike) -> AuditLogWriter:
+    key = str(pathlib.Path(log_dir).resolve())
+    with _WRITERS_LOCK:
+        if key not in _WRITERS:
+            _WRITERS[key] = AuditLogWriter(log_dir)
+        return _WRITERS[key]
+
+def flush_audit_logs() -> None:
+    """버퍼에 남은 레코드 기록(종료 직전). multiprocessing 자식은 atexit이 돌지 않으므로 직접 호출."""
+    for w in list(_WRITERS.values()):
+        try:
+            w.flush()
+        except Exception:
+            pass
+
+atexit.register(flush_audit_logs)
+
+def _compact_findings(findings) -> List[Dict[str, Any]]:
+    return [{k: f.get(k, "") for k in ("clause", "title", "result", "reason")} for f in findings or [] if isinstance(f, dict)]
+
+def write_audit_log(log_dir, audit_id, backend, model, clause_hint, evidence_digest, csv_bytes, findings_count, version, elapsed_sec, extra=None, findings=None):
     rec = {
         "audit_id": audit_id,
         "timestamp": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
@@ -24,7 +208,36 @@ def write_audit_log(log_dir, audit_id, backend, model, clause_hint, evidence_dig
         "version": version,
         "elapsed_time": round(float(elapsed_sec or 0), 3)
     }
-    fp = _today_file(log_dir)
-    with open(fp, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    return str(fp)
+    if findings is not None:
+        # 이력 조회(조항/판정별)를 위해 finding 본문도 남긴다
+        rec["findings"] = _compact_findings(findings)
+    if extra:
+        # 배치/캐시/단계별 시간 등 부가 정보(기존 키는 덮어쓰지 않음)
+        rec.update({k: v for k, v in extra.items() if k not in rec})
+    return get_writer(log_dir).write(rec)
+
+# ---- 읽기 ----
+def iter_log_files(log_dir: str|os.PathLike) -> List[pathlib.Path]:
+    """날짜·회전 번호 순(같은 날은 회전본 → 현재 파일)."""
+    logdir = pathlib.Path(log_dir)
+    if not logdir.is_dir():
+        return []
+    out = []
+    for fp in logdir.iterdir():
+        m = _LOG_RE.match(fp.name)
+        if m:
+            out.append(((m.group(1), int(m.group(2)) if m.group(2) else 10**9), fp))
+    return [fp for _, fp in sorted(out)]
+
+def iter_records(fp: str|os.PathLike) -> Iterator[Dict[str, Any]]:
+    fp = pathlib.Path(fp)
+    opener = gzip.open if fp.suffix == ".gz" else open
+    with opener(fp, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue   # 쓰다 끊긴 마지막 줄 등
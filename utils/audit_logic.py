@@ -4,6 +4,8 @@ import re, hashlib, json, os
 from typing import Dict, List, Tuple, Any, Optional
 import pandas as pd
 from pydantic import BaseModel, Field, ValidationError
+from utils.metrics import timed
+from utils.rule_engine import get_rule_engine, related
 
 CAT_DEFINITIONS = {
     "Cat.1": "ISO45001 요건의 시스템 부재 또는 심각한 시스템적 결함 또는 중대 재해 위험",
@@ -12,6 +14,11 @@ CAT_DEFINITIONS = {
     "N":     "해당 없음/적합"
 }
 
+# 병합 시 동일 항목은 더 심각한 판정을 유지
+RESULT_SEVERITY = {"Cat.1": 3, "Cat.2": 2, "Y": 1, "N": 0}
+# 오프라인(규칙 엔진) 판정 상한 — 프롬프트가 요구하는 findings 3~6개와 맞춤
+OFFLINE_MAX_FINDINGS = int(os.getenv("OFFLINE_MAX_FINDINGS", "6"))
+
 class Finding(BaseModel):
     title: str = Field(..., description="관찰/결함 제목")
     clause: str = Field(..., description="ISO45001 조항(예: 6.1.2)")
@@ -60,7 +67,12 @@ def find_requirement_text(df: pd.DataFrame, clause: str) -> str:
         return str(c.iloc[0].get(question_col,""))
     return ""
 
-def select_relevant_rows(df: pd.DataFrame, clause: str|None, lm2500_weight: Dict[str, float]|None=None) -> pd.DataFrame:
+@timed("select_rows")
+def select_relevant_rows(df: pd.DataFrame, clause: str|None, lm2500_weight: Dict[str, float]|None=None, index=None) -> pd.DataFrame:
+    # index(utils.row_index.ChecklistIndex)가 주어지면 스캔 대신 사전 인덱스 조회
+    if index is not None and index.matches(df):
+        rows = index.clause_rows(str(clause)) if (clause and index.has_clause) else None
+        return index.select(df, rows, lm2500_weight)
     sel = df.copy()
     clause_col = find_column(sel,"clause")
     if clause and clause_col:
@@ -84,20 +96,34 @@ def select_relevant_rows(df: pd.DataFrame, clause: str|None, lm2500_weight: Dict
             sel = sel.sort_values("score", ascending=False)
     return sel
 
-def build_system_prompt(context_rows: pd.DataFrame, iso_version="ISO45001:2018") -> str:
+def clause_key(clause: Any) -> Tuple[int, ...]:
+    """'8.1.10' → (8, 1, 10). 문자열 정렬('8.1.10' < '8.1.2') 대신 조항 번호 순."""
+    return tuple(int(p) if p.isdigit() else 10**6 for p in str(clause).strip().split(".") if p) or (10**6,)
+
+def _cell(v: Any) -> str:
+    return "" if v is None or (isinstance(v, float) and v != v) else str(v)
+
+# 프롬프트 레이아웃(서버 측 프롬프트/KV 캐시가 최대한 긴 공통 접두사를 재사용하도록):
+#   [고정 지시문] → [조항 요구사항(조항 순)] → [체크리스트 행(조항·제목 순, 고정 키 순서)] → user: 힌트 → 증거
+# 어떤 행을 넣을지는 점수/유사도로 고르지만, 넣는 순서는 선택 순서와 무관하게 정규화한다.
+@timed("build_prompt")
+def build_system_prompt(context_rows: pd.DataFrame, iso_version="ISO45001:2018", max_rows: int=12,
+                        requirements: Optional[List[str]] = None) -> str:
     head_df = pd.DataFrame({
-        "title": col_or_default(context_rows,"title","").head(12),
-        "clause": col_or_default(context_rows,"clause","").head(12),
-        "question": col_or_default(context_rows,"question","").head(12),
-        "evidence_type": col_or_default(context_rows,"evidence_type","").head(12),
+        "title": col_or_default(context_rows,"title","").head(max_rows).map(_cell).tolist(),
+        "clause": col_or_default(context_rows,"clause","").head(max_rows).map(_cell).tolist(),
+        "question": col_or_default(context_rows,"question","").head(max_rows).map(_cell).tolist(),
+        "evidence_type": col_or_default(context_rows,"evidence_type","").head(max_rows).map(_cell).tolist(),
     })
-    head = head_df.to_dict(orient="records")
+    head = sorted(head_df.to_dict(orient="records"), key=lambda r: (clause_key(r["clause"]), r["title"], r["question"]))
+    reqs = sorted(requirements or [], key=lambda line: (clause_key(line.split(" ", 1)[0]), line))
     return (
         f"당신은 {iso_version} 내부심사 지원 AI입니다. "
         "반드시 하나의 JSON 객체를 출력합니다. 스키마: "
         '{"findings":[{"title":"...","clause":"6.1.2","reason":"...","result":"Cat.1|Cat.2|Y|N"}]} '
         "각 항목은 조항 적합성/위험/근거를 간결하게 요약하세요. "
-        f"컨텍스트 예시: {json.dumps(head, ensure_ascii=False)}"
+        + (f"조항 요구사항: {json.dumps(reqs, ensure_ascii=False)} " if reqs else "")
+        + f"컨텍스트 예시: {json.dumps(head, ensure_ascii=False)}"
     )
 
 def build_user_prompt(evidence_digest: str, clause_hint: str|None) -> str:
@@ -108,24 +134,34 @@ def build_user_prompt(evidence_digest: str, clause_hint: str|None) -> str:
         "위 스키마를 따라 findings를 3~6개 내로 작성."
     )
 
+@timed("offline_baseline")
 def offline_baseline(context_rows: pd.DataFrame, evidence_digest: str, clause: str|None) -> Dict[str, Any]:
-    title_series = col_or_default(context_rows,"title","관리검토/운영 통제")
-    clause_series = col_or_default(context_rows,"clause", clause or "N/A")
+    """LLM 없이 규칙 엔진(utils/rule_engine)으로 판정. 컨텍스트 행 조항(상·하위 포함)에 걸린 판정을 심각도 순으로,
+    증거가 전혀 걸리지 않은 조항은 Y(확인 필요)로 채운다."""
+    titles = col_or_default(context_rows, "title", "").map(_cell).tolist()
+    clauses = col_or_default(context_rows, "clause", "").map(_cell).tolist()
+    ctx = [(c.strip(), t) for c, t in zip(clauses, titles) if c.strip()] or [(clause or "N/A", "관리검토/운영 통제")]
+    engine = get_rule_engine()
+    # 조항을 특정하지 못한 결함 문장은 명시된 조항 힌트(8.1.2 …)가 있을 때만 그 조항으로
+    m = re.match(r"\s*(\d+(?:\.\d+)+)", clause or "")
+    verdicts = engine.evaluate(evidence_digest or "", default_clause=m.group(1) if m else None)
+    picked = sorted((v for v in verdicts.values() if any(related(v["clause"], c) for c, _ in ctx)),
+                    key=lambda v: (-RESULT_SEVERITY[v["result"]], clause_key(v["clause"])))[:OFFLINE_MAX_FINDINGS]
     res = []
-    n = min(5, len(context_rows)) if len(context_rows) else 1
-    for i in range(n):
-        title = str(title_series.iloc[i]) if len(context_rows) else "관리검토/운영 통제"
-        cl    = str(clause_series.iloc[i]) if len(context_rows) else (clause or "N/A")
-        obs   = (evidence_digest or "").lower()
-        cat   = "Y"
-        if any(k in obs for k in ["미흡","부족","위반","누락","중대","사고"]):
-            cat = "Cat.2"
-        if any(k in obs for k in ["사망","산재","화재","폭발","중대재해"]):
-            cat = "Cat.1"
-        res.append(Finding(title=title or "관리검토/운영 통제", clause=cl or (clause or "N/A"),
-                           reason="오프라인 규칙 기반 임시 판단", result=cat).model_dump())
+    for v in picked:
+        title = next((t for c, t in ctx if c == v["clause"] and t), v["title"]) or "관찰사항"
+        quotes = " / ".join(f"“{q}”" for q in v["quotes"])
+        res.append(Finding(title=title, clause=v["clause"], result=v["result"],
+                           reason=f"[오프라인 규칙] {', '.join(v['terms'][:6])} — {quotes}").model_dump())
+    for c, t in ctx:
+        if len(res) >= min(5, len(ctx)):
+            break
+        if not any(related(v["clause"], c) for v in picked):
+            res.append(Finding(title=t or engine.titles.get(c) or "관리검토/운영 통제", clause=c, result="Y",
+                               reason="[오프라인 규칙] 관련 증거 없음 — 확인 필요").model_dump())
     return {"findings": res}
 
+@timed("normalize")
 def normalize_findings_json(text_or_dict: Any) -> Dict[str, Any]:
     if isinstance(text_or_dict, dict):
         data = text_or_dict
@@ -160,3 +196,20 @@ def normalize_findings_json(text_or_dict: Any) -> Dict[str, Any]:
                          "reason":str(item.get("reason","보정")),
                          "result":str(item.get("result","Y"))})
     return {"findings": norm}
+
+def merge_findings(finding_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """여러 호출의 findings를 하나로 병합. (clause, title) 중복은 더 심각한 판정으로 합친다."""
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for items in finding_lists:
+        for f in items or []:
+            key = (str(f.get("clause","")).strip(), str(f.get("title","")).strip().lower())
+            cur = merged.get(key)
+            if cur is None:
+                merged[key] = dict(f)
+                continue
+            if RESULT_SEVERITY.get(f.get("result"), 1) > RESULT_SEVERITY.get(cur.get("result"), 1):
+                cur["result"] = f.get("result")
+            reason = str(f.get("reason","")).strip()
+            if reason and reason not in str(cur.get("reason","")):
+                cur["reason"] = f"{cur.get('reason','')} / {reason}"
+    return list(merged.values())
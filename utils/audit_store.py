@@ -0,0 +1,238 @@
+# utils/audit_store.py — v0.8 (감사 로그 롤업/조회: SQLite)
+# - logs/audit_*.jsonl(.gz)를 SQLite 롤업(AUDIT_INDEX_PATH, 기본 <log_dir>/audit_index.sqlite)에 증분 적재
+#   파일별로 읽은 위치(offset)를 기억해 새로 붙은 줄만 읽는다. 회전·압축된 파일은 한 번 다시 읽지만 레코드 해시로 중복 제거
+# - audits(감사 1건) / findings(finding 1건) 테이블 + timestamp·backend·model·clause 인덱스 → 몇 년치 로그도 범위 조회
+#   예) "최근 분기 8.1 조항 Cat.1" → query_findings(clause="8.1", result="Cat.1", since="2026-07-01")
+import os, gzip, json, time, sqlite3, hashlib, calendar, datetime, pathlib, threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+
+from utils.audit_logger import iter_log_files
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    rid TEXT PRIMARY KEY,
+    audit_id TEXT, ts REAL, backend TEXT, model TEXT, clause_hint TEXT, site TEXT, mode TEXT,
+    findings_count INTEGER, elapsed REAL, version TEXT, hash_evidence TEXT, hash_csv TEXT,
+    file TEXT, extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_audits_ts ON audits(ts);
+CREATE INDEX IF NOT EXISTS idx_audits_backend ON audits(backend, ts);
+CREATE INDEX IF NOT EXISTS idx_audits_model ON audits(model, ts);
+CREATE INDEX IF NOT EXISTS idx_audits_site ON audits(site, ts);
+CREATE INDEX IF NOT EXISTS idx_audits_audit_id ON audits(audit_id);
+CREATE TABLE IF NOT EXISTS findings (
+    rid TEXT NOT NULL, idx INTEGER NOT NULL,
+    audit_id TEXT, ts REAL, backend TEXT, model TEXT, site TEXT,
+    clause TEXT, clause_group TEXT, title TEXT, result TEXT, reason TEXT,
+    PRIMARY KEY (rid, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_findings_ts ON findings(ts);
+CREATE INDEX IF NOT EXISTS idx_findings_clause ON findings(clause, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_result ON findings(result, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_backend ON findings(backend, ts);
+CREATE INDEX IF NOT EXISTS idx_findings_model ON findings(model, ts);
+CREATE TABLE IF NOT EXISTS sources (
+    file TEXT PRIMARY KEY, size INTEGER NOT NULL, offset INTEGER NOT NULL, synced REAL NOT NULL
+);
+"""
+
+# audits 열로 옮기는 레코드 키(나머지는 extra JSON)
+_AUDIT_KEYS = ("audit_id", "timestamp", "backend", "model", "clause_hint", "site", "mode", "findings_count",
+               "elapsed_time", "version", "hash_evidence", "hash_csv", "findings")
+TimeLike = Union[None, str, float, int, datetime.date, datetime.datetime]
+
+def _ts(s: str) -> float:
+    try:
+        return float(calendar.timegm(time.strptime(s, "%Y-%m-%dT%H:%M:%SZ")))
+    except (TypeError, ValueError):
+        return 0.0
+
+def _epoch(v: TimeLike) -> Optional[float]:
+    """None / epoch 초 / 'YYYY-MM-DD[THH:MM:SS]' / date / datetime(naive는 UTC) → epoch 초."""
+    if v is None or v == "":
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    if isinstance(v, str):
+        v = datetime.datetime.fromisoformat(v.rstrip("Z"))
+    if not isinstance(v, datetime.datetime):
+        v = datetime.datetime(v.year, v.month, v.day)
+    if v.tzinfo is not None:
+        return v.timestamp()
+    return float(calendar.timegm(v.timetuple()))
+
+def _in(col: str, v: Union[None, str, Sequence[str]], conds: List[str], args: List[Any]):
+    if v is None or v == "" or (not isinstance(v, str) and not list(v)):
+        return
+    vals = [v] if isinstance(v, str) else list(v)
+    conds.append(f"{col} IN ({','.join('?' * len(vals))})")
+    args.extend(vals)
+
+class AuditStore:
+    def __init__(self, log_dir: str|os.PathLike = "./logs", path: Optional[str] = None):
+        self.log_dir = pathlib.Path(log_dir)
+        self.path = pathlib.Path(path or os.getenv("AUDIT_INDEX_PATH", "") or self.log_dir / "audit_index.sqlite")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        con = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+        finally:
+            con.close()
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        con = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        try:
+            con.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield con
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        finally:
+            con.close()
+
+    # ---- 적재 ----
+    def _ingest(self, con: sqlite3.Connection, file: str, lines: Iterable[bytes]) -> int:
+        n = 0
+        for raw in lines:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                rec = json.loads(raw)
+            except ValueError:
+                continue
+            rid = hashlib.sha1(raw).hexdigest()
+            ts = _ts(rec.get("timestamp", ""))
+            extra = {k: v for k, v in rec.items() if k not in _AUDIT_KEYS}
+            cur = con.execute(
+                "INSERT OR IGNORE INTO audits VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (rid, rec.get("audit_id", ""), ts, rec.get("backend", ""), rec.get("model", ""),
+                 rec.get("clause_hint", ""), rec.get("site", ""), rec.get("mode", ""),
+                 int(rec.get("findings_count") or 0), float(rec.get("elapsed_time") or 0), rec.get("version", ""),
+                 rec.get("hash_evidence", ""), rec.get("hash_csv", ""), file,
+                 json.dumps(extra, ensure_ascii=False, default=str)))
+            if cur.rowcount != 1:
+                continue   # 회전 전 파일에서 이미 적재한 레코드
+            con.executemany(
+                "INSERT OR IGNORE INTO findings VALUES(?,?,?,?,?,?,?,?,?,?,?,?)",
+                [(rid, i, rec.get("audit_id", ""), ts, rec.get("backend", ""), rec.get("model", ""), rec.get("site", ""),
+                  str(f.get("clause", "")).strip(), str(f.get("clause", "")).strip().split(".", 1)[0],
+                  f.get("title", ""), f.get("result", ""), f.get("reason", ""))
+                 for i, f in enumerate(rec.get("findings") or []) if isinstance(f, dict)])
+            n += 1
+        return n
+
+    def sync(self) -> int:
+        """새 로그 줄을 롤업에 반영. 새로 적재한 감사 건수 반환."""
+        added = 0
+        with self._lock, self._connect(immediate=True) as con:
+            state = {r[0]: (r[1], r[2]) for r in con.execute("SELECT file, size, offset FROM sources")}
+            files = iter_log_files(self.log_dir)
+            for fp in files:
+                try:
+                    size = fp.stat().st_size
+                    prev_size, offset = state.get(fp.name, (0, 0))
+                    if fp.suffix == ".gz":
+                        if fp.name in state and prev_size == size:
+                            continue
+                        with gzip.open(fp, "rb") as f:
+                            added += self._ingest(con, fp.name, f)
+                        offset = size
+                    else:
+                        offset = offset if size >= offset else 0   # 파일이 바뀌었으면 처음부터
+                        if size == offset:
+                            continue
+                        with open(fp, "rb") as f:
+                            f.seek(offset)
+                            data = f.read(size - offset)
+                        end = data.rfind(b"\n") + 1     # 쓰는 중인 마지막 줄은 다음 번에
+                        added += self._ingest(con, fp.name, data[:end].split(b"\n"))
+                        offset += end
+                except FileNotFoundError:
+                    continue   # 그 사이 회전·압축됨 → 다음 sync에서 새 이름으로
+                con.execute("INSERT OR REPLACE INTO sources VALUES(?,?,?,?)", (fp.name, size, offset, time.time()))
+            gone = set(state) - {fp.name for fp in files}
+            con.executemany("DELETE FROM sources WHERE file=?", [(f,) for f in gone])
+        return added
+
+    # ---- 조회 ----
+    def _where(self, since: TimeLike, until: TimeLike, backend, model, site) -> Tuple[List[str], List[Any]]:
+        conds: List[str] = []
+        args: List[Any] = []
+        if _epoch(since) is not None:
+            conds.append("ts >= ?"); args.append(_epoch(since))
+        if _epoch(until) is not None:
+            conds.append("ts < ?"); args.append(_epoch(until))
+        _in("backend", backend, conds, args)
+        _in("model", model, conds, args)
+        _in("site", site, conds, args)
+        return conds, args
+
+    def _df(self, sql: str, args: Sequence[Any]) -> pd.DataFrame:
+        with self._connect() as con:
+            cur = con.execute(sql, list(args))
+            return pd.DataFrame(cur.fetchall(), columns=[c[0] for c in cur.description])
+
+    def query_findings(self, clause: Optional[str] = None, result: Union[None, str, Sequence[str]] = None,
+                       since: TimeLike = None, until: TimeLike = None, backend=None, model=None, site=None,
+                       limit: int = 1000, offset: int = 0) -> pd.DataFrame:
+        """finding 단위 조회(최신순). clause는 접두 조항 포함('8.1' → 8.1, 8.1.x). until은 미포함."""
+        conds, args = self._where(since, until, backend, model, site)
+        if clause:
+            c = str(clause).strip().rstrip(".")
+            # LIKE 대신 범위 비교 → (clause, ts) 인덱스 사용. '/'는 ASCII에서 '.' 다음 문자
+            conds.append("(clause = ? OR (clause >= ? AND clause < ?))"); args += [c, c + ".", c + "/"]
+        _in("result", result, conds, args)
+        sql = ("SELECT datetime(ts, 'unixepoch') AS timestamp, audit_id, site, backend, model, clause, title, result, reason "
+               "FROM findings" + (" WHERE " + " AND ".join(conds) if conds else "") +
+               " ORDER BY ts DESC, rid, idx LIMIT ? OFFSET ?")
+        return self._df(sql, args + [int(limit), int(offset)])
+
+    def query_audits(self, since: TimeLike = None, until: TimeLike = None, backend=None, model=None, site=None,
+                     limit: int = 200, offset: int = 0) -> pd.DataFrame:
+        conds, args = self._where(since, until, backend, model, site)
+        sql = ("SELECT datetime(ts, 'unixepoch') AS timestamp, audit_id, site, backend, model, mode, clause_hint, "
+               "findings_count, elapsed, version, hash_evidence, file FROM audits" +
+               (" WHERE " + " AND ".join(conds) if conds else "") + " ORDER BY ts DESC LIMIT ? OFFSET ?")
+        return self._df(sql, args + [int(limit), int(offset)])
+
+    def summary(self, since: TimeLike = None, until: TimeLike = None, by: str = "month", clause: Optional[str] = None,
+                backend=None, model=None, site=None) -> pd.DataFrame:
+        """기간(day|month|year) × 판정별 finding 수."""
+        fmt = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}[by]
+        conds, args = self._where(since, until, backend, model, site)
+        if clause:
+            c = str(clause).strip().rstrip(".")
+            conds.append("(clause = ? OR (clause >= ? AND clause < ?))"); args += [c, c + ".", c + "/"]
+        sql = (f"SELECT strftime('{fmt}', ts, 'unixepoch') AS period, result, COUNT(*) AS n FROM findings" +
+               (" WHERE " + " AND ".join(conds) if conds else "") + " GROUP BY period, result ORDER BY period")
+        return self._df(sql, args)
+
+    def distinct(self, col: str) -> List[str]:
+        if col not in ("backend", "model", "site", "mode"):
+            raise ValueError(f"unsupported column: {col}")
+        with self._connect() as con:
+            return [r[0] for r in con.execute(f"SELECT DISTINCT {col} FROM audits WHERE {col} != '' ORDER BY {col}")]
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as con:
+            return {"audits": con.execute("SELECT COUNT(*) FROM audits").fetchone()[0],
+                    "findings": con.execute("SELECT COUNT(*) FROM findings").fetchone()[0],
+                    "files": con.execute("SELECT COUNT(*) FROM sources").fetchone()[0]}
+
+_STORES: Dict[str, AuditStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def get_audit_store(log_dir: str|os.PathLike = "./logs") -> AuditStore:
+    key = str(pathlib.Path(log_dir).resolve())
+    with _STORES_LOCK:
+        if key not in _STORES:
+            _STORES[key] = AuditStore(log_dir)
+        return _STORES[key]
@@ -0,0 +1,155 @@
+# utils/batch_audit.py — v0.8 (조항 그룹별 일괄 심사)
+# - 체크리스트를 최상위 조항(4~10)으로 분할 → 그룹별 system/user 프롬프트 생성
+# - 백엔드별 동시 호출 상한(세마포어, 프로세스 공유) 안에서 병렬 호출
+# - 결과는 merge_findings로 하나의 findings 목록으로 병합
+# - (증분 재심사) route_evidence로 파일을 관련 조항 그룹에만 배정 → 파일 하나가 바뀌어도 해당 그룹만 다시 호출
+import os, re, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from utils.audit_logic import (
+    find_column, select_relevant_rows, build_system_prompt, build_user_prompt,
+    offline_baseline, merge_findings
+)
+from utils.response_cache import cached_generate, prompt_key, backend_model
+from utils.metrics import bind, count
+from utils.retrieval import build_retriever
+
+CLAUSE_GROUP_TITLES = {
+    "4": "조직상황", "5": "리더십과 근로자 참여", "6": "기획", "7": "지원",
+    "8": "운용", "9": "성과평가", "10": "개선",
+}
+
+ROUTE_TOP_GROUPS = int(os.getenv("BATCH_ROUTE_GROUPS", "2"))
+# 본문/파일명의 조항 번호(4.1 ~ 10.3.2). 앞에 숫자·점이 붙은 날짜/버전(2024.10.01, v0.8)은 제외
+_CLAUSE_REF = re.compile(r"(?<![\d.])(10|[4-9])\.\d{1,2}(?:\.\d{1,2})*(?![\d.])")
+
+_SEMAPHORES: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+_SEM_LOCK = threading.Lock()
+
+def clause_group(clause: Any) -> str:
+    """'8.1.4.2' → '8'"""
+    return str(clause).strip().split(".", 1)[0]
+
+def _group_sort_key(g: str):
+    return (0, int(g)) if g.isdigit() else (1, g)
+
+def split_by_clause_group(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    clause_col = find_column(df, "clause")
+    if clause_col is None or df.empty:
+        return {"": df}
+    groups = df[clause_col].map(clause_group)
+    return {g: df[groups == g] for g in sorted(groups.unique(), key=_group_sort_key)}
+
+def backend_concurrency(backend) -> int:
+    env = os.getenv(f"{getattr(backend, 'name', 'base').upper()}_MAX_CONCURRENCY")
+    if env:
+        return max(1, int(env))
+    return max(1, int(getattr(backend, "max_concurrency", 2)))
+
+def backend_semaphore(backend) -> threading.BoundedSemaphore:
+    """같은 백엔드(이름+엔드포인트)를 쓰는 모든 배치가 상한을 공유하도록 프로세스 단위로 보관."""
+    endpoint = str(getattr(backend, "base_url", "") or getattr(backend, "endpoints", ""))
+    key = (getattr(backend, "name", "base"), endpoint)
+    with _SEM_LOCK:
+        if key not in _SEMAPHORES:
+            _SEMAPHORES[key] = threading.BoundedSemaphore(backend_concurrency(backend))
+        return _SEMAPHORES[key]
+
+def route_evidence(df_check: pd.DataFrame, names: Sequence[str], parts: Sequence[str], retriever=None,
+                   top_groups: int = ROUTE_TOP_GROUPS) -> Dict[str, List[int]]:
+    """파일 → 관련 조항 그룹 배정 {그룹: [파일 위치]}. 결정적(같은 파일이면 같은 배정).
+    1) 파일명/요약에 조항 번호가 있으면 그 그룹들  2) 없으면 체크리스트 행 유사도 상위 top_groups개 그룹
+    3) 둘 다 없으면 전체 그룹(놓치지 않도록 보수적으로)"""
+    groups = split_by_clause_group(df_check)
+    out: Dict[str, List[int]] = {g: [] for g in groups}
+    if list(groups) == [""]:
+        out[""] = list(range(len(parts)))
+        return out
+    labels = df_check[find_column(df_check, "clause")].map(clause_group).tolist()
+    for i, (name, text) in enumerate(zip(names, parts)):
+        hit = {m.group(1) for m in _CLAUSE_REF.finditer(f"{name}\n{text}")} & set(groups)
+        if not hit:
+            retriever = retriever or build_retriever(df_check)
+            pos, sims = retriever.top_k(text, k=len(df_check))
+            best: Dict[str, float] = {}
+            for p, sim in zip(pos.tolist(), sims.tolist()):   # 유사도 내림차순 → 그룹별 첫 행이 최댓값
+                if sim > 0:
+                    best.setdefault(labels[p], sim)
+            hit = set(sorted(best, key=lambda g: (-best[g], _group_sort_key(g)))[:top_groups]) or set(groups)
+        for g in hit:
+            out[g].append(i)
+    return out
+
+def build_group_prompts(df_check: pd.DataFrame, evidence_digest: str,
+                        lm2500_weight: Optional[Dict[str, float]]=None, index=None,
+                        evidence_by_group: Optional[Dict[str, str]]=None) -> List[Dict[str, Any]]:
+    """evidence_by_group이 있으면 그룹마다 배정된 증거만(없으면 전체 증거 요약) user 프롬프트에 넣는다.
+    job["evidence"]는 그 그룹에 쓴 증거(실패 시 오프라인 폴백 입력)."""
+    use_index = index is not None and index.matches(df_check) and index.has_clause
+    jobs = []
+    for g, df_g in split_by_clause_group(df_check).items():
+        if use_index:
+            ctx = index.select(df_check, index.clause_group_rows(g), lm2500_weight)
+        else:
+            ctx = select_relevant_rows(df_g, None, lm2500_weight=lm2500_weight)
+        hint = f"{g} {CLAUSE_GROUP_TITLES.get(g, '')}".strip()
+        evidence = evidence_digest if evidence_by_group is None else evidence_by_group.get(g) or "관련 증거 없음"
+        jobs.append({
+            "group": g, "clause_hint": hint, "context": ctx, "evidence": evidence,
+            "system": build_system_prompt(ctx),
+            "user": build_user_prompt(evidence, hint),
+        })
+    return jobs
+
+def run_batch_audit(backend, df_check: pd.DataFrame, evidence_digest: str,
+                    lm2500_weight: Optional[Dict[str, float]]=None,
+                    max_concurrency: Optional[int]=None, bypass_cache: bool=False, index=None,
+                    on_group_done: Optional[Callable[[Dict[str, Any]], None]]=None,
+                    evidence_by_group: Optional[Dict[str, str]]=None,
+                    previous=None) -> Dict[str, Any]:
+    """그룹별 호출을 동시에 실행. 실패 그룹은 오프라인 규칙으로 폴백하고 error에 기록.
+    previous(utils.manifest.Manifest)가 주어지면 프롬프트 키가 같은 그룹은 호출 없이 이전 findings 재사용."""
+    jobs = build_group_prompts(df_check, evidence_digest, lm2500_weight=lm2500_weight, index=index,
+                               evidence_by_group=evidence_by_group)
+    sem = backend_semaphore(backend)
+    workers = min(max_concurrency or backend_concurrency(backend), max(1, len(jobs)))
+    model = backend_model(backend)
+
+    def _run(job: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.time()
+        key = prompt_key(getattr(backend, "name", "base"), model, job["system"], job["user"])
+        status = {"group": job["group"], "clause_hint": job["clause_hint"], "rows": len(job["context"]),
+                  "cache_hit": False, "error": "", "prompt": key, "reused": False}
+        reused = previous.findings(job["group"], key) if previous is not None else None
+        if reused is not None:
+            count("manifest_reused_groups")
+            status.update(reused=True, findings=reused, findings_count=len(reused), elapsed=round(time.time() - t0, 3))
+            if on_group_done:
+                on_group_done(status)
+            return status
+        try:
+            with sem:
+                result, cinfo = cached_generate(backend, job["system"], job["user"], bypass=bypass_cache,
+                                                clause_hint=job["clause_hint"])
+            status.update(cinfo)
+            findings = result.get("findings", [])
+        except Exception as e:
+            status["error"] = f"{type(e).__name__}: {e}"
+            # 폴백도 LLM에 보낸 것과 같은 그룹 배정 증거로(전체 요약을 쓰면 다른 그룹 증거로 판정)
+            findings = offline_baseline(job["context"], job["evidence"], job["group"])["findings"]
+        status.update(findings=findings, findings_count=len(findings), elapsed=round(time.time() - t0, 3))
+        if on_group_done:
+            on_group_done(status)
+        return status
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(bind(_run), jobs))  # 그룹(조항) 순서 유지, 단계 시간은 호출자 Recorder로
+    return {
+        "findings": merge_findings([r["findings"] for r in results]),
+        "groups": [{k: v for k, v in r.items() if k != "findings"} for r in results],
+        "group_findings": {r["group"]: r["findings"] for r in results},
+        "elapsed": round(time.time() - t0, 3),
+    }
@@ -0,0 +1,102 @@
+# utils/digest_cache.py — v0.8 (증거 요약 캐시: 메모리 LRU + 디스크)
+# - 키: 파일 바이트 SHA-1 + 파서 옵션(OCR on/off, 언어, max_chars 등)
+# - 메모리: LRU(DIGEST_CACHE_MAX, 기본 512건)
+# - 디스크: DIGEST_CACHE_DIR(기본 ./cache/digest, 빈 값이면 비활성) → 재시작/세션 간 재사용
+import os, json, hashlib, pathlib, threading
+from collections import OrderedDict
+from typing import Optional
+
+# 요약 포맷이 바뀌면 올려서 기존 디스크 캐시를 무효화
+DIGEST_CACHE_VERSION = "1"
+
+def digest_key(b: bytes, **opts) -> str:
+    """바이트 SHA-1 + 옵션 해시. 옵션은 키 정렬 후 직렬화하므로 순서 무관."""
+    content = hashlib.sha1(b or b"").hexdigest()
+    opts = dict(opts, _v=DIGEST_CACHE_VERSION)
+    opt_s = json.dumps(opts, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{content}_{hashlib.sha1(opt_s.encode('utf-8')).hexdigest()[:12]}"
+
+class DigestCache:
+    def __init__(self, max_items: int = 512, cache_dir: Optional[str] = None):
+        self.max_items = max(1, int(max_items))
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else None
+        self._mem: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> Optional[pathlib.Path]:
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return self._mem[key]
+        fp = self._disk_path(key)
+        if fp is not None and fp.exists():
+            try:
+                val = fp.read_text(encoding="utf-8")
+            except Exception:
+                val = None
+            if val is not None:
+                self._remember(key, val)
+                with self._lock:
+                    self.hits += 1
+                return val
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: str) -> None:
+        self._remember(key, value)
+        fp = self._disk_path(key)
+        if fp is None:
+            return
+        try:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            tmp = fp.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(value, encoding="utf-8")
+            os.replace(tmp, fp)  # 원자적 교체(동시 실행 안전)
+        except Exception:
+            pass
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lock:
+            self._mem[key] = value
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_items:
+                self._mem.popitem(last=False)
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._mem.clear()
+            self.hits = self.misses = 0
+        if disk and self.cache_dir and self.cache_dir.exists():
+            for fp in self.cache_dir.glob("*/*.txt"):
+                try:
+                    fp.unlink()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._mem), "hits": self.hits, "misses": self.misses,
+                    "disk": str(self.cache_dir) if self.cache_dir else ""}
+
+_CACHE: Optional[DigestCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_digest_cache() -> DigestCache:
+    """프로세스 단위 싱글턴. Streamlit rerun/세션 간에도 모듈 상태로 유지된다."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = DigestCache(
+                max_items=int(os.getenv("DIGEST_CACHE_MAX", "512")),
+                cache_dir=os.getenv("DIGEST_CACHE_DIR", "./cache/digest") or None,
+            )
+        return _CACHE
@@ -0,0 +1,121 @@
+# utils/manifest.py — v0.8 (증분 재심사 매니페스트)
+# - 현장/기준선마다 마지막 심사의 매니페스트 1개: MANIFEST_DIR(기본 ./cache/manifests)/<key>.json
+# - files : 증거 파일별 내용 SHA-1, 요약과 요약 SHA-1(write_audit_log의 hash_evidence와 같은 to_sha1), 배정된 조항 그룹
+# - groups: 조항 그룹별 프롬프트 키(prompt_key: backend+model+system+user), 사용 파일, findings
+# 재심사 시 내용이 같은 파일은 요약을 그대로 쓰고, 프롬프트 키가 같은 그룹은 저장된 findings를 재사용 → 바뀐 그룹만 LLM 호출
+import os, re, json, time, hashlib, pathlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.audit_logic import to_sha1
+from utils.batch_audit import route_evidence, run_batch_audit
+from utils.response_cache import is_error_result
+
+MANIFEST_VERSION = 1
+MANIFEST_DIR = os.getenv("MANIFEST_DIR", "./cache/manifests")
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+def content_sha1(b: bytes) -> str:
+    return hashlib.sha1(b or b"").hexdigest()
+
+class Manifest:
+    def __init__(self, key: str = "default", data: Optional[Dict[str, Any]] = None, manifest_dir: Optional[str] = None):
+        self.key = key or "default"
+        self.path = pathlib.Path(manifest_dir or MANIFEST_DIR) / f"{_UNSAFE.sub('_', self.key).strip('_') or 'default'}.json"
+        self.data = data or {"version": MANIFEST_VERSION, "key": self.key, "files": {}, "groups": {}}
+
+    @classmethod
+    def load(cls, key: str = "default", manifest_dir: Optional[str] = None) -> "Manifest":
+        """이전 매니페스트(없거나 깨졌거나 버전이 다르면 빈 매니페스트)."""
+        m = cls(key, manifest_dir=manifest_dir)
+        try:
+            data = json.loads(m.path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                m.data = data
+        except Exception:
+            pass
+        return m
+
+    @property
+    def files(self) -> Dict[str, Dict[str, Any]]:
+        return self.data["files"]
+
+    @property
+    def groups(self) -> Dict[str, Dict[str, Any]]:
+        return self.data["groups"]
+
+    def save(self) -> str:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.data, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, self.path)
+        return str(self.path)
+
+    # ---- 이전 실행 조회 ----
+    def digests(self, items: Sequence[Tuple[str, bytes]], opts: Dict[str, Any]) -> Dict[int, str]:
+        """이름·내용·요약 옵션이 같은 파일의 요약 {입력 위치: 요약}."""
+        out = {}
+        for i, (name, b) in enumerate(items):
+            f = self.files.get(name)
+            if f and f.get("opts") == opts and f.get("sha1") == content_sha1(b) and "digest" in f:
+                out[i] = f["digest"]
+        return out
+
+    def findings(self, group: str, prompt: str) -> Optional[List[Dict[str, Any]]]:
+        """같은 프롬프트 키로 정상 완료된 그룹의 findings(없으면 None)."""
+        g = self.groups.get(group)
+        if g and g.get("ok") and g.get("prompt") == prompt:
+            return [dict(f) for f in g.get("findings", [])]
+        return None
+
+    def diff(self, items: Sequence[Tuple[str, bytes]]) -> Dict[str, List[str]]:
+        """이번 증거 묶음과 이전 매니페스트의 파일 비교."""
+        now = {name: content_sha1(b) for name, b in items}
+        out: Dict[str, List[str]] = {"added": [], "changed": [], "unchanged": [], "removed": []}
+        for name, sha in now.items():
+            prev = self.files.get(name)
+            out["added" if prev is None else "unchanged" if prev.get("sha1") == sha else "changed"].append(name)
+        out["removed"] = sorted(set(self.files) - set(now))
+        return out
+
+    def summary(self, items: Sequence[Tuple[str, bytes]], reused: Sequence[str], rerun: Sequence[str]) -> Dict[str, Any]:
+        """감사 로그 extra["incremental"]: 파일 변경(추가/변경/삭제)과 재사용/재호출 그룹."""
+        diff = self.diff(items)
+        return {"baseline": self.key, "added": diff["added"], "changed": diff["changed"], "removed": diff["removed"],
+                "unchanged": len(diff["unchanged"]), "reused": list(reused), "rerun": list(rerun)}
+
+    # ---- 이번 실행 기록 ----
+    def set_file(self, name: str, b: bytes, digest: str, opts: Dict[str, Any], groups: Sequence[str] = ()):
+        self.files[name] = {"sha1": content_sha1(b), "digest_sha1": to_sha1(digest), "digest": digest,
+                            "opts": opts, "groups": list(groups)}
+
+    def set_group(self, group: str, prompt: str, findings: List[Dict[str, Any]], ok: bool = True,
+                  files: Sequence[str] = ()):
+        self.groups[group] = {"prompt": prompt, "findings": findings, "ok": bool(ok), "files": list(files)}
+
+    def stamp(self, audit_id: str, **info):
+        self.data.update(audit_id=audit_id, updated=time.time(), **info)
+
+def manifest_key(baseline: str = "", site: str = "", mode: str = "single") -> str:
+    """기준선 이름(없으면 현장명) + 모드. 모드마다 그룹 구성이 달라 매니페스트를 따로 둔다."""
+    return f"{baseline or site or 'default'}.{mode}"
+
+def incremental_batch_audit(backend, df_check, items: Sequence[Tuple[str, bytes]], parts: Sequence[str],
+                            previous: Manifest, opts: Dict[str, Any], **batch_kw) -> Tuple[Dict[str, Any], Manifest]:
+    """조항 그룹별로 관련 파일만 배정해 일괄 심사. 이전 매니페스트와 프롬프트 키가 같은 그룹은 재사용.
+    (batch 결과 + incremental 요약, 새 매니페스트) 반환 — 저장은 호출자가 audit_id를 찍은 뒤."""
+    names = [name for name, _ in items]
+    routes = route_evidence(df_check, names, parts)
+    ev_by_group = {g: "\n---\n".join(parts[i] for i in idx) for g, idx in routes.items()}
+    batch = run_batch_audit(backend, df_check, "\n---\n".join(parts) or "증거 없음", evidence_by_group=ev_by_group,
+                            previous=previous, **batch_kw)
+    cur = Manifest(previous.key, manifest_dir=str(previous.path.parent))
+    for i, (name, b) in enumerate(items):
+        cur.set_file(name, b, parts[i], opts, groups=[g for g, idx in routes.items() if i in idx])
+    for g in batch["groups"]:
+        fs = batch["group_findings"].get(g["group"], [])
+        # 예외 없이 돌아온 "API 호출 실패" finding도 실패로 기록 → 다음 증분 재심사에서 다시 호출
+        cur.set_group(g["group"], g["prompt"], fs, ok=not g["error"] and not is_error_result({"findings": fs}),
+                      files=[names[i] for i in routes.get(g["group"], [])])
+    batch["incremental"] = previous.summary(items, [g["group"] for g in batch["groups"] if g["reused"]],
+                                            [g["group"] for g in batch["groups"] if not g["reused"]])
+    return batch, cur
@@ -0,0 +1,217 @@
+# utils/map_reduce.py — v0.8 (전체 문서 청크 분석: map-reduce)
+# - map: 문서를 페이지 스트림으로 읽어 겹치는 청크로 분할 → 청크별 finding 추출을 병렬 호출
+# - reduce: merge_findings로 (조항, 제목) 중복 제거·심각도 병합 후 조항 순 정렬
+# - 전체 마감시간(MAPREDUCE_DEADLINE) 안에 끝나지 않은 청크는 건너뛰고 보고 → 실행 시간 상한 보장
+#   마감 후: 대기 중 청크는 호출하지 않고, 진행 중 호출은 백엔드 세마포어 칸을 바로 반납(다른 심사가 기다리지 않음).
+#   진행 중 HTTP 호출 자체는 끊을 수 없어 백엔드 timeout까지 계속되며, 그 결과는 버리고 응답 캐시에도 쓰지 않는다.
+import os, time, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from utils.audit_logic import build_system_prompt, build_user_prompt, merge_findings, RESULT_SEVERITY
+from utils.batch_audit import backend_concurrency, backend_semaphore
+from utils.response_cache import cached_generate
+from utils.metrics import bind
+from ingestion.evidence_parser import digest_file, _ext_from_name
+from ingestion.document_loader import iter_pdf_pages, _read_docx_bytes, _read_txt_bytes
+
+CHUNK_CHARS = int(os.getenv("MAPREDUCE_CHUNK_CHARS", "3000"))
+CHUNK_OVERLAP = int(os.getenv("MAPREDUCE_CHUNK_OVERLAP", "300"))
+MAX_CHUNKS = int(os.getenv("MAPREDUCE_MAX_CHUNKS", "200"))
+DEADLINE = float(os.getenv("MAPREDUCE_DEADLINE", "600"))
+MAX_PER_CLAUSE = int(os.getenv("MAPREDUCE_MAX_PER_CLAUSE", "3"))
+REASON_MAX_CHARS = 800
+
+class _Slot:
+    """청크 1개가 쥔 백엔드 세마포어 칸. 마감 시 호출 스레드가 대신 반납할 수 있고, 두 번 반납하지 않는다."""
+
+    def __init__(self, sem: threading.BoundedSemaphore):
+        self.sem = sem
+        self._held = False
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel: threading.Event) -> bool:
+        while not self.sem.acquire(timeout=0.1):
+            if cancel.is_set():
+                return False
+        with self._lock:
+            self._held = True
+        if cancel.is_set():   # 칸을 얻는 사이 마감 → 호출하지 않음
+            self.release()
+            return False
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._held:
+                self._held = False
+                self.sem.release()
+
+def _cut(text: str, start: int, size: int) -> int:
+    """start부터 size 이내에서 자를 위치. 가능하면 후반부의 줄바꿈 경계."""
+    end = min(len(text), start + size)
+    if end < len(text):
+        nl = text.rfind("\n", start + size // 2, end)
+        if nl > start:
+            end = nl
+    return end
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """겹치는 고정 길이 청크. 가능하면 줄바꿈 경계에서 자른다."""
+    text = text or ""
+    overlap = min(overlap, size // 2)
+    out, start = [], 0
+    while start < len(text):
+        end = _cut(text, start, size)
+        piece = text[start:end].strip()
+        if piece:
+            out.append(piece)
+        if end >= len(text):
+            break
+        start = max(start + 1, end - overlap)
+    return out
+
+def iter_document_chunks(name: str, b: bytes, size: int = CHUNK_CHARS,
+                         overlap: int = CHUNK_OVERLAP) -> Iterator[Tuple[str, str]]:
+    """(위치 라벨, 청크) 스트림. PDF는 페이지를 읽는 대로 청크를 내보내 메모리를 일정하게 유지."""
+    ext = _ext_from_name(name)
+    if ext == "pdf":
+        overlap = min(overlap, size // 2)
+        buf, first, last = "", 1, 1
+        for page_no, txt in iter_pdf_pages(b):
+            buf = f"{buf}\n{txt}" if buf else txt
+            last = page_no
+            # 다음 페이지와 이어질 수 있으므로 size+overlap 이상 쌓였을 때만 잘라냄
+            while len(buf) > size + overlap:
+                end = _cut(buf, 0, size)
+                piece = buf[:end].strip()
+                if piece:
+                    yield f"p.{first}-{last}", piece
+                buf = buf[max(1, end - overlap):]
+                first = page_no
+        if buf.strip():
+            yield f"p.{first}-{last}", buf.strip()
+        return
+    if ext == "docx":
+        text = _read_docx_bytes(b)
+    elif ext in ("txt", "md", "csv", "log"):
+        text = _read_txt_bytes(b)
+    else:
+        # 이미지/기타: 기존 요약(EXIF·OCR 등)을 한 청크로
+        yield "summary", digest_file(name, b)
+        return
+    for i, piece in enumerate(chunk_text(text, size, overlap), start=1):
+        yield f"#{i}", piece
+
+def _clause_sort_key(f: Dict[str, Any]):
+    parts = [int(p) if p.isdigit() else 0 for p in str(f.get("clause", "")).split(".")]
+    return (not parts or parts == [0], parts)
+
+def reduce_findings(finding_lists: Sequence[List[Dict[str, Any]]], max_per_clause: int = MAX_PER_CLAUSE) -> List[Dict[str, Any]]:
+    """(조항, 제목) 병합 → 조항별로 심각한 순 상위 max_per_clause건만 유지 → 조항 순 정렬."""
+    by_clause: Dict[str, List[Dict[str, Any]]] = {}
+    for f in merge_findings(list(finding_lists)):
+        if len(f.get("reason", "")) > REASON_MAX_CHARS:
+            f["reason"] = f["reason"][:REASON_MAX_CHARS] + "…"
+        by_clause.setdefault(str(f.get("clause", "")).strip(), []).append(f)
+    out = []
+    for items in by_clause.values():
+        items.sort(key=lambda f: -RESULT_SEVERITY.get(f.get("result"), 1))
+        out.extend(items[:max_per_clause])
+    return sorted(out, key=_clause_sort_key)
+
+def map_reduce_audit(backend, items: Sequence[Tuple[str, bytes]], df_ctx: pd.DataFrame, clause_hint: str,
+                     max_concurrency: Optional[int] = None, bypass_cache: bool = False,
+                     deadline: Optional[float] = None,
+                     on_progress: Optional[Callable[[int, int, str], None]] = None,
+                     reuse: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """on_progress는 호출 스레드에서 불리므로 Streamlit 위젯 갱신에 그대로 쓸 수 있다.
+    reuse {파일명: map findings}의 파일은 청크 분할·호출 없이 그대로 reduce에 넣는다(증분 재심사).
+    by_file에는 모든 청크가 오류/건너뜀 없이 끝난 파일의 map findings만 담는다."""
+    deadline = DEADLINE if deadline is None else deadline
+    reuse = reuse or {}
+    system = build_system_prompt(df_ctx)
+    chunks: List[Tuple[str, str, str]] = []
+    for name, b in items:
+        if name in reuse:
+            continue
+        if len(chunks) >= MAX_CHUNKS:
+            break
+        for label, piece in iter_document_chunks(name, b):
+            if len(chunks) >= MAX_CHUNKS:
+                break
+            chunks.append((name, f"{name} {label}", piece))
+    sem = backend_semaphore(backend)
+    workers = min(max_concurrency or backend_concurrency(backend), max(1, len(chunks)))
+
+    cancel = threading.Event()   # 마감 시 설정
+    slots: List[_Slot] = []
+
+    def _map(name: str, src: str, piece: str) -> Optional[Dict[str, Any]]:
+        user = build_user_prompt(f"[{src}]\n{piece}", clause_hint)
+        slot = _Slot(sem)
+        slots.append(slot)
+        if not slot.acquire(cancel):
+            return None   # 마감 후라 결과를 쓰지 않음
+        try:
+            result, cinfo = cached_generate(backend, system, user, bypass=bypass_cache, cancel=cancel,
+                                            clause_hint=clause_hint)
+        finally:
+            slot.release()
+        findings = []
+        for f in result.get("findings", []):
+            f = dict(f)
+            f["reason"] = f"{f.get('reason', '')} (출처: {src})"
+            findings.append(f)
+        return {"file": name, "source": src, "findings": findings, **cinfo}
+
+    t0 = time.time()
+    mapped, errors, done = [], [], 0
+    ex = ThreadPoolExecutor(max_workers=workers)
+    futs = {ex.submit(bind(_map), name, src, piece): (name, src) for name, src, piece in chunks}
+    pending = set(futs)
+    try:
+        while pending:
+            left = deadline - (time.time() - t0) if deadline else None
+            if left is not None and left <= 0:
+                break
+            finished, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                done += 1
+                try:
+                    mapped.append(fut.result())
+                except Exception as e:
+                    errors.append({"file": futs[fut][0], "source": futs[fut][1], "error": f"{type(e).__name__}: {e}"})
+                if on_progress:
+                    on_progress(done, len(chunks), futs[fut][1])
+    finally:
+        cancel.set()
+        for slot in list(slots):
+            slot.release()
+        ex.shutdown(wait=False, cancel_futures=True)
+    skipped = [futs[f][1] for f in pending]
+    incomplete = {futs[f][0] for f in pending} | {e["file"] for e in errors}
+    # MAX_CHUNKS에 걸려 잘렸거나 빠진 파일
+    incomplete |= {name for name, _ in items if name not in reuse} - {c[0] for c in chunks}
+    if len(chunks) >= MAX_CHUNKS:
+        incomplete.add(chunks[-1][0])
+    by_file: Dict[str, List[Dict[str, Any]]] = {name: list(fs) for name, fs in reuse.items()}
+    for name, _, _ in chunks:
+        if name not in incomplete:
+            by_file.setdefault(name, [])
+    for m in mapped:
+        if m["file"] in by_file and m["file"] not in reuse:
+            by_file[m["file"]].extend(m["findings"])
+    findings = reduce_findings(list(reuse.values()) + [m["findings"] for m in mapped])
+    return {
+        "findings": findings,
+        "by_file": by_file,
+        "reused_files": sorted(reuse),
+        "chunks": len(chunks),
+        "mapped": len(mapped),
+        "cache_hits": sum(1 for m in mapped if m.get("cache_hit")),
+        "errors": errors,
+        "skipped": skipped,
+        "elapsed": round(time.time() - t0, 3),
+    }
@@ -0,0 +1,203 @@
+# utils/metrics.py — v0.8 (단계별 타이밍 + 카운터/히스토그램 + Prometheus 내보내기)
+# - span("llm") 같은 컨텍스트 매니저로 단계 시간을 잰다. 값은 두 곳에 쌓인다:
+#     1) 프로세스 전역 레지스트리(카운터/히스토그램) → Prometheus 텍스트(파일 또는 /metrics HTTP)
+#     2) 현재 심사 실행의 Recorder(collect()로 시작) → audit 로그 JSONL의 stages/counters
+# - Recorder는 contextvar로 전달. 스레드 풀 작업은 bind(fn)으로 감싸야 같은 Recorder에 기록된다.
+# - 의존성 없음(prometheus_client 불필요). METRICS_TEXTFILE / METRICS_PORT 로 내보내기.
+import os, time, functools, threading, contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+PREFIX = "iso_audit_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+class Registry:
+    """스레드 안전 카운터/히스토그램 저장소."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.hists: Dict[str, Dict[LabelKey, list]] = {}   # [bucket counts..., sum, count]
+        self.buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        k = _key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[k] = series.get(k, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets: Optional[Tuple[float, ...]] = None, **labels):
+        k = _key(labels)
+        with self._lock:
+            b = self.buckets.setdefault(name, buckets or DEFAULT_BUCKETS)
+            h = self.hists.setdefault(name, {}).get(k)
+            if h is None:
+                h = self.hists[name][k] = [0] * len(b) + [0.0, 0]
+            for i, le in enumerate(b):
+                if value <= le:
+                    h[i] += 1
+            h[-2] += value
+            h[-1] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        def lbl(k: LabelKey, le: Optional[str] = None) -> str:
+            pairs = list(k) + ([("le", le)] if le is not None else [])
+            parts = ['%s="%s"' % (a, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for a, v in pairs]
+            return "{" + ",".join(parts) + "}" if parts else ""
+        out = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                full = PREFIX + name
+                out.append(f"# TYPE {full} counter")
+                for k, v in series.items():
+                    out.append(f"{full}{lbl(k)} {v:g}")
+            for name, series in sorted(self.hists.items()):
+                full = PREFIX + name
+                b = self.buckets[name]
+                out.append(f"# TYPE {full} histogram")
+                for k, h in series.items():
+                    for i, le in enumerate(b):
+                        out.append(f"{full}_bucket{lbl(k, str(int(le)) if float(le).is_integer() else f'{le:g}')} {h[i]}")
+                    out.append(f"{full}_bucket{lbl(k, '+Inf')} {h[-1]}")
+                    out.append(f"{full}_sum{lbl(k)} {h[-2]:.6f}")
+                    out.append(f"{full}_count{lbl(k)} {h[-1]}")
+        return "\n".join(out) + "\n"
+
+REGISTRY = Registry()
+
+class Recorder:
+    """심사 1회분 단계 시간(초, 누적)과 카운터. 여러 스레드에서 동시에 기록 가능."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+
+    def add_stage(self, name: str, sec: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + sec
+
+    def add(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"stages": {k: round(v, 4) for k, v in self.stages.items()},
+                    "counters": {k: (int(v) if float(v).is_integer() else round(v, 4)) for k, v in self.counters.items()}}
+
+_CURRENT: "contextvars.ContextVar[Optional[Recorder]]" = contextvars.ContextVar("iso_audit_recorder", default=None)
+
+@contextmanager
+def collect() -> Iterator[Recorder]:
+    """이 블록(과 bind로 감싼 작업) 안의 span/count를 새 Recorder에 모은다."""
+    rec = Recorder()
+    token = _CURRENT.set(rec)
+    try:
+        yield rec
+    finally:
+        _CURRENT.reset(token)
+
+def current() -> Optional[Recorder]:
+    return _CURRENT.get()
+
+def bind(fn: Callable) -> Callable:
+    """스레드 풀에 넘길 함수를 현재 컨텍스트(Recorder 포함)에 묶는다."""
+    ctx = contextvars.copy_context()
+    return lambda *a, **kw: ctx.copy().run(fn, *a, **kw)
+
+def count(name: str, value: float = 1, **labels):
+    """전역 카운터 + 현재 Recorder 카운터(라벨 없이 이름으로 합산)."""
+    REGISTRY.inc(f"{name}_total", value, **labels)
+    rec = _CURRENT.get()
+    if rec is not None:
+        rec.add(name, value)
+
+def observe(name: str, value: float, buckets: Optional[Tuple[float, ...]] = None, **labels):
+    REGISTRY.observe(name, value, buckets, **labels)
+
+def record_stage(stage: str, sec: float, **labels):
+    """이미 잰 시간을 단계로 기록(예: 프로세스 풀 작업의 제출→완료 시간)."""
+    REGISTRY.observe("stage_seconds", sec, stage=stage, **labels)
+    rec = _CURRENT.get()
+    if rec is not None:
+        rec.add_stage(stage, sec)
+
+@contextmanager
+def span(stage: str, **labels):
+    """단계 타이머. 예외가 나도 시간은 기록하고 stage_errors를 센다."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        REGISTRY.inc("stage_errors_total", 1, stage=stage, **labels)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - t0, **labels)
+
+def timed(stage: str):
+    """함수 데코레이터 버전의 span."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrap(*a, **kw):
+            with span(stage):
+                return fn(*a, **kw)
+        return wrap
+    return deco
+
+# ---- 내보내기 ----
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+def write_textfile(path: Optional[str] = None) -> Optional[str]:
+    """node_exporter textfile collector 용 .prom 파일을 원자적으로 갱신. 경로 없으면 METRICS_TEXTFILE."""
+    path = path or os.getenv("METRICS_TEXTFILE")
+    if not path:
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+    return path
+
+_HTTP = None
+_HTTP_LOCK = threading.Lock()
+
+def start_http_server(port: Optional[int] = None, host: str = "0.0.0.0"):
+    """GET /metrics 를 제공하는 백그라운드 서버(프로세스당 1개). 포트 없으면 METRICS_PORT, 둘 다 없으면 None."""
+    global _HTTP
+    port = port if port is not None else int(os.getenv("METRICS_PORT", "0") or 0)
+    if not port:
+        return None
+    with _HTTP_LOCK:
+        if _HTTP is not None:
+            return _HTTP
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        class _H(BaseHTTPRequestHandler):
+            def log_message(self, *a):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                b = render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(b)))
+                self.end_headers()
+                self.wfile.write(b)
+
+        srv = ThreadingHTTPServer((host, port), _H)
+        srv.daemon_threads = True
+        threading.Thread(target=srv.serve_forever, name="metrics-http", daemon=True).start()
+        _HTTP = srv
+        return srv
@@ -0,0 +1,23 @@
+# utils/optional_deps.py — v0.8 (선택 의존성 지연 import)
+# Streamlit은 상호작용마다 스크립트를 재실행하고 컨테이너 콜드 스타트도 느리므로
+# PIL/pytesseract/PyPDF2/chardet/httpx/tiktoken/sentence-transformers 같은 무거운 선택 의존성은
+# 모듈 로드 시가 아니라 기능을 처음 쓸 때 import 한다(프로세스당 1회, 실패도 기억).
+import importlib, threading
+from typing import Any, Dict
+
+_MODULES: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+def optional_import(name: str):
+    """모듈을 import 해 반환. 미설치/로드 실패 시 None."""
+    try:
+        return _MODULES[name]
+    except KeyError:
+        pass
+    with _LOCK:
+        if name not in _MODULES:
+            try:
+                _MODULES[name] = importlib.import_module(name)
+            except Exception:
+                _MODULES[name] = None
+        return _MODULES[name]
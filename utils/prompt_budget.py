@@ -0,0 +1,160 @@
+# utils/prompt_budget.py — v0.8 (토큰 예산 기반 프롬프트 조립)
+# 고정 절단값([:1200], [:800], pages[:2], head(12)) 대신 백엔드/모델별 토큰 예산을 우선순위대로 채운다.
+#   1) 조항 요구사항(조항 매핑 CSV)  2) 점수 높은 체크리스트 행  3) 증거 청크(파일별 라운드로빈)
+# 토큰 수: tiktoken 설치 시 실제 토크나이저, 아니면 한글/ASCII 비율로 보정한 추정치
+import os, re, json, math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from utils.audit_logic import find_column, col_or_default, build_system_prompt, build_user_prompt
+from utils.optional_deps import optional_import
+
+# 프롬프트(입력) 예산 — 컨텍스트 윈도우에서 출력 여유분을 뺀 값. PROMPT_TOKEN_BUDGET으로 일괄 지정 가능
+MODEL_BUDGETS = [
+    (r"gpt-5|gpt-4\.1|gpt-4o|(?:^|/)o\d\b", 24000),
+    (r"gpt-oss", 6000),
+    (r"llama3|llama-3", 6000),
+    (r"qwen|mistral|gemma", 6000),
+]
+BACKEND_BUDGETS = {"openai": 24000, "ollama": 3000, "lmstudio": 6000}
+OUTPUT_RESERVE = int(os.getenv("PROMPT_OUTPUT_RESERVE", "1024"))
+
+_CLAUSE_RE = re.compile(r"\d+(?:\.\d+)*")
+_HANGUL = re.compile(r"[가-힣]")
+_ENC_CACHE: Dict[str, Any] = {}
+
+def token_budget(backend_name: str, model: str = "") -> int:
+    env = os.getenv("PROMPT_TOKEN_BUDGET")
+    if env:
+        return int(env)
+    for pat, n in MODEL_BUDGETS:
+        if re.search(pat, model or "", re.I):
+            return n
+    return BACKEND_BUDGETS.get(backend_name, 4000)
+
+def _encoding(model: str):
+    tiktoken = optional_import("tiktoken")
+    if tiktoken is None:
+        return None
+    enc = _ENC_CACHE.get(model)
+    if enc is None:
+        try:
+            enc = tiktoken.encoding_for_model(model)
+        except Exception:
+            enc = tiktoken.get_encoding("o200k_base")
+        _ENC_CACHE[model] = enc
+    return enc
+
+def count_tokens(text: str, model: str = "") -> int:
+    if not text:
+        return 0
+    enc = _encoding(model or "gpt-5")
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    # 추정: 한글 음절 ≈ 1.1 토큰, 그 외 비ASCII ≈ 1 토큰, ASCII ≈ 4자/토큰
+    hangul = len(_HANGUL.findall(text))
+    ascii_n = sum(1 for c in text if ord(c) < 128)
+    other = len(text) - hangul - ascii_n
+    return int(math.ceil(hangul * 1.1 + other + ascii_n / 4))
+
+def _chunks(text: str, max_tokens: int, model: str) -> List[str]:
+    """문단 단위로 max_tokens 이하 청크. 긴 문단은 문자 수로 재분할."""
+    out, cur = [], ""
+    for para in re.split(r"\n{1,}", text or ""):
+        if not para.strip():
+            continue
+        cand = f"{cur}\n{para}" if cur else para
+        if count_tokens(cand, model) <= max_tokens:
+            cur = cand
+            continue
+        if cur:
+            out.append(cur)
+        while count_tokens(para, model) > max_tokens:
+            cut = max(1, int(len(para) * max_tokens / max(1, count_tokens(para, model))))
+            out.append(para[:cut])
+            para = para[cut:]
+        cur = para
+    if cur:
+        out.append(cur)
+    return out
+
+def _requirement_lines(df_clause: Optional[pd.DataFrame], clauses: Sequence[str]) -> List[str]:
+    if df_clause is None or df_clause.empty:
+        return []
+    ccol = find_column(df_clause, "clause")
+    if ccol is None or "requirement" not in df_clause.columns:
+        return []
+    title = col_or_default(df_clause, "title", "")
+    lines, seen = [], set()
+    for want in clauses:
+        hit = df_clause[df_clause[ccol].astype(str).str.startswith(str(want))]
+        for i, r in hit.iterrows():
+            if i in seen:
+                continue
+            seen.add(i)
+            lines.append(f"{r[ccol]} {title.loc[i] if i in title.index else ''}: {r['requirement']}")
+    return lines
+
+def assemble_prompt(df_ctx: pd.DataFrame, evidence_parts: Sequence[str], clause_hint: str,
+                    budget: int, df_clause: Optional[pd.DataFrame] = None, model: str = "",
+                    chunk_tokens: int = 400) -> Tuple[str, str, Dict[str, Any]]:
+    """예산 내에서 (system, user, report) 생성. report에는 섹션별 사용 토큰/누락 수."""
+    avail = max(0, budget - OUTPUT_RESERVE)
+    base_system = build_system_prompt(df_ctx.head(0), max_rows=0)
+    base_user = build_user_prompt("", clause_hint)
+    overhead = count_tokens(base_system, model) + count_tokens(base_user, model)
+    left = avail - overhead
+    report: Dict[str, Any] = {"budget": budget, "output_reserve": OUTPUT_RESERVE, "overhead": overhead}
+
+    # 1) 조항 요구사항: 힌트의 조항 번호, 없으면 선택된 행의 조항
+    clauses = _CLAUSE_RE.findall(clause_hint or "") or col_or_default(df_ctx, "clause", "").astype(str).tolist()
+    req_used, req_lines = 0, []
+    for line in _requirement_lines(df_clause, clauses):
+        t = count_tokens(line, model) + 2
+        if t > left - req_used:
+            break
+        req_lines.append(line)
+        req_used += t
+    left -= req_used
+    report["requirements"] = {"tokens": req_used, "items": len(req_lines)}
+
+    # 2) 체크리스트 행(이미 점수/유사도 순으로 정렬된 순서 유지)
+    rows_used, n_rows = 0, 0
+    recs = pd.DataFrame({k: col_or_default(df_ctx, k, "").reset_index(drop=True)
+                         for k in ("title", "clause", "question", "evidence_type")}).to_dict(orient="records")
+    for rec in recs:
+        t = count_tokens(json.dumps(rec, ensure_ascii=False), model) + 1
+        if t > left - rows_used:
+            break
+        rows_used += t
+        n_rows += 1
+    left -= rows_used
+    report["rows"] = {"tokens": rows_used, "items": n_rows, "dropped": len(df_ctx) - n_rows}
+
+    # 3) 증거 청크: 파일별로 번갈아 담아 한 파일이 예산을 독식하지 않게
+    queues = [_chunks(p, chunk_tokens, model) for p in evidence_parts]
+    picked: List[List[str]] = [[] for _ in queues]
+    ev_used, total_chunks = 0, sum(len(q) for q in queues)
+    progressed = True
+    while progressed:
+        progressed = False
+        for i, q in enumerate(queues):
+            if not q:
+                continue
+            t = count_tokens(q[0], model) + 1
+            if t > left - ev_used:
+                q.clear()
+                continue
+            picked[i].append(q.pop(0))
+            ev_used += t
+            progressed = True
+    n_chunks = sum(len(p) for p in picked)
+    report["evidence"] = {"tokens": ev_used, "items": n_chunks, "dropped": total_chunks - n_chunks}
+
+    # 요구사항·행은 build_system_prompt가 조항 순으로 정규화(접두사 고정) — 예산 선택 순서와 무관
+    system = build_system_prompt(df_ctx, max_rows=n_rows, requirements=req_lines)
+    evidence = "\n---\n".join("\n".join(p) for p in picked if p) or "증거 없음"
+    user = build_user_prompt(evidence, clause_hint)
+    report["total"] = count_tokens(system, model) + count_tokens(user, model)
+    report["tokenizer"] = "tiktoken" if optional_import("tiktoken") is not None else "estimate"
+    return system, user, report
@@ -0,0 +1,210 @@
+# utils/rate_limiter.py — v0.8 (OpenAI 호출용 프로세스 공용 적응형 속도 제한)
+# - 요청/토큰 토큰버킷(RPM·TPM): 응답 헤더 x-ratelimit-* 로 한도와 잔량을 학습(초기값 OPENAI_RPM/OPENAI_TPM, 0=미상)
+# - AIMD 동시성 창: 성공마다 +1/창, 429면 절반(1초에 한 번만) — 여러 심사가 동시에 물러났다 몰려드는 것 방지
+# - Retry-After(retry-after-ms) 동안 전체 대기. 재시도는 호출측이 같은 limiter로 다시 acquire
+# - 공정 대기열: 심사 세션(metrics.collect Recorder 단위, 없으면 스레드)별 FIFO를 라운드로빈으로 배정
+import os, re, time, threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Mapping, Optional
+
+from utils import metrics
+
+INIT_CONCURRENCY = float(os.getenv("OPENAI_INIT_CONCURRENCY", "4"))
+MAX_CONCURRENCY = float(os.getenv("OPENAI_MAX_CONCURRENCY_LIMIT", "32"))
+EXPECTED_OUTPUT_TOKENS = int(os.getenv("OPENAI_EXPECTED_OUTPUT_TOKENS", "1024"))
+
+_DUR_RE = re.compile(r"([\d.]+)(ms|s|m|h)")
+_DUR_UNIT = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def parse_duration(v: Any) -> Optional[float]:
+    """'1s', '6m0s', '20ms', '0.5' → 초."""
+    if v is None:
+        return None
+    s = str(v).strip()
+    try:
+        return float(s)
+    except ValueError:
+        pass
+    parts = _DUR_RE.findall(s)
+    return sum(float(n) * _DUR_UNIT[u] for n, u in parts) if parts else None
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+class _Bucket:
+    """분당 한도 토큰버킷. limit=0이면 미상(제한 없음)."""
+    def __init__(self, per_min: float = 0.0):
+        self.limit = float(per_min)
+        self.level = float(per_min)
+        self.t = time.monotonic()
+
+    def refill(self, now: float):
+        if self.limit:
+            self.level = min(self.limit, self.level + (now - self.t) * self.limit / 60.0)
+        self.t = now
+
+    def wait_for(self, n: float) -> float:
+        """n 만큼 쌓일 때까지 남은 초(한도보다 큰 요청은 가득 찰 때까지)."""
+        if not self.limit:
+            return 0.0
+        need = min(n, self.limit) - self.level
+        return max(0.0, need * 60.0 / self.limit)
+
+    def learn(self, limit: Optional[float], remaining: Optional[float]):
+        if limit:
+            if not self.limit:
+                self.level = limit
+            self.limit = float(limit)
+        if remaining is not None and self.limit:
+            # 서버가 본 잔량이 더 적으면 그 값을 따른다(다른 프로세스/키 공유분 반영)
+            self.level = min(self.level, float(remaining))
+
+def _num(headers: Mapping[str, str], key: str) -> Optional[float]:
+    try:
+        return float(headers[key])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class AdaptiveLimiter:
+    def __init__(self, name: str = "openai", rpm: float = 0.0, tpm: float = 0.0,
+                 concurrency: float = INIT_CONCURRENCY, max_concurrency: float = MAX_CONCURRENCY):
+        self.name = name
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm)
+        self.window = max(1.0, float(concurrency))
+        self.max_window = max(self.window, float(max_concurrency))
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+        self._queues: Dict[Any, Deque[object]] = {}
+        self._order: Deque[Any] = deque()   # 대기 중인 세션 라운드로빈 순서
+        self.stats = {"granted": 0, "rate_limited": 0, "waited_sec": 0.0}
+
+    # ---- 배정 ----
+    def _head(self) -> Optional[object]:
+        return self._queues[self._order[0]][0] if self._order else None
+
+    def _delay(self, est_tokens: float, now: float) -> float:
+        """지금 시작할 수 없으면 다시 확인할 때까지의 초(0이면 시작 가능, None이면 release 대기)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= int(self.window):
+            return -1.0
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return max(self.requests.wait_for(1), self.tokens.wait_for(est_tokens))
+
+    def acquire(self, est_tokens: float = 0.0, session: Any = None):
+        session = session if session is not None else _session_key()
+        ticket = object()
+        t0 = time.monotonic()
+        with self._cond:
+            q = self._queues.get(session)
+            if q is None:
+                q = self._queues[session] = deque()
+                self._order.append(session)
+            q.append(ticket)
+            while True:
+                now = time.monotonic()
+                if self._head() is ticket:
+                    d = self._delay(est_tokens, now)
+                    if d == 0.0:
+                        break
+                    self._cond.wait(None if d < 0 else min(d, 1.0))
+                else:
+                    self._cond.wait(1.0)
+            q.popleft()
+            self._order.popleft()
+            if q:
+                self._order.append(session)   # 같은 세션의 다음 요청은 다른 세션 뒤로
+            else:
+                del self._queues[session]
+            self.in_flight += 1
+            self.requests.level -= 1
+            self.tokens.level -= min(est_tokens, self.tokens.limit or est_tokens)
+            waited = time.monotonic() - t0
+            self.stats["granted"] += 1
+            self.stats["waited_sec"] += waited
+            self._cond.notify_all()
+        if waited > 0.001:
+            metrics.record_stage("rate_wait", waited, backend=self.name)
+
+    def release(self, *, ok: bool = True, limited: bool = False, headers: Optional[Mapping[str, str]] = None,
+                est_tokens: float = 0.0, used_tokens: Optional[float] = None):
+        with self._cond:
+            now = time.monotonic()
+            self.in_flight = max(0, self.in_flight - 1)
+            if headers:
+                self.requests.learn(_num(headers, "x-ratelimit-limit-requests"), _num(headers, "x-ratelimit-remaining-requests"))
+                self.tokens.learn(_num(headers, "x-ratelimit-limit-tokens"), _num(headers, "x-ratelimit-remaining-tokens"))
+            if used_tokens is not None and self.tokens.limit:
+                # 추정치로 미리 차감한 토큰을 실제 사용량으로 정산
+                self.tokens.level = min(self.tokens.limit, self.tokens.level + est_tokens - used_tokens)
+            if limited:
+                self.stats["rate_limited"] += 1
+                wait = retry_after(headers)
+                if wait is None:
+                    wait = parse_duration((headers or {}).get("x-ratelimit-reset-requests")) or 1.0
+                self.blocked_until = max(self.blocked_until, now + wait)
+                if now - self._last_cut >= 1.0:
+                    self.window = max(1.0, self.window / 2)
+                    self._last_cut = now
+            elif ok:
+                self.window = min(self.max_window, self.window + 1.0 / self.window)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, est_tokens: float = 0.0, session: Any = None) -> Iterator["_Slot"]:
+        """with limiter.slot(n) as s: 호출 후 s.done(headers, used) / s.limited(headers)."""
+        self.acquire(est_tokens, session)
+        s = _Slot()
+        try:
+            yield s
+        finally:
+            self.release(ok=s.ok, limited=s.is_limited, headers=s.headers, est_tokens=est_tokens, used_tokens=s.used)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"window": round(self.window, 2), "in_flight": self.in_flight,
+                    "rpm": self.requests.limit, "tpm": self.tokens.limit,
+                    "blocked_for": round(max(0.0, self.blocked_until - time.monotonic()), 3),
+                    "queued": sum(len(q) for q in self._queues.values()), **self.stats}
+
+class _Slot:
+    def __init__(self):
+        self.ok, self.is_limited, self.headers, self.used = False, False, None, None
+
+    def done(self, headers: Optional[Mapping[str, str]] = None, used_tokens: Optional[float] = None):
+        self.ok, self.headers, self.used = True, headers, used_tokens
+
+    def limited(self, headers: Optional[Mapping[str, str]] = None):
+        self.is_limited, self.headers = True, headers
+
+    def failed(self, headers: Optional[Mapping[str, str]] = None):
+        self.headers = headers
+
+def _session_key() -> Any:
+    rec = metrics.current()
+    return id(rec) if rec is not None else ("thread", threading.get_ident())
+
+_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+_LOCK = threading.Lock()
+
+def get_limiter(key: str = "openai") -> AdaptiveLimiter:
+    """키(예: 'openai:gpt-5')별 프로세스 공용 limiter. 초기 한도는 OPENAI_RPM/OPENAI_TPM."""
+    with _LOCK:
+        lim = _LIMITERS.get(key)
+        if lim is None:
+            lim = _LIMITERS[key] = AdaptiveLimiter(key.split(":", 1)[0], rpm=float(os.getenv("OPENAI_RPM", "0") or 0),
+                                                   tpm=float(os.getenv("OPENAI_TPM", "0") or 0))
+        return lim
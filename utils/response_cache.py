@@ -0,0 +1,131 @@
+# utils/response_cache.py — v0.8 (LLM 응답 캐시: SQLite)
+# - 키: backend + model + sha1(system) + sha1(user)  → 동일 프롬프트 재심사 시 LLM 호출 생략
+# - 저장: LLM_CACHE_PATH(기본 ./cache/llm_responses.sqlite), WAL 모드(다중 프로세스 안전)
+# - 용량 초과 시 마지막 접근 시각 기준으로 오래된 항목부터 삭제(LLM_CACHE_MAX_MB, 기본 256)
+import os, json, time, sqlite3, threading, pathlib
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from utils.audit_logic import to_sha1, normalize_findings_json
+from utils.metrics import count
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    backend TEXT, model TEXT,
+    system_sha1 TEXT, user_sha1 TEXT,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+# GPT5Client가 오류를 findings로 감싸 반환하는 경우 → 캐시하지 않음
+_ERROR_MARKERS = ("API 호출 실패", "예상치 못한 오류")
+
+def backend_model(backend) -> str:
+    return str(getattr(backend, "model", "") or getattr(getattr(backend, "client", None), "model", "") or "")
+
+def prompt_key(backend_name: str, model: str, system: str, user: str) -> str:
+    return to_sha1(f"{backend_name}\x1f{model}\x1f{to_sha1(system or '')}\x1f{to_sha1(user or '')}")
+
+def is_error_result(result: Dict[str, Any]) -> bool:
+    for f in result.get("findings", []) or []:
+        reason = str(f.get("reason", ""))
+        if any(reason.startswith(m) for m in _ERROR_MARKERS):
+            return True
+    return False
+
+class ResponseCache:
+    def __init__(self, path: Optional[str] = None, max_mb: Optional[float] = None):
+        self.path = pathlib.Path(path or os.getenv("LLM_CACHE_PATH", "./cache/llm_responses.sqlite"))
+        self.max_bytes = int(float(max_mb if max_mb is not None else os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with con:  # commit/rollback
+                yield con
+        finally:
+            con.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._connect() as con:
+            row = con.execute("SELECT response FROM responses WHERE key=?", (key,)).fetchone()
+            count("llm_cache_hits" if row is not None else "llm_cache_misses")
+            if row is None:
+                return None
+            con.execute("UPDATE responses SET last_access=?, hits=hits+1 WHERE key=?", (time.time(), key))
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], backend_name: str = "", model: str = "",
+            system: str = "", user: str = "") -> None:
+        if is_error_result(result):
+            return
+        body = json.dumps(result, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO responses(key, backend, model, system_sha1, user_sha1, response, size, created, last_access, hits) "
+                "VALUES (?,?,?,?,?,?,?,?,?,0)",
+                (key, backend_name, model, to_sha1(system or ""), to_sha1(user or ""), body, len(body.encode("utf-8")), now, now))
+            self._evict(con)
+
+    def _evict(self, con: sqlite3.Connection) -> None:
+        total = con.execute("SELECT COALESCE(SUM(size),0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)  # 여유분까지 정리해 매 삽입마다 삭제가 반복되지 않게
+        for key, size in con.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            if total <= target:
+                break
+            con.execute("DELETE FROM responses WHERE key=?", (key,))
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as con:
+            n, size, hits = con.execute("SELECT COUNT(*), COALESCE(SUM(size),0), COALESCE(SUM(hits),0) FROM responses").fetchone()
+        return {"items": n, "bytes": size, "hits": hits, "path": str(self.path)}
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM responses")
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache()
+        return _CACHE
+
+def cached_generate(backend, system: str, user: str, bypass: bool = False,
+                    cache: Optional[ResponseCache] = None, cancel: Optional[threading.Event] = None,
+                    **kw) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """캐시 조회 → 미스 시 backend.generate 후 저장. (result, {cache_hit, prompt_hash}) 반환.
+    bypass=True면 조회는 건너뛰되 새 결과로 캐시를 갱신한다. 호출 중 cancel이 설정되면(호출자가 결과를 버림) 저장하지 않는다."""
+    cache = cache or get_response_cache()
+    name, model = getattr(backend, "name", "base"), backend_model(backend)
+    key = prompt_key(name, model, system, user)
+    if not bypass:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit, {"cache_hit": True, "prompt_hash": key[:12]}
+    result = normalize_findings_json(backend.generate(system=system, user=user, **kw))
+    if cancel is None or not cancel.is_set():
+        cache.put(key, result, name, model, system, user)
+    return result, {"cache_hit": False, "prompt_hash": key[:12]}
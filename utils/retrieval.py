@@ -0,0 +1,118 @@
+# utils/retrieval.py — v0.8 (증거 기반 체크리스트 행 검색)
+# - 체크리스트 행(+조항 매핑의 요구사항/증거예시)을 한 번 임베딩해 ./cache/retrieval 에 .npy 로 저장
+#   → 이후에는 np.load(mmap_mode="r")로 메모리 매핑만 하므로 재시작 비용이 거의 없음
+# - 임베딩: RETRIEVAL_MODEL(sentence-transformers 모델명) 설치/지정 시 사용,
+#           아니면 문자 n-gram(2~3) 해싱 TF-IDF (한국어 조사/어미 변화에 강하고 의존성 없음)
+# - 심사 시 증거 요약과의 코사인 유사도로 top-k 행 선택 → 프롬프트 컨텍스트 축소
+import os, re, json, zlib, hashlib, pathlib
+from typing import List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from utils.audit_logic import find_column, col_or_default
+from utils.optional_deps import optional_import
+
+RETRIEVAL_DIR = os.getenv("RETRIEVAL_CACHE_DIR", "./cache/retrieval")
+RETRIEVAL_DIM = int(os.getenv("RETRIEVAL_DIM", "2048"))
+_WS = re.compile(r"\s+")
+
+def row_texts(df_check: pd.DataFrame, df_clause: Optional[pd.DataFrame] = None) -> List[str]:
+    """검색용 행 텍스트: 조항/제목/질문/증거유형 + (있으면) 조항 매핑의 요구사항·증거예시."""
+    clause = col_or_default(df_check, "clause", "").astype(str).tolist()
+    title = col_or_default(df_check, "title", "").astype(str).tolist()
+    question = col_or_default(df_check, "question", "").astype(str).tolist()
+    evidence = col_or_default(df_check, "evidence_type", "").astype(str).tolist()
+    extra = {}
+    if df_clause is not None and find_column(df_clause, "clause"):
+        ccol = find_column(df_clause, "clause")
+        for _, r in df_clause.iterrows():
+            extra[str(r[ccol])] = " ".join(str(r.get(c, "")) for c in ("requirement", "evidence_examples", "required_records")
+                                           if c in df_clause.columns and pd.notna(r.get(c)))
+    return [" ".join([c, t, q, e, extra.get(c, "")]) for c, t, q, e in zip(clause, title, question, evidence)]
+
+def _ngrams(text: str) -> List[str]:
+    s = _WS.sub(" ", (text or "").lower()).strip()
+    return [s[i:i + n] for n in (2, 3) for i in range(max(0, len(s) - n + 1))]
+
+def _hash_tf(text: str, dim: int) -> np.ndarray:
+    v = np.zeros(dim, dtype=np.float32)
+    grams = _ngrams(text)
+    if grams:
+        idx = np.fromiter((zlib.crc32(g.encode("utf-8")) % dim for g in grams), dtype=np.int64, count=len(grams))
+        np.add.at(v, idx, 1.0)
+        np.log1p(v, out=v)  # sublinear tf
+    return v
+
+def _l2(m: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(m, axis=-1, keepdims=True)
+    norm[norm == 0] = 1.0
+    return m / norm
+
+class RowRetriever:
+    def __init__(self, texts: Sequence[str], cache_dir: Optional[str] = None, dim: Optional[int] = None,
+                 model_name: Optional[str] = None):
+        self.dim = dim or RETRIEVAL_DIM
+        self.model_name = model_name if model_name is not None else os.getenv("RETRIEVAL_MODEL", "")
+        self._model = None
+        # sentence-transformers(torch)는 import만 수 초 → 모델을 지정했을 때만 로드
+        st_mod = optional_import("sentence_transformers") if self.model_name else None
+        if st_mod is not None:
+            self._model = st_mod.SentenceTransformer(self.model_name, device="cpu")
+        self.method = f"st:{self.model_name}" if self._model is not None else f"tfidf-char23-{self.dim}"
+        sig = hashlib.sha1(("\x1e".join(texts) + "\x1f" + self.method).encode("utf-8")).hexdigest()[:16]
+        self.dir = pathlib.Path(cache_dir or RETRIEVAL_DIR) / sig
+        self.n = len(texts)
+        if not (self.dir / "matrix.npy").exists():
+            self._build(texts)
+        self.matrix = np.load(self.dir / "matrix.npy", mmap_mode="r")
+        self.idf = np.load(self.dir / "idf.npy") if (self.dir / "idf.npy").exists() else None
+
+    def _build(self, texts: Sequence[str]) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if self._model is not None:
+            mat = np.asarray(self._model.encode(list(texts), normalize_embeddings=True), dtype=np.float32)
+        else:
+            tf = np.stack([_hash_tf(t, self.dim) for t in texts]) if texts else np.zeros((0, self.dim), np.float32)
+            df = (tf > 0).sum(axis=0)
+            idf = (np.log((1 + len(texts)) / (1 + df)) + 1.0).astype(np.float32)
+            mat = _l2(tf * idf).astype(np.float32)
+            np.save(self.dir / "idf.npy", idf)
+        # 임시 파일에 쓴 뒤 교체 → 동시 빌드 시에도 깨진 행렬을 읽지 않음
+        tmp = self.dir / f"matrix.{os.getpid()}.npy"
+        np.save(tmp, mat)
+        os.replace(tmp, self.dir / "matrix.npy")
+        (self.dir / "meta.json").write_text(json.dumps({"method": self.method, "rows": len(texts)}), encoding="utf-8")
+
+    def embed_query(self, text: str) -> np.ndarray:
+        if self._model is not None:
+            return np.asarray(self._model.encode([text], normalize_embeddings=True)[0], dtype=np.float32)
+        q = _hash_tf(text, self.dim)
+        if self.idf is not None:
+            q = q * self.idf
+        return _l2(q)
+
+    def top_k(self, query: str, k: int = 8, rows: Optional[Sequence[int]] = None):
+        """(행 번호 배열, 유사도 배열) — 유사도 내림차순. rows가 주어지면 그 후보 안에서만."""
+        cand = np.arange(self.n) if rows is None else np.asarray(rows, dtype=np.int64)
+        if len(cand) == 0:
+            return cand, np.zeros(0, dtype=np.float32)
+        sims = np.asarray(self.matrix[cand] @ self.embed_query(query))
+        k = min(k, len(cand))
+        part = np.argpartition(-sims, k - 1)[:k]
+        order = part[np.argsort(-sims[part], kind="stable")]
+        return cand[order], sims[order]
+
+def build_retriever(df_check: pd.DataFrame, df_clause: Optional[pd.DataFrame] = None, **kw) -> RowRetriever:
+    return RowRetriever(row_texts(df_check, df_clause), **kw)
+
+def retrieve_rows(retriever: RowRetriever, df_check: pd.DataFrame, evidence_digest: str, k: int = 8,
+                  candidates: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """증거 요약과 가장 가까운 체크리스트 행 top-k. candidates(선택된 행)가 비어 있지 않으면 그 안에서만 검색."""
+    rows = None
+    if candidates is not None and len(candidates):
+        rows = df_check.index.get_indexer(candidates.index)
+        rows = rows[rows >= 0]
+    pos, sims = retriever.top_k(evidence_digest, k=k, rows=rows)
+    out = df_check.iloc[pos].copy()
+    out["similarity"] = np.round(sims, 4)
+    return out
@@ -0,0 +1,97 @@
+# utils/row_index.py — v0.8 (체크리스트 사전 인덱스)
+# CSV 로드 시 한 번만 구축 → select_relevant_rows의 조항 필터/키워드 점수를 스캔 대신 조회로 처리
+# - 조항: 정렬 배열 + searchsorted 로 접두사 범위 검색 (O(log n))
+# - 키워드: 토큰 역색인(token → 행 번호). 부분문자열 의미는 어휘(vocab) 단위로 보존
+# - 점수: 키워드별 posting에 가중치를 NumPy로 누적
+import re
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from utils.audit_logic import find_column, col_or_default
+
+_TOKEN_RE = re.compile(r"\w+")
+_PREFIX_END = "\U0010ffff"
+
+def _fingerprint(df: pd.DataFrame) -> int:
+    """인덱스가 쓰는 열(조항·제목·질문)의 내용+행 순서 해시(프로세스 안에서만 비교).
+    문자열 hash()는 객체에 캐시되어 hash_pandas_object보다 수 배 빠름 — matches()가 선택마다 불리므로."""
+    cols = [c for c in (find_column(df, k) for k in ("clause", "title", "question")) if c is not None]
+    return hash(tuple(tuple(df[c].tolist()) for c in cols))
+
+class ChecklistIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self.columns = tuple(df.columns)
+        self.fingerprint = _fingerprint(df)
+        clause_col = find_column(df, "clause")
+        self.has_clause = clause_col is not None
+        clauses = df[clause_col].astype(str).to_numpy(dtype=str) if clause_col else np.array([""] * self.n, dtype=str)
+        self._order = np.argsort(clauses, kind="stable")
+        self._sorted = clauses[self._order]
+        title = col_or_default(df, "title", "").astype(str).to_numpy()
+        question = col_or_default(df, "question", "").astype(str).to_numpy()
+        self._text = pd.Series([f"{t} {q}".lower() for t, q in zip(title, question)], dtype=object)
+        # 토큰 역색인
+        postings: Dict[str, list] = {}
+        for i, txt in enumerate(self._text):
+            for tok in set(_TOKEN_RE.findall(txt)):
+                postings.setdefault(tok, []).append(i)
+        self._tokens = {t: np.asarray(v, dtype=np.int64) for t, v in postings.items()}
+        self._kw_cache: Dict[str, np.ndarray] = {}
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """st.cache_data 복사본 등 동일 내용/순서의 DataFrame인지(행 수·컬럼 + 내용 해시).
+        행 수가 같은 다른 체크리스트(편집본, 필터 결과)에 이 인덱스의 행 번호를 쓰지 않도록."""
+        return len(df) == self.n and tuple(df.columns) == self.columns and _fingerprint(df) == self.fingerprint
+
+    def clause_rows(self, prefix: str) -> np.ndarray:
+        """clause.startswith(prefix)인 행 번호(원래 순서)."""
+        lo = np.searchsorted(self._sorted, prefix, side="left")
+        hi = np.searchsorted(self._sorted, prefix + _PREFIX_END, side="left")
+        return np.sort(self._order[lo:hi])
+
+    def clause_group_rows(self, group: str) -> np.ndarray:
+        """최상위 조항 그룹 행: clause == group 또는 clause.startswith(group + ".")"""
+        lo = np.searchsorted(self._sorted, group, side="left")
+        hi = np.searchsorted(self._sorted, group, side="right")
+        return np.union1d(self._order[lo:hi], self.clause_rows(f"{group}."))
+
+    def keyword_rows(self, key: str) -> np.ndarray:
+        """`key.lower() in (title+question).lower()`인 행 번호. 키워드별로 한 번만 계산."""
+        k = key.lower()
+        hit = self._kw_cache.get(k)
+        if hit is not None:
+            return hit
+        if k and _TOKEN_RE.fullmatch(k):
+            # 단어 문자로만 된 키워드는 반드시 한 토큰 안에 나타남 → 어휘만 훑으면 됨
+            parts = [rows for tok, rows in self._tokens.items() if k in tok]
+            hit = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        else:
+            hit = np.flatnonzero(self._text.str.contains(k, regex=False).to_numpy())
+        self._kw_cache[k] = hit
+        return hit
+
+    def scores(self, weights: Dict[str, float]) -> np.ndarray:
+        sc = np.ones(self.n, dtype=np.float64)
+        for key, w in (weights or {}).items():
+            rows = self.keyword_rows(key)
+            if len(rows):
+                sc[rows] += w
+        return sc
+
+    def select(self, df: pd.DataFrame, rows: Optional[Sequence[int]] = None,
+               weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """rows(None=전체) 중 선택 → weights가 있으면 score 컬럼 추가 후 내림차순 정렬."""
+        pos = np.arange(self.n) if rows is None else np.asarray(rows, dtype=np.int64)
+        sel = df.iloc[pos].copy()
+        if weights and len(sel) > 0:
+            sc = self.scores(weights)[pos]
+            order = np.argsort(-sc, kind="stable")
+            sel = sel.iloc[order]
+            sel["score"] = sc[order]
+        return sel
+
+def build_checklist_index(df: pd.DataFrame) -> ChecklistIndex:
+    return ChecklistIndex(df)
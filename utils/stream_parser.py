@@ -0,0 +1,82 @@
+# utils/stream_parser.py — v0.8 (스트리밍 JSON → findings 점진 파싱)
+# 토큰 단위로 들어오는 LLM 출력에서 "findings":[ ... ] 배열의 원소가
+# 닫히는 즉시 하나씩 꺼낸다. 문자열/이스케이프 안의 괄호는 무시.
+import re, json
+from typing import Any, Dict, List
+
+from utils.audit_logic import normalize_findings_json
+
+_FINDINGS_OPEN = re.compile(r'"findings"\s{0,16}:\s{0,16}\[')
+_OPEN_MAX = len('"findings"') + 16 + 1 + 16 + 1   # 위 패턴의 최대 길이 → 새 청크 앞쪽 이만큼만 다시 검색
+
+class FindingsStreamParser:
+    def __init__(self):
+        self.buf = ""
+        self.pos = -1          # 배열 내부 스캔 위치(-1: 아직 배열 시작 전)
+        self.scan = 0          # 배열 시작 패턴 검색 시작 위치(매 청크마다 버퍼 전체를 다시 찾지 않음)
+        self.depth = 0
+        self.in_str = False
+        self.esc = False
+        self.obj_start = -1
+        self.closed = False
+        self.count = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """청크 추가 → 이번에 완성된 finding 목록(정규화된 dict)."""
+        self.buf += chunk or ""
+        out: List[Dict[str, Any]] = []
+        if self.closed:
+            return out
+        if self.pos < 0:
+            m = _FINDINGS_OPEN.search(self.buf, self.scan)
+            if not m:
+                # 패턴이 청크 경계에 걸칠 수 있으므로 최대 길이만큼 겹쳐서 다음 검색
+                self.scan = max(0, len(self.buf) - _OPEN_MAX + 1)
+                return out
+            self.pos = m.end()
+        buf = self.buf
+        i = self.pos
+        while i < len(buf):
+            c = buf[i]
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif c == "\\":
+                    self.esc = True
+                elif c == '"':
+                    self.in_str = False
+            elif c == '"':
+                self.in_str = True
+            elif c in "{[":
+                if self.depth == 0 and c == "{":
+                    self.obj_start = i
+                self.depth += 1
+            elif c in "}]":
+                if self.depth == 0 and c == "]":
+                    self.closed = True
+                    i += 1
+                    break
+                self.depth -= 1
+                if self.depth == 0 and c == "}" and self.obj_start >= 0:
+                    item = self._parse(buf[self.obj_start:i + 1])
+                    if item is not None:
+                        out.append(item)
+                    self.obj_start = -1
+            i += 1
+        self.pos = i
+        return out
+
+    def _parse(self, raw: str):
+        try:
+            obj = json.loads(raw)
+        except Exception:
+            return None
+        norm = normalize_findings_json({"findings": [obj]}).get("findings", [])
+        if not norm:
+            return None
+        self.count += 1
+        return norm[0]
+
+    @property
+    def text(self) -> str:
+        return self.buf